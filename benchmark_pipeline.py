@@ -0,0 +1,274 @@
+import io
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+from pathlib import Path
+
+# Varsayılan ayarlar
+DEFAULT_RESULTS_PATH = "bench_results.json"
+DEFAULT_SYNTHETIC_COUNT = 24
+DEFAULT_THRESHOLD = 0.10  # %10'dan fazla gerileme başarısız sayılır
+BENCH_CATEGORY = "hero"
+BENCH_FORMATS = ["avif", "webp", "jpeg"]
+
+# Sentetik resim boyutları (Pexels orijinallerine yakın)
+SYNTHETIC_SIZES = [(4000, 2667), (3000, 4000), (2400, 1600), (1920, 1080)]
+
+
+def generate_synthetic_corpus(directory, count, seed=42):
+    # Gürültü + gradyanlardan oluşan, her çalıştırmada aynı olan JPEG'ler üret
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        width, height = SYNTHETIC_SIZES[i % len(SYNTHETIC_SIZES)]
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+        noise = rng.normal(0, 12 + 4 * (i % 5), size=(-(-height // 8), -(-width // 8), 3)).astype(np.float32)
+        noise = np.kron(noise, np.ones((8, 8, 1), dtype=np.float32))[:height, :width]
+        pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+
+        path = Path(directory) / f"synthetic-{i:03d}.jpeg"
+        Image.fromarray(pixels).save(path, quality=90)
+        paths.append(path.as_posix())
+    return paths
+
+
+def public_corpus(limit):
+    images = sorted(
+        p.as_posix() for p in Path("public/images").glob("*")
+        if p.suffix.lower() in (".jpg", ".jpeg", ".png")
+    )
+    return images[:limit] if limit else images
+
+
+def percentiles(samples):
+    # En yakın sıra yöntemiyle p50/p90/p99 (milisaniye)
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))] * 1000
+
+    return {
+        "p50": round(pick(50), 3),
+        "p90": round(pick(90), 3),
+        "p99": round(pick(99), 3),
+        "max": round(ordered[-1] * 1000, 3),
+        "count": len(ordered)
+    }
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss Linux'ta KB, macOS'ta bayt cinsindendir
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def bench_index(cache_dir):
+    # Soğuk ve sıcak referans indeksleme
+    from image_index import ImageIndex
+
+    cache_path = Path(cache_dir) / "bench_index.json"
+    timings = []
+    for _ in range(2):
+        index = ImageIndex(cache_path=cache_path)
+        start = time.perf_counter()
+        index.refresh()
+        timings.append(time.perf_counter() - start)
+        index.save()
+    return {"cold": timings[0], "warm": timings[1], "files": len(index.files)}
+
+
+def bench_images(corpus, settings, formats=BENCH_FORMATS):
+    # Her resim için çözme, yeniden boyutlandırma ve kodlama aşamalarını ayrı ölç
+    from PIL import ImageOps
+    from image_encoder import open_for_width, resize_to_width, save_arguments
+
+    stages = {"decode": [], "resize": [], "encode": []}
+    output_bytes = 0
+    failures = 0
+    widths = sorted(settings["widths"], reverse=True)
+
+    for path in corpus:
+        try:
+            start = time.perf_counter()
+            with open_for_width(path, widths[0]) as img:
+                img = ImageOps.exif_transpose(img)
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGB")
+                img.load()
+            stages["decode"].append(time.perf_counter() - start)
+        except (OSError, ValueError):
+            failures += 1
+            continue
+
+        current = img
+        for width in widths:
+            if current.width > width:
+                start = time.perf_counter()
+                current = resize_to_width(current, width)
+                stages["resize"].append(time.perf_counter() - start)
+
+            for fmt in formats:
+                start = time.perf_counter()
+                buffer = io.BytesIO()
+                encodable, pil_format, options = save_arguments(current, fmt, settings["quality"])
+                encodable.save(buffer, format=pil_format, **options)
+                stages["encode"].append(time.perf_counter() - start)
+                output_bytes += buffer.tell()
+
+    return stages, output_bytes, failures
+
+
+def bench_rewrite():
+    # Tüm eşleştirmeleri kaynak ağacına bellekte uygula (dosyaya yazmadan)
+    from image_index import iter_source_files
+    from path_rewriter import PathRewriter, load_all_mappings
+
+    rewriter = PathRewriter(load_all_mappings())
+    timings = []
+    replacements = 0
+    for file_path in iter_source_files():
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        start = time.perf_counter()
+        _, count = rewriter.rewrite(content)
+        timings.append(time.perf_counter() - start)
+        replacements += count
+    return timings, replacements
+
+
+def run_benchmark(args):
+    from optimize_images import IMAGE_CATEGORIES
+    from image_encoder import supported_formats
+
+    settings = IMAGE_CATEGORIES[BENCH_CATEGORY]
+    formats = supported_formats(BENCH_FORMATS)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.corpus == "synthetic":
+            print(f"{args.count} sentetik resim üretiliyor...")
+            corpus = generate_synthetic_corpus(tmp_dir, args.count)
+        else:
+            corpus = public_corpus(args.count)
+        corpus_bytes = sum(os.path.getsize(path) for path in corpus)
+
+        index_stats = bench_index(tmp_dir)
+
+        start = time.perf_counter()
+        stages, output_bytes, failures = bench_images(corpus, settings, formats)
+        image_time = time.perf_counter() - start
+
+    rewrite_timings, replacements = bench_rewrite()
+    processed = len(corpus) - failures
+
+    return {
+        "corpus": args.corpus,
+        "images": processed,
+        "failures": failures,
+        "category": BENCH_CATEGORY,
+        "formats": formats,
+        "images_per_sec": round(processed / image_time, 3) if image_time else 0,
+        "input_bytes": corpus_bytes,
+        "output_bytes": output_bytes,
+        "peak_rss": peak_rss_bytes(),
+        "index": {k: round(v, 6) if isinstance(v, float) else v for k, v in index_stats.items()},
+        "stages": {
+            **{name: percentiles(samples) for name, samples in stages.items()},
+            "rewrite": percentiles(rewrite_timings)
+        },
+        "rewrite_replacements": replacements
+    }
+
+
+def print_results(results):
+    print("\nBenchmark Sonuçları:")
+    print("-" * 80)
+    print(f"{'Aşama':<12} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'max ms':>10} {'Adet':>8}")
+    print("-" * 80)
+    for name, stats in results["stages"].items():
+        if stats:
+            print(f"{name:<12} {stats['p50']:>10.2f} {stats['p90']:>10.2f} {stats['p99']:>10.2f} "
+                  f"{stats['max']:>10.2f} {stats['count']:>8}")
+    print("-" * 80)
+    print(f"İndeks: soğuk {results['index']['cold']*1000:.1f} ms, sıcak {results['index']['warm']*1000:.1f} ms "
+          f"({results['index']['files']} dosya)")
+    print(f"Verim: {results['images_per_sec']:.2f} resim/sn ({results['images']} resim)")
+    print(f"Çıktı: {results['output_bytes']/1024:.1f} KB (girdi {results['input_bytes']/1024:.1f} KB)")
+    if results["peak_rss"]:
+        print(f"Tepe RSS: {results['peak_rss'] / (1024 * 1024):.0f} MB")
+
+
+def compare_results(results, baseline, threshold):
+    # Verim düşüşü veya çıktı büyümesi eşiği aşarsa gerilemeleri döndür
+    regressions = []
+    if (baseline.get("corpus"), baseline.get("images")) != (results["corpus"], results["images"]):
+        print(f"Uyarı: korpus farklı ({baseline.get('corpus')}/{baseline.get('images')} -> "
+              f"{results['corpus']}/{results['images']}), karşılaştırma yanıltıcı olabilir.")
+
+    base_speed = baseline.get("images_per_sec") or 0
+    if base_speed and results["images_per_sec"] < base_speed * (1 - threshold):
+        change = (results["images_per_sec"] - base_speed) / base_speed * 100
+        regressions.append(f"verim {base_speed:.2f} -> {results['images_per_sec']:.2f} resim/sn ({change:+.1f}%)")
+
+    base_bytes = baseline.get("output_bytes") or 0
+    if base_bytes and results["output_bytes"] > base_bytes * (1 + threshold):
+        change = (results["output_bytes"] - base_bytes) / base_bytes * 100
+        regressions.append(f"çıktı boyutu {base_bytes} -> {results['output_bytes']} bayt ({change:+.1f}%)")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resim hattının verim ve sıkıştırma benchmark'ı")
+    parser.add_argument("--corpus", choices=["synthetic", "public"], default="synthetic",
+                        help="Sentetik resimler veya public/images (varsayılan: synthetic)")
+    parser.add_argument("--count", type=int, default=DEFAULT_SYNTHETIC_COUNT,
+                        help="Kullanılacak resim sayısı (public için 0 = hepsi)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH,
+                        help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--compare", default=None,
+                        help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="İzin verilen gerileme oranı (varsayılan: 0.10)")
+    args = parser.parse_args()
+
+    # Karşılaştırma dosyası çıktıyla aynı olabilir (varsayılan bench_results.json):
+    # önceki sonuç, yeni sonuç üzerine yazılmadan önce okunur
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = run_benchmark(args)
+    print_results(results)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nSonuçlar {args.output} dosyasına kaydedildi.")
+
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nGerileme tespit edildi (eşik %{args.threshold * 100:.0f}):")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\nGerileme yok (eşik %{args.threshold * 100:.0f}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+
+from pipeline_trace import span, count
+
+# Önbellek manifest dosyası
+CACHE_DIR = Path(".cache")
+CACHE_PATH = CACHE_DIR / "image_build_cache.json"
+
+# Anahtara girmeyen iş alanları (yol, etiket, önbellekten gelen kalite ve yayımlanan yol)
+NON_SETTING_KEYS = ("input", "output", "category", "chosen_quality", "published")
+
+
+def file_hash(path, chunk_size=1 << 20):
+    # Dosyanın SHA-256 özetini parça parça hesapla
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def job_settings(job):
+    return {k: v for k, v in job.items() if k not in NON_SETTING_KEYS}
+
+
+class BuildCache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.sources = {}
+        self.outputs = {}
+        self.qualities = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Önbellek okunamadı, sıfırdan başlanıyor: {e}")
+            return
+        self.sources = data.get("sources", {})
+        self.outputs = data.get("outputs", {})
+        self.qualities = data.get("qualities", {})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"sources": self.sources, "outputs": self.outputs,
+                       "qualities": self.qualities}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def source_hash(self, path):
+        # Boyut ve mtime değişmediyse önceki özeti yeniden kullan
+        stat = os.stat(path)
+        entry = self.sources.get(path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+
+        with span("hash", file=path):
+            sha = file_hash(path)
+        self.sources[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha}
+        return sha
+
+    def job_key(self, job):
+        # Anahtar: kaynak içerik özeti + kategori ayarları
+        payload = json.dumps([self.source_hash(job["input"]), job_settings(job)], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_fresh(self, job):
+        entry = self.outputs.get(job["output"])
+        if not entry or "result" not in entry or entry["key"] != self.job_key(job):
+            return False
+        variants = entry["result"].get("variants", [])
+        # Ana çıktı içerik özetli adla yazılmış olabilir
+        primary = variants[0]["path"] if variants else job["output"]
+        try:
+            if os.path.getsize(primary) != entry["bytes"]:
+                return False
+        except OSError:
+            return False
+        return all(
+            os.path.exists(encoded["path"])
+            for variant in variants
+            for encoded in variant.get("formats", {"": variant}).values()
+        )
+
+    def filter_stale(self, jobs):
+        # Anahtarı hâlâ eşleşen çıktıları atla, kalanları döndür
+        stale = []
+        for job in jobs:
+            if self.is_fresh(job):
+                self.hits += 1
+            else:
+                self.misses += 1
+                stale.append(job)
+        return stale
+
+    def quality_key(self, job):
+        # Kalite araması kaynak özeti, format, genişlik ve hedef skora bağlıdır
+        return f"{self.source_hash(job['input'])}:{job['format']}:{job['width']}:{job['target_ssim']}"
+
+    def apply_cached_qualities(self, jobs):
+        # Daha önce aranmış kaliteleri işlere ekle, arama tekrarlanmasın
+        for job in jobs:
+            if job.get("target_ssim"):
+                quality = self.qualities.get(self.quality_key(job))
+                if quality:
+                    job["chosen_quality"] = quality
+
+    def record(self, job, result):
+        if job.get("target_ssim"):
+            self.qualities[self.quality_key(job)] = result["quality"]
+
+        stored = {k: v for k, v in result.items() if k not in ("elapsed", "peak_rss")}
+        self.outputs[job["output"]] = {
+            "key": self.job_key(job),
+            "input": job["input"],
+            "bytes": result["bytes"],
+            "result": stored
+        }
+
+    def cached_result(self, job):
+        return self.outputs[job["output"]]["result"]
+
+    def report(self):
+        count("cache.hits", self.hits)
+        count("cache.misses", self.misses)
+        print(f"Önbellek: {self.hits} isabet, {self.misses} ıska")
+
+
+def encode_with_cache(jobs, workers=None, force=False, memory_budget=None, cache=None, executor=None):
+    # Sadece önbellekte güncel olmayan işleri kodla ve sonuçları kaydet;
+    # önbellekten gelenler dahil tüm işlerin sonuçlarını döndür
+    # (izleme modu bellekteki önbelleği ve süreç havuzunu verir)
+    from image_encoder import encode_images
+
+    if cache is None:
+        cache = BuildCache()
+    cache.hits = cache.misses = 0
+    stale_jobs = jobs if force else cache.filter_stale(jobs)
+    if force:
+        cache.misses = len(jobs)
+    cache.report()
+
+    cache.apply_cached_qualities(stale_jobs)
+    stale_outputs = {job["output"] for job in stale_jobs}
+    results = [cache.cached_result(job) for job in jobs if job["output"] not in stale_outputs]
+    if stale_jobs:
+        jobs_by_output = {job["output"]: job for job in stale_jobs}
+        for result in encode_images(stale_jobs, workers=workers, memory_budget=memory_budget,
+                                    executor=executor):
+            cache.record(jobs_by_output[result["output"]], result)
+            results.append(result)
+
+    # Yer tutucusu olmadan önbelleğe girmiş sonuçları tamamla (önbellekle birlikte kaydedilir)
+    from image_placeholder import backfill_placeholders
+    backfill_placeholders(results)
+    cache.save()
+    return results
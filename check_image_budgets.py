@@ -0,0 +1,181 @@
+import sys
+import json
+import argparse
+from fnmatch import fnmatch
+from pathlib import Path
+
+from image_index import ImageReference, load_index
+from optimize_images import file_content_map, guess_category
+
+# Bütçe tanımları: sayfa başına toplam resim baytı ve sayfa içinde kategori başına toplam
+BUDGETS_PATH = Path("image_budgets.json")
+
+# Sayfa sayılan dosyalar (API uçları hariç)
+PAGES_DIR = "src/pages/"
+PAGE_EXTENSIONS = (".tsx", ".jsx")
+PAGE_SKIP_PREFIXES = ("src/pages/api/",)
+
+# Raporda aşan sayfa başına gösterilecek en büyük resim sayısı
+TOP_IMAGES = 3
+
+UNITS = {"kb": 1024, "mb": 1024 * 1024, "b": 1}
+
+
+def parse_bytes(value):
+    # 1500000, "300KB", "1.5MB"
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().lower()
+    for unit in ("kb", "mb", "b"):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * UNITS[unit])
+    return int(text)
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {
+        "page": parse_bytes(data["page"]) if "page" in data else None,
+        "pages": {pattern: parse_bytes(value) for pattern, value in data.get("pages", {}).items()},
+        "categories": {category: parse_bytes(value) for category, value in data.get("categories", {}).items()}
+    }
+
+
+def page_budget(page, budgets):
+    # En uzun (en özel) eşleşen desen kazanır
+    matches = [pattern for pattern in budgets["pages"] if fnmatch(page, pattern)]
+    if matches:
+        return budgets["pages"][max(matches, key=len)]
+    return budgets["page"]
+
+
+def find_pages(index):
+    return sorted(
+        file_path for file_path in index.files
+        if file_path.startswith(PAGES_DIR) and file_path.endswith(PAGE_EXTENSIONS)
+        and not file_path.startswith(PAGE_SKIP_PREFIXES)
+    )
+
+
+def image_candidates(url, mappings):
+    # Kaynaklar yeniden yazıldıktan sonra sayfanın yükleyeceği dosya: eşleştirmelerle çözülen
+    # (optimize, içerik özetli, kanonik) yol; henüz üretilmemişse resmin kendisi
+    url = url.split("?", 1)[0].split("#", 1)[0]
+    targets = [mappings.get(url, url), url]
+    return ["public" + target for target in dict.fromkeys(targets) if target.startswith("/images/")]
+
+
+def image_file(url, mappings, sizes):
+    # Diskte bulunan ilk aday; hiçbiri yoksa çözülen yol (boyutu bilinmiyor)
+    candidates = image_candidates(url, mappings)
+    if not candidates:
+        return None  # İndirilmemiş uzak URL
+    return next((path for path in candidates if path in sizes), candidates[0])
+
+
+def image_category(url, ref, categories):
+    # Optimize işinin kategorisi, yoksa optimize_images.py ile aynı tahmin
+    return categories.get(url) or file_content_map.get(ref.file) or guess_category(url, ref)
+
+
+def page_weights(index, mappings, categories, sizes):
+    # Sayfa -> {resim dosyası: (bayt, kategori, ilk referans)}; aynı resim sayfada bir kez sayılır
+    weights = {}
+    for page in find_pages(index):
+        images = {}
+        for file_path in sorted(index.reachable_files(page)):
+            for url, line, component in index.files[file_path]["refs"]:
+                path = image_file(url, mappings, sizes)
+                if path is None or path in images:
+                    continue
+                ref = ImageReference(file_path, line, component)
+                images[path] = (sizes.get(path), image_category(url, ref, categories), ref)
+        weights[page] = images
+    return weights
+
+
+def check(weights, budgets):
+    # Aşan her sayfa için (aşım, sayfa, toplam, bütçe, aşan kategoriler, en büyük resimler)
+    offenders = []
+    for page, images in weights.items():
+        total = sum(size or 0 for size, _, _ in images.values())
+        by_category = {}
+        for size, category, _ in images.values():
+            by_category[category] = by_category.get(category, 0) + (size or 0)
+
+        limit = page_budget(page, budgets)
+        categories_over = [
+            (category, size, budgets["categories"][category])
+            for category, size in sorted(by_category.items())
+            if category in budgets["categories"] and size > budgets["categories"][category]
+        ]
+        # Sıralama ölçütü: sayfa veya kategori bütçelerinden en çok aşılanı
+        overages = [size - category_limit for _, size, category_limit in categories_over]
+        if limit is not None:
+            overages.append(total - limit)
+        over = max([0] + overages)
+        if over:
+            largest = sorted(((size or 0, path, category, ref) for path, (size, category, ref) in images.items()),
+                             reverse=True)[:TOP_IMAGES]
+            offenders.append((over, page, total, limit, categories_over, largest))
+    offenders.sort(reverse=True)
+    return offenders
+
+
+def kb(size):
+    return f"{size / 1024:.1f} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sayfa başına resim baytlarını image_budgets.json bütçeleriyle karşılaştırır")
+    parser.add_argument("--budgets", default=str(BUDGETS_PATH), help="Bütçe dosyası (varsayılan: image_budgets.json)")
+    parser.add_argument("--verbose", action="store_true", help="Tüm sayfaların ağırlığını yazdır")
+    args = parser.parse_args()
+
+    from compare_sizes import scan_sizes
+    from manifest_store import ManifestStore
+    from path_rewriter import job_url_mapping
+
+    budgets = load_budgets(args.budgets)
+    index = load_index()
+    with ManifestStore() as store:
+        mappings = store.all_mappings()
+        categories = {job_url_mapping(job)[0]: job.get("category") for job in store.jobs()}
+
+    sizes = scan_sizes({path for entry in index.files.values() for ref in entry["refs"]
+                        for path in image_candidates(ref[0], mappings)})
+    weights = page_weights(index, mappings, categories, sizes)
+
+    if args.verbose:
+        for page, images in sorted(weights.items(), key=lambda item: -sum(s or 0 for s, _, _ in item[1].values())):
+            total = sum(size or 0 for size, _, _ in images.values())
+            print(f"{page:<45} {len(images):>3} resim  {kb(total):>12}")
+
+    missing = sorted({path for images in weights.values() for path, (size, _, _) in images.items() if size is None})
+    if missing:
+        print(f"Uyarı: sayfalarda kullanılan {len(missing)} resim dosyası bulunamadı"
+              + (":" if args.verbose else " (liste için --verbose)."))
+        if args.verbose:
+            for path in missing:
+                print(f"   {path}")
+
+    offenders = check(weights, budgets)
+    if not offenders:
+        print(f"{len(weights)} sayfanın tamamı resim bütçesi içinde.")
+        return
+
+    print(f"\n{len(offenders)} sayfa resim bütçesini aşıyor (aşım miktarına göre):")
+    for rank, (over, page, total, limit, categories_over, largest) in enumerate(offenders, 1):
+        limit_text = f" / {kb(limit)}" if limit is not None else ""
+        print(f"\n{rank}. {page}: {kb(total)}{limit_text} (aşım {kb(over)})")
+        for category, size, category_limit in categories_over:
+            print(f"   {category}: {kb(size)} / {kb(category_limit)}")
+        for size, path, category, ref in largest:
+            print(f"   - {path} {kb(size)} ({category}, {ref.file}:{ref.line})")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,250 @@
 import os
 import json
+import time
+import argparse
 from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-# Dosya yolları
-IMAGES_DIR = Path("public/images")
-OPTIMIZED_DIR = Path("public/images/optimized")
-
-# Optimizasyon komutlarını yükle
-with open("optimization_commands.json", 'r', encoding='utf-8') as f:
-    commands = json.load(f)
-
-# Toplam boyut tasarrufu
-total_original_size = 0
-total_optimized_size = 0
-savings_by_category = {}
-
-print("\nOptimizasyon Sonuçları:")
-print("-" * 80)
-print(f"{'Dosya Adı':<30} {'Kategori':<12} {'Orijinal':<10} {'Optimize':<10} {'Tasarruf':<10} {'Oran':<6}")
-print("-" * 80)
-
-for cmd in commands:
-    input_path = cmd['input']
-    output_path = cmd['output']
-    category = cmd['category']
-    
-    if os.path.exists(input_path) and os.path.exists(output_path):
-        original_size = os.path.getsize(input_path)
-        optimized_size = os.path.getsize(output_path)
-        
-        savings = original_size - optimized_size
-        savings_percent = (savings / original_size) * 100 if original_size > 0 else 0
-        
-        # Toplam istatistikleri güncelle
-        total_original_size += original_size
-        total_optimized_size += optimized_size
-        
-        # Kategori bazında istatistikleri güncelle
-        if category not in savings_by_category:
-            savings_by_category[category] = {
-                "original": 0,
-                "optimized": 0,
-                "count": 0
-            }
-        
-        savings_by_category[category]["original"] += original_size
-        savings_by_category[category]["optimized"] += optimized_size
-        savings_by_category[category]["count"] += 1
-        
-        # Sonuçları yazdır
-        print(f"{os.path.basename(input_path):<30} {category:<12} "
-              f"{original_size/1024:.1f} KB   {optimized_size/1024:.1f} KB   "
-              f"{savings/1024:.1f} KB    {savings_percent:.1f}%")
-
-# Toplam tasarruf
-total_savings = total_original_size - total_optimized_size
-total_savings_percent = (total_savings / total_original_size) * 100 if total_original_size > 0 else 0
-
-print("-" * 80)
-print(f"{'TOPLAM':<30} {'Tüm':<12} "
-      f"{total_original_size/1024:.1f} KB   {total_optimized_size/1024:.1f} KB   "
-      f"{total_savings/1024:.1f} KB    {total_savings_percent:.1f}%")
-print("-" * 80)
-
-# Kategori bazında sonuçlar
-print("\nKategori Bazında Sonuçlar:")
-print("-" * 80)
-print(f"{'Kategori':<12} {'Resim Sayısı':<12} {'Orijinal':<10} {'Optimize':<10} {'Tasarruf':<10} {'Oran':<6}")
-print("-" * 80)
-
-for category, stats in savings_by_category.items():
-    cat_original = stats["original"]
-    cat_optimized = stats["optimized"]
-    cat_savings = cat_original - cat_optimized
-    cat_savings_percent = (cat_savings / cat_original) * 100 if cat_original > 0 else 0
-    
-    print(f"{category:<12} {stats['count']:<12} "
-          f"{cat_original/1024:.1f} KB   {cat_optimized/1024:.1f} KB   "
-          f"{cat_savings/1024:.1f} KB    {cat_savings_percent:.1f}%")
-
-print("-" * 80)
+from image_probe import ProbeIndex
+from manifest_store import ManifestStore, normalize_path
+
+# En çok büyüyen kaç resim gösterilsin
+DEFAULT_TOP = 10
+
+FORMAT_BY_EXTENSION = {".avif": "avif", ".webp": "webp", ".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png"}
+
+
+def scan_directory(directory):
+    # Dizindeki tüm dosyaların boyutları tek scandir taramasıyla
+    sizes = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    sizes[Path(directory, entry.name).as_posix()] = entry.stat().st_size
+    except OSError:
+        pass
+    return sizes
+
+
+def scan_sizes(paths, workers=None):
+    # Dosya başına stat yerine, geçen dizinler paralel olarak bir kez taranır
+    directories = sorted({os.path.dirname(path) for path in paths})
+    sizes = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(scan_directory, directories):
+            sizes.update(result)
+    return sizes
+
+
+def collect(store, workers=None):
+    # Manifest deposundaki işler ve varyantlar + diskteki güncel boyutlar
+    jobs = [job for job in store.jobs() if "width" in job]
+    variants_by_output = store.variants_by_output()
+
+    files = []
+    for job in jobs:
+        output = normalize_path(job["output"])
+        variants = variants_by_output.get(output)
+        if not variants:
+            # Varyantı kaydedilmemiş eski iş: sadece ana çıktı
+            path = normalize_path(job.get("published", job["output"]))
+            variants = [{"path": path, "format": job["format"], "width": None, "height": None, "bytes": None}]
+        files += variants
+
+    sizes = scan_sizes([normalize_path(job["input"]) for job in jobs] + [v["path"] for v in files], workers)
+
+    # Boyutu depodakinden farklı (veya bilinmeyen) dosyaların ölçüleri başlık indeksinden okunur
+    probes = ProbeIndex()
+    for variant in files:
+        if variant["path"] in sizes and (variant["bytes"] != sizes[variant["path"]] or not variant["width"]):
+            info = probes.get(variant["path"])
+            if info:
+                variant["width"], variant["height"] = info["width"], info["height"]
+    probes.save()
+    return jobs, variants_by_output, sizes
+
+
+def build_report(jobs, variants_by_output, sizes):
+    images = []
+    categories = defaultdict(lambda: {"count": 0, "original": 0, "optimized": 0, "variant_bytes": 0})
+    formats = defaultdict(lambda: {"files": 0, "bytes": 0})
+    widths = defaultdict(lambda: {"files": 0, "bytes": 0})
+    missing = 0
+
+    for job in jobs:
+        input_path = normalize_path(job["input"])
+        primary = normalize_path(job.get("published", job["output"]))
+        original = sizes.get(input_path)
+        optimized = sizes.get(primary)
+        if original is None or optimized is None:
+            missing += 1
+            continue
+
+        variants = variants_by_output.get(normalize_path(job["output"])) or [
+            {"path": primary, "format": job["format"], "width": None}]
+        variant_bytes = 0
+        for variant in variants:
+            size = sizes.get(variant["path"])
+            if size is None:
+                continue
+            fmt = variant["format"] or FORMAT_BY_EXTENSION.get(os.path.splitext(variant["path"])[1], "?")
+            variant_bytes += size
+            formats[fmt]["files"] += 1
+            formats[fmt]["bytes"] += size
+            width = str(variant["width"] or "?")
+            widths[width]["files"] += 1
+            widths[width]["bytes"] += size
+
+        category = categories[job["category"]]
+        category["count"] += 1
+        category["original"] += original
+        category["optimized"] += optimized
+        category["variant_bytes"] += variant_bytes
+        images.append({
+            "input": input_path,
+            "output": primary,
+            "category": job["category"],
+            "original": original,
+            "optimized": optimized,
+            "variant_bytes": variant_bytes,
+            "variants": len(variants)
+        })
+
+    original = sum(image["original"] for image in images)
+    optimized = sum(image["optimized"] for image in images)
+    totals = {
+        "images": len(images),
+        "missing": missing,
+        "original": original,
+        "optimized": optimized,
+        "saved": original - optimized,
+        "variant_files": sum(f["files"] for f in formats.values()),
+        "variant_bytes": sum(f["bytes"] for f in formats.values())
+    }
+    return {
+        "totals": totals,
+        "categories": dict(categories),
+        "formats": dict(formats),
+        "widths": dict(sorted(widths.items(), key=lambda item: int(item[0]) if item[0].isdigit() else 1 << 30)),
+        "images": images
+    }
+
+
+def compare_with_previous(report, previous_run, previous_images, top=DEFAULT_TOP):
+    # Toplam farkları ve optimize boyutu en çok büyüyen resimler
+    if previous_run:
+        before = previous_run["totals"]
+        report["previous"] = previous_run
+        report["delta"] = {key: value - before.get(key, 0) for key, value in report["totals"].items()}
+
+    regressions = []
+    for image in report["images"]:
+        before = previous_images.get(image["input"])
+        if before is not None and image["optimized"] > before:
+            regressions.append({"input": image["input"], "category": image["category"],
+                                "before": before, "after": image["optimized"],
+                                "delta": image["optimized"] - before})
+    regressions.sort(key=lambda r: r["delta"], reverse=True)
+    report["regressions"] = regressions[:top]
+    report["new_images"] = sum(1 for image in report["images"] if image["input"] not in previous_images)
+    return report
+
+
+def percent(saved, original):
+    return (saved / original) * 100 if original > 0 else 0
+
+
+def kb(size):
+    return f"{size / 1024:.1f} KB"
+
+
+def signed_kb(size):
+    return f"{'+' if size > 0 else ''}{size / 1024:.1f} KB"
+
+
+def print_report(report, details=True):
+    totals = report["totals"]
+    if details:
+        print("\nOptimizasyon Sonuçları:")
+        print("-" * 80)
+        print(f"{'Dosya Adı':<30} {'Kategori':<12} {'Orijinal':<10} {'Optimize':<10} {'Tasarruf':<10} {'Oran':<6}")
+        print("-" * 80)
+        for image in report["images"]:
+            saved = image["original"] - image["optimized"]
+            print(f"{os.path.basename(image['input']):<30} {image['category']:<12} "
+                  f"{kb(image['original']):<10} {kb(image['optimized']):<10} "
+                  f"{kb(saved):<10} {percent(saved, image['original']):.1f}%")
+        print("-" * 80)
+
+    print(f"{'TOPLAM':<30} {'Tüm':<12} {kb(totals['original']):<10} {kb(totals['optimized']):<10} "
+          f"{kb(totals['saved']):<10} {percent(totals['saved'], totals['original']):.1f}%")
+    if totals["missing"]:
+        print(f"{totals['missing']} işin kaynağı veya çıktısı bulunamadı.")
+
+    print("\nKategori Bazında Sonuçlar:")
+    print("-" * 80)
+    print(f"{'Kategori':<12} {'Resim Sayısı':<12} {'Orijinal':<10} {'Optimize':<10} {'Tasarruf':<10} "
+          f"{'Oran':<6} {'Tüm varyantlar'}")
+    print("-" * 80)
+    for category, stats in sorted(report["categories"].items()):
+        saved = stats["original"] - stats["optimized"]
+        print(f"{category:<12} {stats['count']:<12} {kb(stats['original']):<10} {kb(stats['optimized']):<10} "
+              f"{kb(saved):<10} {percent(saved, stats['original']):<6.1f} {kb(stats['variant_bytes'])}")
+
+    print("\nFormat Bazında:")
+    for fmt, stats in sorted(report["formats"].items(), key=lambda item: -item[1]["bytes"]):
+        print(f"  {fmt:<8} {stats['files']:>6} dosya  {kb(stats['bytes']):>12}")
+    print("\nGenişlik Bazında:")
+    for width, stats in report["widths"].items():
+        print(f"  {width + 'w':<8} {stats['files']:>6} dosya  {kb(stats['bytes']):>12}")
+    print(f"\nToplam {totals['variant_files']} varyant dosyası, {kb(totals['variant_bytes'])}")
+
+    if "delta" in report:
+        delta = report["delta"]
+        created = time.strftime("%Y-%m-%d %H:%M", time.localtime(report["previous"]["created"]))
+        print(f"\nÖnceki çalıştırmaya göre ({created}):")
+        print(f"  resim: {delta['images']:+d} ({report['new_images']} yeni), "
+              f"optimize: {signed_kb(delta['optimized'])}, tüm varyantlar: {signed_kb(delta['variant_bytes'])}")
+    if report.get("regressions"):
+        print("\nEn çok büyüyen resimler:")
+        for regression in report["regressions"]:
+            print(f"  {regression['input']:<50} {kb(regression['before']):>10} -> {kb(regression['after']):>10} "
+                  f"({signed_kb(regression['delta'])})")
+    print("-" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize edilmiş resimlerin boyut ve tasarruf raporu")
+    parser.add_argument("--json", metavar="DOSYA",
+                        help="Raporu JSON olarak yaz (gösterge panelleri için; '-' standart çıktı)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="Gösterilecek en çok büyüyen resim sayısı (varsayılan: 10)")
+    parser.add_argument("--summary", action="store_true", help="Resim başına satırları yazdırma")
+    parser.add_argument("--no-save", action="store_true", help="Bu çalıştırmayı geçmişe kaydetme")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Paralel tarama iş parçacığı sayısı (varsayılan: otomatik)")
+    args = parser.parse_args()
+
+    with ManifestStore() as store:
+        jobs, variants_by_output, sizes = collect(store, args.workers)
+        report = build_report(jobs, variants_by_output, sizes)
+        report["created"] = time.time()
+        compare_with_previous(report, store.last_size_run(), store.size_run_images(), args.top)
+        if not args.no_save:
+            store.record_size_run(report["created"], report["totals"],
+                                  {image["input"]: image["optimized"] for image in report["images"]})
+
+    if args.json == "-":
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    print_report(report, details=not args.summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Rapor {args.json} dosyasına kaydedildi.")
+
+
+if __name__ == "__main__":
+    main()
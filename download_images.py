@@ -1,119 +1,145 @@
-import os
-import re
-import requests
-import json
+import time
+import argparse
 from pathlib import Path
 from urllib.parse import urlparse
 
+from pipeline_trace import add_trace_arguments, start_from_args, finish_from_args
+
 # Resimlerin indirileceği klasör
 IMAGES_DIR = Path("public/images")
-IMAGES_DIR.mkdir(exist_ok=True)
-
-# Pexels URL'lerini içeren dosyalar
-files_to_check = [
-    "src/pages/artist/[id].tsx",
-    "src/pages/generate/video.tsx",
-    "src/data/artStyles.ts",
-    "src/data/artModules.ts",
-    "src/components/sections/Hero.tsx",
-    "src/components/sections/Gallery.tsx",
-    "Home.tsx"  # Kök dizindeki dosya
-]
-
-# URL'leri ve dosya yollarını saklamak için bir sözlük
-url_to_path = {}
-url_to_files = {}
-
-# URL'leri bul
-for file_path in files_to_check:
-    if not os.path.exists(file_path):
-        print(f"Dosya bulunamadı: {file_path}")
-        continue
-        
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-        
-    # URL'leri bul
-    pattern = r'https://images\.pexels\.com/photos/[^"\'\s)]*'
-    urls = re.findall(pattern, content)
-    
-    for url in urls:
-        if url not in url_to_files:
-            url_to_files[url] = []
-        url_to_files[url].append(file_path)
 
-print(f"Toplam {len(url_to_files)} benzersiz resim URL'si bulundu.")
 
-# Resimleri indir ve dosya yollarını oluştur
-for url, files in url_to_files.items():
-    # URL'den dosya adını çıkar
+def find_pexels_urls(index):
+    # URL'leri ve geçtikleri dosyaları referans indeksinden al
+    url_to_files = {}
+    for url, refs in index.pexels_urls().items():
+        url_to_files[url] = sorted({ref.file for ref in refs})
+
+    print(f"Toplam {len(url_to_files)} benzersiz resim URL'si bulundu.")
+    return url_to_files
+
+
+def local_filename_for(url):
+    # URL'den yerel dosya adını çıkar
     parsed_url = urlparse(url)
     path_parts = parsed_url.path.split('/')
-    
-    # Pexels ID'sini bul
+
+    # Pexels ID'sini bul: /photos/<id>/ dizini, yoksa pexels-photo-<id> dosya adı
+    # (/photos/20072/pexels-photo.jpg gibi adlar hepsi pexels-pexels-photo.jpg olmasın)
     pexels_id = None
+    if "photos" in path_parts and path_parts.index("photos") + 1 < len(path_parts):
+        candidate = path_parts[path_parts.index("photos") + 1]
+        if candidate.isdigit():
+            pexels_id = candidate
     for part in path_parts:
+        if pexels_id:
+            break
         if "pexels-photo" in part:
             pexels_id = part.replace("pexels-photo-", "").replace(".jpeg", "").replace(".jpg", "")
             break
-    
+
     if not pexels_id:
         pexels_id = path_parts[-1].split('.')[0]  # Son kısmı al
-    
+
     # Dosya uzantısını belirle
     extension = ".jpg"
     if ".jpeg" in url:
         extension = ".jpeg"
     elif ".png" in url:
         extension = ".png"
-    
-    # Yerel dosya adını oluştur
-    local_filename = f"pexels-{pexels_id}{extension}"
-    local_path = IMAGES_DIR / local_filename
-    
-    # URL'yi yerel dosya yoluna eşle
-    url_to_path[url] = f"/images/{local_filename}"
-    
-    # Dosya zaten varsa indirme
-    if local_path.exists():
-        print(f"Dosya zaten var: {local_path}")
-        continue
-    
-    # Resmi indir
-    try:
-        print(f"İndiriliyor: {url}")
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        with open(local_path, 'wb') as out_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                out_file.write(chunk)
-        
-        print(f"İndirildi: {local_path}")
-    except Exception as e:
-        print(f"Hata: {url} indirilirken bir sorun oluştu: {e}")
-
-# Eşleştirme sözlüğünü JSON olarak kaydet
-with open("url_mapping.json", 'w', encoding='utf-8') as f:
-    json.dump(url_to_path, f, indent=2, ensure_ascii=False)
-
-print(f"URL eşleştirmeleri url_mapping.json dosyasına kaydedildi.")
-
-# Dosyalardaki URL'leri değiştir
-for file_path in files_to_check:
-    if not os.path.exists(file_path):
-        continue
-        
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    
-    # Her URL'yi yerel dosya yoluyla değiştir
-    for url, local_path in url_to_path.items():
-        content = content.replace(url, local_path)
-    
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write(content)
-    
-    print(f"Dosya güncellendi: {file_path}")
-
-print("İşlem tamamlandı!")
+
+    return f"pexels-{pexels_id}{extension}"
+
+
+def rewrite_sources(index, url_to_path):
+    # URL geçen dosyalarda tek taramada yerel dosya yollarıyla değiştir
+    from path_rewriter import PathRewriter
+
+    PathRewriter(url_to_path).rewrite_files(index.files_referencing(url_to_path))
+
+
+def main():
+    from image_fetcher import (DEFAULT_CONCURRENCY, DEFAULT_RETRIES,
+                               download_all, cache_stats)
+    from image_index import load_index
+    from manifest_store import ManifestStore
+
+    parser = argparse.ArgumentParser(description="Pexels resimlerini indirir ve yolları yerelleştirir")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Aynı anda yapılacak en fazla indirme sayısı")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="Başarısız indirmeler için tekrar deneme sayısı")
+    parser.add_argument("--refresh", action="store_true",
+                        help="İndirilmiş resimleri koşullu istekle (ETag/Last-Modified) yeniden doğrula; "
+                             "sadece değişenler aktarılır")
+    parser.add_argument("--origin", default=None,
+                        help="İstekleri bu sunucuya yönlendir (ör. http://127.0.0.1:8000 yerel test sunucusu)")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    IMAGES_DIR.mkdir(exist_ok=True)
+    index = load_index()
+    store = ManifestStore()
+
+    # Önceki çalıştırmaların eşleştirmelerini koru (URL'ler artık kaynakta olmayabilir)
+    url_to_path = store.mapping("url")
+    http_cache = store.http_cache()
+    downloads = []
+    seen_paths = set()
+
+    # Kaynaktaki URL'ler yerel yollarla değiştirildiği için yeniden doğrulanacak URL'ler
+    # eşleştirmelerden de alınır
+    urls = list(find_pexels_urls(index))
+    if args.refresh:
+        urls = list(dict.fromkeys(urls + sorted(url_to_path)))
+
+    for url in urls:
+        local_filename = local_filename_for(url)
+        local_path = IMAGES_DIR / local_filename
+
+        # Daha önce indirilmiş (veya image_dedup.py ile kanonik kaynağa yönlendirilmiş)
+        # URL'leri tekrar indirme; --refresh ile kendi dosyasına inenler yeniden doğrulanır
+        existing = url_to_path.get(url)
+        if existing and (IMAGES_DIR / existing[len("/images/"):]).exists():
+            if not args.refresh or existing != f"/images/{local_filename}":
+                continue
+        else:
+            # URL'yi yerel dosya yoluna eşle
+            url_to_path[url] = f"/images/{local_filename}"
+            if local_path.exists() and not args.refresh:
+                print(f"Dosya zaten var: {local_path}")
+                continue
+
+        # Aynı dosya kuyruktaysa indirme
+        if local_path in seen_paths:
+            continue
+        seen_paths.add(local_path)
+        downloads.append((url, local_path, http_cache.get(url)))
+
+    results, failures = download_all(downloads, concurrency=args.concurrency, retries=args.retries,
+                                     origin=args.origin)
+    store.record_http_results(results, time.time())
+    if results:
+        stats = cache_stats(results)
+        print(f"HTTP önbelleği: {stats['requests']} istek, {stats['not_modified']} değişmedi (304), "
+              f"{stats['unchanged']} aynı içerik, {stats['updated']} güncellendi, {stats['new']} yeni; "
+              f"aktarılan {stats['transferred'] / 1024:.1f} KB, 304 ile aktarılmayan {stats['saved'] / 1024:.1f} KB")
+
+    # Eşleştirmeleri depoya kaydet ve url_mapping.json dosyasını güncelle
+    store.set_mappings("url", url_to_path)
+    store.export()
+    store.close()
+
+    print(f"URL eşleştirmeleri url_mapping.json dosyasına kaydedildi.")
+
+    rewrite_sources(index, url_to_path)
+
+    if failures:
+        print(f"{len(failures)} resim indirilemedi.")
+    finish_from_args(args)
+    print("İşlem tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from pipeline_trace import span, count, add_trace_arguments, start_from_args, finish_from_args
+
+try:
+    from fontTools import subset
+except ImportError:  # pip install fonttools brotli
+    subset = None
+
+# Alt kümesi alınacak fontlar ve alt küme çıktıları
+FONTS_DIR = Path("public/fonts")
+FONT_PATTERN = "inter-*.woff2"
+SUBSET_DIR = Path("public/fonts/subset")
+
+# @font-face tanımları; alt kümeler üretilince url'ler alt küme yollarına çevrilir
+FONT_CSS_PATH = Path("src/styles/fonts.css")
+
+# İndeks köklerinin dışında kalan ve metin içeren dosyalar
+EXTRA_TEXT_FILES = ["index.html"]
+
+# Kaynakta geçmese de her zaman tutulan karakterler: ASCII, Türkçe harfler ve tipografik
+# noktalama (kullanıcı içeriği ve veritabanından gelen başlıklar için)
+BASE_CHARACTERS = (
+    "".join(chr(code) for code in range(0x20, 0x7F))
+    + "çğıöşüÇĞİÖŞÜâîûÂÎÛéèêëàáäÉÈÀÁÄñÑ"
+    + " –—‘’‚“”„…•·«»‹›€₺£©®™°±×÷"
+)
+
+CACHE_PATH = Path(".cache/font_subset.json")
+CACHE_VERSION = 1
+
+
+def collect_characters(index, extra_files=EXTRA_TEXT_FILES):
+    characters = set(BASE_CHARACTERS) | index.characters()
+    for path in extra_files:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                characters.update(char for char in f.read() if char.isprintable())
+    return "".join(sorted(characters))
+
+
+def charset_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def subset_font(source, output, text):
+    # Yerleşim özellikleri (kerning, ligatürler) korunur; sadece kullanılmayan glifler atılır
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    options.notdef_outline = True
+
+    font = subset.load_font(str(source), options)
+    glyphs_before = font["maxp"].numGlyphs
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_suffix(".tmp")
+    subset.save_font(font, str(tmp_path), options)
+    os.replace(tmp_path, output)
+    return glyphs_before, font["maxp"].numGlyphs
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("fonts", {}) if data.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(fonts, path=CACHE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": CACHE_VERSION, "fonts": fonts}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def rewrite_font_css(fonts, css_path=FONT_CSS_PATH):
+    # url('/fonts/inter-regular.woff2') -> url('/fonts/subset/inter-regular.woff2')
+    if not css_path.exists():
+        return False
+    with open(css_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    updated = content
+    for source in fonts:
+        public_source = "/" + source.relative_to("public").as_posix()
+        public_subset = "/" + (SUBSET_DIR / source.name).relative_to("public").as_posix()
+        updated = re.sub(r"(url\(\s*['\"]?)" + re.escape(public_source) + r"(?=['\"]?\s*\))",
+                         lambda m: m.group(1) + public_subset, updated)
+    if updated == content:
+        return False
+    with open(css_path, 'w', encoding='utf-8') as f:
+        f.write(updated)
+    return True
+
+
+def subset_fonts(index, fonts_dir=FONTS_DIR, force=False):
+    # Karakter kümesi ve kaynak font değişmediyse ve çıktı yerindeyse alt küme yeniden üretilmez
+    if subset is None:
+        print("fontTools bulunamadı (pip install fonttools brotli); font alt kümeleri üretilmedi.")
+        return False
+
+    text = collect_characters(index)
+    digest = charset_hash(text)
+    fonts = sorted(Path(fonts_dir).glob(FONT_PATTERN))
+    cached = load_cache()
+
+    entries = {}
+    subsetted = 0
+    for source in fonts:
+        output = SUBSET_DIR / source.name
+        source_sha = file_sha256(source)
+        entry = cached.get(source.as_posix())
+        if (not force and entry and entry["charset"] == digest and entry["source_sha256"] == source_sha
+                and output.exists() and os.path.getsize(output) == entry["bytes"]):
+            entries[source.as_posix()] = entry
+            continue
+
+        with span("subset", file=source.as_posix()):
+            glyphs_before, glyphs_after = subset_font(source, output, text)
+        subsetted += 1
+        entries[source.as_posix()] = {
+            "charset": digest,
+            "source_sha256": source_sha,
+            "output": output.as_posix(),
+            "bytes": os.path.getsize(output),
+            "glyphs": [glyphs_before, glyphs_after]
+        }
+    save_cache(entries)
+    count("subset.fonts", subsetted)
+
+    print(f"Font alt kümesi: {len(text)} karakter, {len(fonts)} font, {subsetted} font yeniden üretildi.")
+    for source in fonts:
+        entry = entries[source.as_posix()]
+        original = os.path.getsize(source)
+        glyphs_before, glyphs_after = entry["glyphs"]
+        print(f"  {source.name:<24} {original / 1024:>7.1f} KB -> {entry['bytes'] / 1024:>7.1f} KB "
+              f"({glyphs_before} -> {glyphs_after} glif)")
+
+    if fonts and rewrite_font_css(fonts):
+        print(f"{FONT_CSS_PATH} alt küme yollarına güncellendi.")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="public/fonts altındaki Inter fontlarını kaynakta kullanılan karakterlere indirger")
+    parser.add_argument("--force", action="store_true", help="Önbelleği yok say ve tüm alt kümeleri yeniden üret")
+    parser.add_argument("--print-charset", action="store_true", help="Toplanan karakter kümesini yazdır ve çık")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    from image_index import load_index
+
+    index = load_index()
+    if args.print_charset:
+        print(collect_characters(index))
+        return
+    if not subset_fonts(index, force=args.force):
+        sys.exit(1)
+    finish_from_args(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import os
+import re
+import hashlib
+from pathlib import Path
+
+from path_rewriter import public_url
+
+# İçerik özetli çıktı adları: x.webp -> hashed/x.<10 hane özet>.webp; ayrı alt dizin
+# sayesinde immutable kuralı aynı dizinde kalan özetsiz (değişebilen) dosyalara uygulanmaz
+HASH_LENGTH = 10
+HASHED_DIR_NAME = "hashed"
+HASHED_NAME_PATTERN = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<ext>\.\w+)$" % HASH_LENGTH)
+
+# netlify.toml içinde bu betiklerin yönettiği bölüm
+NETLIFY_CONFIG_PATH = "netlify.toml"
+NETLIFY_BLOCK_START = "# >>> immutable image cache (hashed_assets.py tarafından üretilir)"
+NETLIFY_BLOCK_END = "# <<< immutable image cache"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def hashed_dir(directory):
+    return Path(directory, HASHED_DIR_NAME).as_posix()
+
+
+def hashed_path(path, digest):
+    directory, name = os.path.split(path)
+    root, ext = os.path.splitext(name)
+    return Path(hashed_dir(directory), f"{root}.{digest}{ext}").as_posix()
+
+
+def logical_path(path):
+    # hashed/x.<özet>.webp -> x.webp (özetsiz adlar olduğu gibi döner)
+    directory, name = os.path.split(path)
+    match = HASHED_NAME_PATTERN.match(name)
+    if not match or os.path.basename(directory) != HASHED_DIR_NAME:
+        return path
+    return os.path.join(os.path.dirname(directory), match["stem"] + match["ext"]).replace("\\", "/")
+
+
+def publish_hashed(encoded):
+    # Kodlanmış format dosyalarını içerik özetli adlarına taşı (işçide çalışır)
+    for entry in encoded.values():
+        target = hashed_path(entry["path"], content_hash(entry["path"]))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(entry["path"], target)
+        entry["path"] = target
+    return encoded
+
+
+def live_paths(results):
+    return {
+        encoded["path"]
+        for result in results
+        for variant in result.get("variants", [])
+        for encoded in variant.get("formats", {"": variant}).values()
+    }
+
+
+def failed_job_paths(jobs, results):
+    # Bu çalıştırmada sonucu olmayan (kodlaması başarısız) işlerin yayımlanmış özetli
+    # dosyaları: ana çıktı ve x-640w varyantları, her formatta. Yeni sonuç gelene kadar
+    # silinmez ve eşleştirmeleri korunur
+    produced = {Path(result["output"]).as_posix() for result in results}
+    roots = {os.path.splitext(Path(job["output"]).as_posix())[0]
+             for job in jobs if Path(job["output"]).as_posix() not in produced}
+
+    paths = set()
+    for directory in {hashed_dir(os.path.dirname(root)) for root in roots}:
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            path = Path(directory, entry.name).as_posix()
+            logical = logical_path(path)
+            if entry.is_file() and logical != path and \
+                    re.sub(r"-\d+w$", "", os.path.splitext(logical)[0]) in roots:
+                paths.add(path)
+    return paths
+
+
+def current_paths(jobs, results):
+    # Korunan tüm dosyalar ve özetsiz yol -> güncel özetli yol; başarısız işlerin birden
+    # fazla özetli sürümü varsa en yenisi güncel sayılır
+    kept = failed_job_paths(jobs, results)
+    live = live_paths(results)
+    current_by_logical = {logical_path(path): path for path in sorted(kept, key=os.path.getmtime)}
+    current_by_logical.update((logical_path(path), path) for path in live)
+    return live | kept, current_by_logical
+
+
+def collect_garbage(jobs, results):
+    # Özetli dizinlerde artık kullanılmayan dosyaları ve özetli karşılığı olan eski özetsiz
+    # çıktıları sil; (silinen yol, güncel yol) çiftlerini döndür
+    live, current_by_logical = current_paths(jobs, results)
+    directories = {os.path.dirname(path) for path in live} | {os.path.dirname(path) for path in current_by_logical}
+
+    removed = []
+    for directory in directories:
+        for entry in os.scandir(directory):
+            path = Path(directory, entry.name).as_posix()
+            if not entry.is_file() or path in live:
+                continue
+            logical = logical_path(path)
+            if logical == path and path not in current_by_logical:
+                continue  # Özetsiz ve özetli karşılığı olmayan dosyalara dokunma
+            os.remove(path)
+            removed.append((path, current_by_logical.get(logical)))
+    return removed
+
+
+def update_hashed_mapping(jobs, results, removed):
+    # Özetsiz adları ve silinen eski özetli adları güncel dosyaya yönlendir
+    # (kaynakta kalmış eski yollar update_image_paths.py ile güncellenir)
+    from manifest_store import ManifestStore
+
+    _, current_by_logical = current_paths(jobs, results)
+    mapping = {}
+    for logical, current in sorted(current_by_logical.items()):
+        if logical != current:
+            mapping[public_url(logical)] = public_url(current)
+    for old, current in removed:
+        if current:
+            mapping[public_url(old)] = public_url(current)
+
+    with ManifestStore() as store:
+        store.set_mappings("hashed", mapping)
+        store.export()
+    return mapping
+
+
+def netlify_rule_url(directory):
+    return public_url(str(directory).replace("\\", "/")).rstrip("/") + "/*"
+
+
+def update_netlify_headers(output_dirs, enabled=True, path=NETLIFY_CONFIG_PATH):
+    # Çıktı dizinlerinin özetli alt dizinleri için bir yıllık immutable önbellek kuralları.
+    # Bölümdeki diğer betiklerin kuralları korunur; özetli adlar kapalıysa bu dizinlerin
+    # kuralları (ve boş kalan bölüm) silinir
+    content = Path(path).read_text(encoding='utf-8') if os.path.exists(path) else ""
+    pattern = re.compile(r"\n*" + re.escape(NETLIFY_BLOCK_START) + r".*?" + re.escape(NETLIFY_BLOCK_END) + r"\n*",
+                         re.DOTALL)
+    match = pattern.search(content)
+    urls = set(re.findall(r'^\s*for = "([^"]+)"', match.group(0), re.MULTILINE)) if match else set()
+
+    for directory in output_dirs:
+        # Eski sürümün dizinin tamamını kapsayan kuralı da kaldırılır
+        urls.discard(netlify_rule_url(directory))
+        urls.discard(netlify_rule_url(hashed_dir(directory)))
+        if enabled:
+            urls.add(netlify_rule_url(hashed_dir(directory)))
+
+    rules = []
+    for url in sorted(urls):
+        rules += [
+            "[[headers]]",
+            f'  for = "{url}"',
+            "  [headers.values]",
+            f'    Cache-Control = "{IMMUTABLE_CACHE_CONTROL}"',
+            ""
+        ]
+    block = "\n".join([NETLIFY_BLOCK_START] + rules[:-1] + [NETLIFY_BLOCK_END]) if rules else ""
+
+    if match:
+        before, after = content[:match.start()], content[match.end():]
+    else:
+        before, after = content, ""
+    parts = [part for part in (before.rstrip("\n"), block, after.rstrip("\n")) if part]
+    new_content = "\n\n".join(parts) + "\n" if parts else ""
+
+    if new_content != content:
+        Path(path).write_text(new_content, encoding='utf-8')
+        if block:
+            print(f"{path}: {len(urls)} dizin için immutable önbellek kuralı yazıldı.")
+        else:
+            print(f"{path}: immutable önbellek kuralları kaldırıldı.")
+
+
+def publish_results(jobs, results, output_dirs):
+    # Eski özetli dosyaları topla, eşleştirmeyi ve netlify.toml kurallarını güncelle
+    removed = collect_garbage(jobs, results)
+    update_hashed_mapping(jobs, results, removed)
+    update_netlify_headers(output_dirs)
+    if removed:
+        print(f"{len(removed)} eski çıktı dosyası silindi.")
+    return removed
@@ -0,0 +1,310 @@
+import os
+import math
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from pipeline_trace import span, count, add_trace_arguments, start_from_args, finish_from_args
+from image_probe import ProbeIndex, display_size
+from image_encoder import FORMAT_EXTENSIONS, save_image, open_for_width, resize_to_width
+from manifest_store import ManifestStore, normalize_path, write_json_atomic
+from path_rewriter import public_url
+
+# Atlasa alınan küçük resimler: ikon dizinlerindeki dosyalar ve bu kategorilerdeki işlerin
+# en küçük varyantları
+ICON_DIRS = ["public/icons"]
+ICON_EXTENSIONS = {".png": "png", ".webp": "webp", ".avif": "avif", ".jpg": "jpeg", ".jpeg": "jpeg"}
+ATLAS_CATEGORIES = ["style", "thumbnail"]
+
+# İki kenarı da bu değerden küçük veya eşit resimler atlasa girer (px)
+MAX_MEMBER_SIZE = 256
+
+# Sayfa başına en büyük boyut ve resimler arası boşluk (filtrelemede komşu taşmasını önler)
+MAX_SHEET_SIZE = 2048
+PADDING = 2
+
+# Atlas kalitesi (AVIF farkı save_image içinde uygulanır); PNG kayıpsızdır
+ATLAS_QUALITY = 75
+
+ATLAS_DIR = Path("public/images/atlas")
+ATLAS_MAP_PATH = Path("public/image_atlas.json")
+
+# Üyelerin imzaları, yerleşim ve üretilen sayfalar
+CACHE_PATH = Path(".cache/image_atlas.json")
+CACHE_VERSION = 1
+
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def icon_members(directories=ICON_DIRS, max_size=MAX_MEMBER_SIZE):
+    probes = ProbeIndex()
+    members = []
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            fmt = ICON_EXTENSIONS.get(os.path.splitext(name)[1].lower())
+            path = Path(directory, name).as_posix()
+            if fmt is None:
+                continue
+            info = probes.get(path)
+            if info is None:
+                continue
+            width, height = display_size(info)
+            if width <= max_size and height <= max_size:
+                members.append({"key": public_url(path), "source": path, "format": fmt,
+                                "width": width, "height": height, "sha256": file_sha256(path)})
+    probes.save()
+    return members
+
+
+def variant_members(store, categories=ATLAS_CATEGORIES, max_size=MAX_MEMBER_SIZE):
+    # Her işin en küçük varyantı, her formatta ayrı üye; pikseller kaynaktan yeniden
+    # örneklenir (kayıplı varyantı tekrar kodlamamak için), imza varyantın özetidir
+    variants_by_output = store.variants_by_output()
+    members = []
+    for job in store.jobs():
+        if job.get("category") not in categories:
+            continue
+        variants = [v for v in variants_by_output.get(normalize_path(job["output"]), [])
+                    if v["width"] and v["height"] and v["sha256"]]
+        if not variants:
+            continue
+        smallest = min(v["width"] for v in variants)
+        for variant in variants:
+            if variant["width"] != smallest or max(variant["width"], variant["height"]) > max_size:
+                continue
+            members.append({"key": public_url(variant["path"]), "source": normalize_path(job["input"]),
+                            "format": variant["format"], "width": variant["width"],
+                            "height": variant["height"], "sha256": variant["sha256"]})
+    return members
+
+
+def sheet_width(sizes, max_size=MAX_SHEET_SIZE):
+    # Yaklaşık kare sayfa: toplam alanın karekökü, en geniş üyeden dar olmamak üzere
+    area = sum(w * h for w, h in sizes)
+    widest = max(w for w, _ in sizes)
+    return min(max_size, max(widest, 64 * math.ceil(math.sqrt(area * 1.1) / 64)))
+
+
+def skyline_position(skyline, width, height, sheet_w, max_height):
+    # Bottom-left: en alçak, eşitlikte en soldaki konum
+    best = None
+    for i, (x, _, _) in enumerate(skyline):
+        if x + width > sheet_w:
+            break
+        y, covered, j = 0, 0, i
+        while covered < width:
+            y = max(y, skyline[j][1])
+            covered += skyline[j][2] - (x - skyline[j][0] if j == i else 0)
+            j += 1
+        if y + height <= max_height and (best is None or (y, x) < best[:2]):
+            best = (y, x, i)
+    return best
+
+
+def skyline_place(skyline, x, y, width, height):
+    # [x, x+width) aralığını y+height yüksekliğinde yeni bir parçayla kapla
+    right = x + width
+    updated = []
+    for sx, sy, sw in skyline:
+        if sx + sw <= x or sx >= right:
+            updated.append((sx, sy, sw))
+            continue
+        if sx < x:
+            updated.append((sx, sy, x - sx))
+        if sx + sw > right:
+            updated.append((right, sy, sx + sw - right))
+    updated.append((x, y + height, width))
+    updated.sort()
+
+    # Aynı yükseklikteki komşuları birleştir
+    merged = [updated[0]]
+    for sx, sy, sw in updated[1:]:
+        px, py, pw = merged[-1]
+        if py == sy and px + pw == sx:
+            merged[-1] = (px, py, pw + sw)
+        else:
+            merged.append((sx, sy, sw))
+    return merged
+
+
+def pack(members, padding=PADDING, max_size=MAX_SHEET_SIZE):
+    # Uzundan kısaya sıralı skyline yerleşimi; sığmayan üye yeni sayfa açar.
+    # Dönüş: anahtar -> [sayfa, x, y]
+    items = sorted(members, key=lambda m: (-m["height"], -m["width"], m["key"]))
+    width = sheet_width([(m["width"] + padding, m["height"] + padding) for m in items], max_size)
+    sheets = []
+    layout = {}
+    for member in items:
+        w, h = member["width"] + padding, member["height"] + padding
+        for n, skyline in enumerate(sheets):
+            position = skyline_position(skyline, w, h, width, max_size)
+            if position:
+                break
+        else:
+            sheets.append([(0, 0, width)])
+            n, position = len(sheets) - 1, (0, 0, 0)
+        y, x, _ = position
+        sheets[n] = skyline_place(sheets[n], x, y, w, h)
+        layout[member["key"]] = [n, x, y]
+    return layout
+
+
+def sheet_digest(members, layout):
+    payload = sorted((m["key"], layout[m["key"]][1:], m["sha256"]) for m in members)
+    return hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()[:10]
+
+
+def load_member(member):
+    with open_for_width(member["source"], member["width"]) as img:
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA")
+        if img.size != (member["width"], member["height"]):
+            img = resize_to_width(img, member["width"])
+            if img.height != member["height"]:
+                img = img.resize((member["width"], member["height"]), Image.LANCZOS)
+        return img
+
+
+def render_sheet(fmt, members, layout, path):
+    width = max(layout[m["key"]][1] + m["width"] for m in members)
+    height = max(layout[m["key"]][2] + m["height"] for m in members)
+    # JPEG saydamlık taşımaz, boşluklar beyazla doldurulur
+    background = (255, 255, 255, 255) if fmt == "jpeg" else (0, 0, 0, 0)
+    sheet = Image.new("RGBA", (width, height), background)
+    for member in members:
+        with span("decode", file=member["source"]):
+            img = load_member(member)
+        sheet.alpha_composite(img, tuple(layout[member["key"]][1:]))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "jpeg":
+        sheet = sheet.convert("RGB")
+    save_image(sheet, path.as_posix(), fmt, ATLAS_QUALITY)
+    return width, height
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("groups", {}) if data.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(groups, path=CACHE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": CACHE_VERSION, "groups": groups}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def build_group(fmt, members, cached, force=False):
+    # Üye kümesi ve boyutları aynıysa yerleşim korunur; sadece üyesi değişen sayfalar yeniden çizilir
+    shape = sorted((m["key"], m["width"], m["height"]) for m in members)
+    if cached and not force and cached["shape"] == shape:
+        layout = cached["layout"]
+    else:
+        with span("atlas", format=fmt, members=len(members)):
+            layout = pack(members)
+
+    by_sheet = {}
+    for member in members:
+        by_sheet.setdefault(layout[member["key"]][0], []).append(member)
+    previous = {sheet["digest"]: sheet for sheet in (cached or {}).get("sheets", [])}
+
+    sheets = []
+    rendered = 0
+    for n in sorted(by_sheet):
+        digest = sheet_digest(by_sheet[n], layout)
+        path = ATLAS_DIR / f"atlas-{fmt}-{n}.{digest}{FORMAT_EXTENSIONS[fmt]}"
+        sheet = previous.get(digest)
+        if force or not sheet or not path.exists():
+            with span("atlas", format=fmt, sheet=n):
+                width, height = render_sheet(fmt, by_sheet[n], layout, path)
+            sheet = {"digest": digest, "width": width, "height": height}
+            rendered += 1
+        sheets.append(dict(sheet, path=path.as_posix(), bytes=os.path.getsize(path)))
+    return {"shape": shape, "layout": layout, "sheets": sheets}, rendered
+
+
+def remove_stale_sheets(groups, directory=ATLAS_DIR):
+    live = {sheet["path"] for group in groups.values() for sheet in group["sheets"]}
+    removed = 0
+    if directory.exists():
+        for entry in os.scandir(directory):
+            path = Path(directory, entry.name).as_posix()
+            if entry.is_file() and path not in live:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def atlas_map(groups, members):
+    # Ön yüz için: format -> sayfalar, resim URL'si -> sayfa içindeki dikdörtgen
+    images = {}
+    for member in members:
+        n, x, y = groups[member["format"]]["layout"][member["key"]]
+        images[member["key"]] = {"format": member["format"], "sheet": n, "x": x, "y": y,
+                                 "width": member["width"], "height": member["height"]}
+    return {
+        "sheets": {
+            fmt: [{"url": public_url(sheet["path"]), "width": sheet["width"], "height": sheet["height"]}
+                  for sheet in group["sheets"]]
+            for fmt, group in sorted(groups.items())
+        },
+        "images": dict(sorted(images.items()))
+    }
+
+
+def build_atlas(store, force=False, verbose=True):
+    members = icon_members() + variant_members(store)
+    by_format = {}
+    for member in members:
+        by_format.setdefault(member["format"], []).append(member)
+
+    cached = load_cache()
+    groups = {}
+    rendered = 0
+    for fmt, group_members in sorted(by_format.items()):
+        groups[fmt], n = build_group(fmt, group_members, cached.get(fmt), force)
+        rendered += n
+    save_cache(groups)
+    removed = remove_stale_sheets(groups)
+    write_json_atomic(ATLAS_MAP_PATH, atlas_map(groups, members))
+    count("atlas.sheets", rendered)
+
+    if verbose:
+        total = sum(len(group["sheets"]) for group in groups.values())
+        print(f"Atlas: {len(members)} küçük resim, {total} sayfa, {rendered} sayfa yeniden çizildi"
+              + (f", {removed} eski sayfa silindi." if removed else "."))
+        for fmt, group in groups.items():
+            for sheet in group["sheets"]:
+                print(f"  {sheet['path']:<55} {sheet['width']}x{sheet['height']} "
+                      f"{sheet['bytes'] / 1024:.1f} KB")
+        print(f"Koordinat haritası {ATLAS_MAP_PATH} dosyasına kaydedildi.")
+    return groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İkonları ve küçük resimleri format başına sprite sayfalarına paketler")
+    parser.add_argument("--force", action="store_true", help="Yerleşimi yeniden hesapla ve tüm sayfaları yeniden çiz")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    with ManifestStore() as store:
+        build_atlas(store, force=args.force)
+    finish_from_args(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import os
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from manifest_store import ManifestStore
+from path_rewriter import DUPLICATES_PATH, URL_MAPPING_PATH, public_url
+from pipeline_trace import span, count, add_trace_arguments, start_from_args, finish_from_args
+
+# Taranacak kaynak resimler (optimize çıktıları ve atlas sayfaları hariç)
+IMAGES_DIR = Path("public/images")
+SKIP_DIRS = {"optimized", "webp", "atlas"}
+RASTER_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+# Özet önbelleği
+HASH_CACHE_PATH = Path(".cache/image_hashes.json")
+HASH_VERSION = 1
+
+# pHash için 32x32 DCT'nin sol üst 8x8 bloğu, dHash için 9x8 gri resim
+PHASH_SIZE = 32
+HASH_SIZE = 8
+
+# İki resim, hem pHash hem dHash Hamming mesafesi bu değeri aşmıyorsa kopyadır
+DEFAULT_THRESHOLD = 6
+
+
+def iter_images(root=IMAGES_DIR):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() in RASTER_EXTENSIONS:
+                yield Path(dirpath, filename).as_posix()
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def load_thumbnail(path):
+    # Sadece özet için gereken boyutta çöz: JPEG'de DCT ölçekli gri ton
+    with Image.open(path) as img:
+        size = img.size
+        img.draft("L", (PHASH_SIZE * 2, PHASH_SIZE * 2))
+        img = ImageOps.exif_transpose(img).convert("L")
+        phash_input = np.asarray(img.resize((PHASH_SIZE, PHASH_SIZE), Image.BOX), dtype=np.float64)
+        dhash_input = np.asarray(img.resize((HASH_SIZE + 1, HASH_SIZE), Image.BOX), dtype=np.int16)
+    return size, phash_input, dhash_input
+
+
+def dct_matrix(n):
+    # DCT-II taban matrisi: D @ X @ D.T iki boyutlu dönüşümdür
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    return np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+
+
+def pack_bits(bits):
+    # (N, 64) bool -> N adet 64 bit tamsayı
+    packed = np.packbits(bits.astype(np.uint8), axis=1)
+    return [int.from_bytes(row.tobytes(), "big") for row in packed]
+
+
+def compute_hashes(phash_inputs, dhash_inputs):
+    # Tüm resimlerin özetlerini tek seferde vektörel hesapla
+    d = dct_matrix(PHASH_SIZE)
+    coeffs = np.einsum("kn,bnm,lm->bkl", d, np.stack(phash_inputs), d)
+    low = coeffs[:, :HASH_SIZE, :HASH_SIZE].reshape(len(phash_inputs), -1)
+    # DC katsayısı ortancayı bozmasın
+    medians = np.median(low[:, 1:], axis=1, keepdims=True)
+    phashes = pack_bits(low > medians)
+
+    gray = np.stack(dhash_inputs)
+    dhashes = pack_bits((gray[:, :, 1:] > gray[:, :, :-1]).reshape(len(dhash_inputs), -1))
+    return phashes, dhashes
+
+
+class BKTree:
+    # Hamming mesafesi için BK ağacı: eşik içindeki komşuları tüm listeyi taramadan bulur
+    def __init__(self):
+        self.root = None
+
+    def add(self, value, item):
+        node = [value, item, {}]
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, value, threshold):
+        matches = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_value, item, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= threshold:
+                matches.append((distance, item))
+            for child_distance, child in children.items():
+                if distance - threshold <= child_distance <= distance + threshold:
+                    stack.append(child)
+        return matches
+
+
+class HashStore:
+    def __init__(self, cache_path=HASH_CACHE_PATH):
+        self.cache_path = Path(cache_path)
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Özet önbelleği okunamadı, yeniden hesaplanacak: {e}")
+            return
+        if data.get("version") == HASH_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": HASH_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh(self, paths):
+        # Sadece mtime veya boyutu değişen resimleri çöz, özetleri topluca hesapla
+        stale = []
+        for path in paths:
+            stat = os.stat(path)
+            entry = self.entries.get(path)
+            if not entry or entry["mtime_ns"] != stat.st_mtime_ns or entry["bytes"] != stat.st_size:
+                stale.append((path, stat))
+        for path in set(self.entries) - set(paths):
+            del self.entries[path]
+
+        decoded = []
+        with span("dedup", images=len(stale)):
+            for path, stat in stale:
+                try:
+                    size, phash_input, dhash_input = load_thumbnail(path)
+                except (OSError, ValueError) as e:
+                    # Bozuk dosya değişene kadar tekrar denenmesin
+                    print(f"Atlandı: {path} okunamadı ({e})")
+                    self.entries[path] = {"mtime_ns": stat.st_mtime_ns, "bytes": stat.st_size, "error": str(e)}
+                    continue
+                decoded.append((path, stat, size, phash_input, dhash_input))
+
+            if decoded:
+                phashes, dhashes = compute_hashes([d[3] for d in decoded], [d[4] for d in decoded])
+                for (path, stat, size, _, _), phash, dhash in zip(decoded, phashes, dhashes):
+                    self.entries[path] = {
+                        "mtime_ns": stat.st_mtime_ns,
+                        "bytes": stat.st_size,
+                        "width": size[0],
+                        "height": size[1],
+                        "phash": f"{phash:016x}",
+                        "dhash": f"{dhash:016x}"
+                    }
+        count("dedup.hashed", len(decoded))
+        return len(decoded)
+
+
+def canonical_order(path, entry):
+    # Kanonik kaynak: en yüksek çözünürlük, sonra en büyük dosya, sonra en kısa ad
+    return (-entry["width"] * entry["height"], -entry["bytes"], len(path), path)
+
+
+def find_duplicates(entries, threshold=DEFAULT_THRESHOLD):
+    # Kopya grupları: pHash BK ağacında aranır, dHash ile doğrulanır
+    entries = {path: entry for path, entry in entries.items() if "error" not in entry}
+    tree = BKTree()
+    for path, entry in entries.items():
+        tree.add(int(entry["phash"], 16), path)
+
+    parent = {path: path for path in entries}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for path, entry in entries.items():
+        dhash = int(entry["dhash"], 16)
+        for _, other in tree.search(int(entry["phash"], 16), threshold):
+            if other != path and hamming(dhash, int(entries[other]["dhash"], 16)) <= threshold:
+                parent[find(other)] = find(path)
+
+    groups = {}
+    for path in entries:
+        groups.setdefault(find(path), []).append(path)
+    return [sorted(group, key=lambda p: canonical_order(p, entries[p]))
+            for group in groups.values() if len(group) > 1]
+
+
+def collapse_url_mapping(store, duplicates):
+    # Kopyaya işaret eden URL'leri kanonik kaynağa yönlendir
+    changed = {url: duplicates[local_path] for url, local_path in store.mapping("url").items()
+               if local_path in duplicates}
+    if changed:
+        store.set_mappings("url", changed)
+    return len(changed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="public/images altındaki kopya resimleri algısal özetle bulur")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help="Kopya sayılacak en büyük Hamming mesafesi (varsayılan: 6)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Sadece kopyaları listele, eşleştirme dosyalarını değiştirme")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    store = HashStore()
+    paths = sorted(iter_images())
+    hashed = store.refresh(paths)
+    store.save()
+    print(f"{len(paths)} resim tarandı, {hashed} resmin özeti hesaplandı.")
+
+    groups = find_duplicates(store.entries, args.threshold)
+    duplicates = {}
+    saved = 0
+    for canonical, *copies in groups:
+        print(f"\nKanonik: {canonical}")
+        for copy in copies:
+            distance = hamming(int(store.entries[canonical]["phash"], 16), int(store.entries[copy]["phash"], 16))
+            print(f"  kopya: {copy} (mesafe {distance}, {store.entries[copy]['bytes'] / 1024:.1f} KB)")
+            duplicates[public_url(copy)] = public_url(canonical)
+            saved += store.entries[copy]["bytes"]
+
+    print(f"\n{len(groups)} grupta {len(duplicates)} kopya bulundu ({saved / 1024:.1f} KB).")
+    if args.dry_run:
+        finish_from_args(args)
+        return
+
+    with ManifestStore() as manifest:
+        manifest.replace_mappings("duplicate", duplicates)
+        changed = collapse_url_mapping(manifest, duplicates)
+        manifest.export()
+    print(f"Kopya eşleştirmeleri {DUPLICATES_PATH} dosyasına kaydedildi.")
+    if changed:
+        print(f"{URL_MAPPING_PATH}: {changed} URL kanonik kaynağa yönlendirildi.")
+    finish_from_args(args)
+
+    print("\nKaynak dosyalardaki yolları kanonik kaynağa çevirmek için şu komutu çalıştırın:")
+    print("python update_image_paths.py")
+
+
+if __name__ == "__main__":
+    main()
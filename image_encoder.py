@@ -0,0 +1,326 @@
+import os
+import sys
+import time
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from PIL import Image, ImageOps, features
+
+import pipeline_trace
+from pipeline_trace import span
+from image_placeholder import placeholder_input, attach_placeholders
+from hashed_assets import publish_hashed
+from image_probe import TRANSPOSED_ORIENTATIONS, probe
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Pillow'un kaydetme formatı adları
+PIL_FORMATS = {
+    "webp": "WEBP",
+    "avif": "AVIF",
+    "jpeg": "JPEG",
+    "png": "PNG"
+}
+
+
+# Çıktı dosya uzantıları
+FORMAT_EXTENSIONS = {
+    "webp": ".webp",
+    "avif": ".avif",
+    "jpeg": ".jpg",
+    "png": ".png"
+}
+
+# Kodlayıcısı Pillow derlemesine bağlı formatlar (AVIF: libavif ile derlenmiş Pillow 11.2+)
+FORMAT_FEATURES = {
+    "webp": "webp",
+    "avif": "avif"
+}
+
+# Format başına kaydetme seçenekleri (JPEG yedeği progresif kodlanır)
+SAVE_OPTIONS = {
+    "webp": {"method": 4},
+    "avif": {"speed": 6},
+    "jpeg": {"progressive": True, "optimize": True}
+}
+
+# AVIF aynı görsel kaliteye daha düşük değerle ulaşır
+# (scripts/optimize-images.js: WebP 80, AVIF 65)
+QUALITY_OFFSETS = {
+    "avif": -15
+}
+
+# Yedek zinciri: bir format bir sonrakinden küçük değilse atılır
+FORMAT_FALLBACK_ORDER = ["avif", "webp", "jpeg"]
+
+
+def can_encode(fmt):
+    return fmt not in FORMAT_FEATURES or features.check(FORMAT_FEATURES[fmt])
+
+
+def supported_formats(formats):
+    # Bu Pillow derlemesinin kodlayamadığı formatları çıkar; yoksa her iş kaydederken hata verir
+    missing = [fmt for fmt in formats if not can_encode(fmt)]
+    if missing:
+        names = ", ".join(missing).upper()
+        print(f"Pillow {names} kodlayıcısı bulunamadı (pip install -U pillow); {names} çıktıları üretilmeyecek.")
+    return [fmt for fmt in formats if fmt not in missing]
+
+
+def save_arguments(img, fmt, quality):
+    # Formata uygun mod ve Pillow kaydetme argümanlarını hazırla
+    if fmt == "jpeg" and img.mode != "RGB":
+        img = img.convert("RGB")
+    options = dict(SAVE_OPTIONS.get(fmt, {}))
+    options["quality"] = max(1, min(100, quality + QUALITY_OFFSETS.get(fmt, 0)))
+    return img, PIL_FORMATS[fmt], options
+
+
+def save_image(img, output_path, fmt, quality):
+    # Yarım kalmış dosya bırakmamak için önce geçici dosyaya yaz
+    tmp_path = f"{output_path}.tmp"
+    img, pil_format, options = save_arguments(img, fmt, quality)
+    with span(f"encode.{fmt}", file=output_path):
+        img.save(tmp_path, format=pil_format, **options)
+    os.replace(tmp_path, output_path)
+    return os.path.getsize(output_path)
+
+
+def format_path(output_path, fmt):
+    # x.webp -> x.avif / x.jpg
+    return os.path.splitext(output_path)[0] + FORMAT_EXTENSIONS[fmt]
+
+
+def prune_formats(formats, primary):
+    # Bir sonraki yedekten küçük olmayan formatları sil (ana format hep kalır)
+    kept_next = None
+    for fmt in reversed(FORMAT_FALLBACK_ORDER):
+        if fmt not in formats:
+            continue
+        if kept_next and fmt != primary and formats[fmt]["bytes"] >= formats[kept_next]["bytes"]:
+            os.remove(formats.pop(fmt)["path"])
+            continue
+        kept_next = fmt
+    return formats
+
+
+def encode_formats(pool, img, output_path, formats, primary, quality):
+    # Aynı varyantın tüm formatlarını paralel kodla (Pillow kodlarken GIL'i bırakır)
+    paths = {fmt: output_path if fmt == primary else format_path(output_path, fmt)
+             for fmt in formats}
+    # Image.save ayarları görüntü nesnesinde tuttuğu için her iş parçacığı kendi kopyasını kodlar
+    futures = {fmt: pool.submit(save_image, img if i == 0 else img.copy(), paths[fmt], fmt, quality)
+               for i, fmt in enumerate(formats)}
+    encoded = {fmt: {"path": paths[fmt], "bytes": future.result()}
+               for fmt, future in futures.items()}
+    return prune_formats(encoded, primary)
+
+
+def variant_path(output_path, width):
+    # public/images/optimized/x.webp -> public/images/optimized/x-640w.webp
+    root, ext = os.path.splitext(output_path)
+    return f"{root}-{width}w{ext}"
+
+
+# DCT ölçeklemeyle hedefin en az bu katı kadar çöz, son örneklemeyi LANCZOS yapsın
+# (Image.thumbnail'in varsayılan reducing_gap değeri)
+DRAFT_REDUCING_GAP = 2.0
+
+# İşçi başına sabit bellek payı (yorumlayıcı, Pillow, kodlayıcı tamponları)
+WORKER_BASE_MEMORY = 64 * 1024 * 1024
+
+
+def draft_scale(size, target_width, transposed=False):
+    # JPEG draft modunun seçeceği 1/1, 1/2, 1/4 veya 1/8 ölçeği hesapla
+    width, height = (size[1], size[0]) if transposed else size
+    if width <= target_width:
+        return 1
+    ratio = width / (target_width * DRAFT_REDUCING_GAP)
+    for scale in (8, 4, 2):
+        if ratio >= scale:
+            return scale
+    return 1
+
+
+def open_for_width(path, target_width):
+    # Hedef genişlik izin veriyorsa JPEG'i küçültülmüş DCT ile çöz
+    img = Image.open(path)
+    if img.format == "JPEG":
+        transposed = img.getexif().get(0x0112) in TRANSPOSED_ORIENTATIONS
+        scale = draft_scale(img.size, target_width, transposed)
+        if scale > 1:
+            img.draft(None, (img.width // scale, img.height // scale))
+    return img
+
+
+def estimate_job_memory(job):
+    # Sadece başlığı okuyarak işin tepe bellek kullanımını tahmin et
+    info = probe(job["input"])
+    if info is None:
+        # Okunamayan dosya işçide hata olarak raporlanır
+        return WORKER_BASE_MEMORY
+
+    width, height = info["width"], info["height"]
+    scale = 1
+    if info["format"] == "jpeg":
+        transposed = info["orientation"] in TRANSPOSED_ORIENTATIONS
+        scale = draft_scale((width, height), job["width"], transposed)
+
+    decoded_width, decoded_height = width // scale, height // scale
+    target_width = min(job["width"], decoded_width)
+    target_height = decoded_height * target_width // max(1, decoded_width)
+    decoded = decoded_width * decoded_height * 4
+    target = target_width * target_height * 4
+    formats = len(set(job.get("formats", [])) | {job["format"]})
+
+    # Çözülmüş kaynak + yönlendirme kopyası, her format için bir varyant kopyası
+    return WORKER_BASE_MEMORY + decoded * 2 + target * (formats + 1)
+
+
+def peak_rss():
+    # İşçi sürecinin şimdiye kadarki tepe RSS değeri (bayt)
+    if resource is None:
+        return None
+    # ru_maxrss Linux'ta KB, macOS'ta bayt cinsindendir
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def resize_to_width(img, width):
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), Image.LANCZOS)
+
+
+def encode_image(job):
+    # Tek bir resmi bir kez çöz, genişlik merdivenini büyükten küçüğe türet
+    # ve her varyantı kodla (işçi süreçte çalışır)
+    start = time.perf_counter()
+    widths = sorted(set(job.get("widths") or []) | {job["width"]}, reverse=True)
+    quality = job.get("chosen_quality") or job["quality"]
+    primary = job["format"]
+    formats = [primary] + [fmt for fmt in job.get("formats", []) if fmt != primary]
+    variants = []
+
+    with open_for_width(job["input"], widths[0]) as img, ThreadPoolExecutor(len(formats)) as pool:
+        with span("decode", file=job["input"]):
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGB")
+            # Formatlar aynı görüntüyü paralel okuyacağı için pikselleri şimdi yükle
+            img.load()
+
+        os.makedirs(os.path.dirname(job["output"]), exist_ok=True)
+
+        current = img
+        for width in widths:
+            # En büyük varyant ana çıktıdır; kaynaktan geniş ara boyutları atla
+            is_primary = width == widths[0]
+            if not is_primary and width >= current.width:
+                continue
+
+            # Küçük resimleri büyütme, bir önceki (daha büyük) varyanttan küçült
+            if current.width > width:
+                with span("resize", file=job["input"], width=width):
+                    current = resize_to_width(current, width)
+
+            # Hedef SSIM verildiyse kaliteyi ana varyant üzerinde ara
+            if is_primary and job.get("target_ssim") and not job.get("chosen_quality"):
+                from quality_search import search_quality
+                quality = search_quality(current, job["format"], job["target_ssim"])
+
+            output_path = job["output"] if is_primary else variant_path(job["output"], width)
+            with span("encode", file=job["input"], width=current.width):
+                encoded = encode_formats(pool, current, output_path, formats, primary, quality)
+            if job.get("hashed_names"):
+                encoded = publish_hashed(encoded)
+            variants.append({
+                "path": encoded[primary]["path"],
+                "width": current.width,
+                "height": current.height,
+                "bytes": encoded[primary]["bytes"],
+                "formats": encoded
+            })
+
+        # Yer tutucu en küçük (zaten bellekte olan) varyanttan türetilir
+        with span("placeholder", file=job["input"]):
+            placeholder = placeholder_input(current)
+        placeholder["width"], placeholder["height"] = variants[0]["width"], variants[0]["height"]
+
+    result = {
+        "input": job["input"],
+        "output": job["output"],
+        "category": job.get("category"),
+        "bytes": variants[0]["bytes"],
+        "quality": quality,
+        "variants": variants,
+        "placeholder_input": placeholder,
+        "elapsed": time.perf_counter() - start,
+        "peak_rss": peak_rss()
+    }
+    # İzleme açıksa işçinin olaylarını sonuçla birlikte ana sürece gönder
+    if pipeline_trace.tracer.enabled:
+        result["trace"] = pipeline_trace.tracer.drain()
+    return result
+
+
+def create_executor(workers=None):
+    # İzleme ayarlarını işçilere aktaran süreç havuzu
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                               initializer=pipeline_trace.init_worker,
+                               initargs=pipeline_trace.worker_args())
+
+
+def encode_images(jobs, workers=None, memory_budget=None, executor=None):
+    # Tüm işleri çekirdek sayısı kadar süreçte paralel kodla; bellek bütçesi
+    # verildiyse tahmini kullanımı bütçeyi aşacak işleri bekleterek kabul et.
+    # executor verilirse (izleme modu) açık tutulan havuz yeniden kullanılır
+    workers = workers or os.cpu_count() or 1
+    results = []
+    start = time.perf_counter()
+
+    budget_text = f", {memory_budget / (1024 * 1024):.0f} MB bellek bütçesi" if memory_budget else ""
+    print(f"{len(jobs)} resim {workers} işçi ile kodlanıyor{budget_text}...")
+
+    pending = [(job, estimate_job_memory(job) if memory_budget else 0) for job in jobs]
+    in_flight = {}
+    used = 0
+
+    with nullcontext(executor) if executor else create_executor(workers) as executor:
+        while pending or in_flight:
+            # Bütçe elverdiği kadar iş kabul et (boştayken en az bir iş her zaman çalışır)
+            while pending and len(in_flight) < workers and (
+                    not in_flight or not memory_budget or used + pending[0][1] <= memory_budget):
+                job, cost = pending.pop(0)
+                in_flight[executor.submit(encode_image, job)] = (job, cost)
+                used += cost
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, cost = in_flight.pop(future)
+                used -= cost
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Hata: {job['input']} kodlanırken bir sorun oluştu: {e}")
+                    continue
+
+                if "trace" in result:
+                    pipeline_trace.tracer.merge(result.pop("trace"))
+                results.append(result)
+                print(f"{os.path.basename(job['input']):<30} {str(job.get('category') or '-'):<12} "
+                      f"{result['bytes']/1024:.1f} KB   q{result['quality']:<3} {len(result['variants'])} varyant   "
+                      f"{result['elapsed']*1000:.0f} ms")
+
+    # BlurHash'ler tüm işçi sonuçları için tek toplu hesaplamada üretilir
+    attach_placeholders(results)
+
+    total = time.perf_counter() - start
+    print(f"Kodlama tamamlandı: {len(results)}/{len(jobs)} resim, {total:.2f} sn")
+
+    peaks = [result["peak_rss"] for result in results if result.get("peak_rss")]
+    if peaks:
+        print(f"İşçi tepe RSS: {max(peaks) / (1024 * 1024):.0f} MB")
+    return results
@@ -0,0 +1,222 @@
+import os
+import json
+import time
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from build_cache import file_hash
+from pipeline_trace import span, count
+
+# Varsayılan indirme ayarları
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = (5, 30)  # (bağlantı, okuma) saniye
+CHUNK_SIZE = 64 * 1024
+
+# Tekrar denenecek HTTP durum kodları
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class DownloadError(Exception):
+    pass
+
+
+def create_session(concurrency=DEFAULT_CONCURRENCY):
+    # Tüm işçiler tek bir bağlantı havuzunu paylaşır
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def conditional_headers(cached):
+    # Önceki yanıtın doğrulayıcılarıyla koşullu istek (değişmediyse 304, gövde yok)
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    return headers
+
+
+def origin_url(url, origin):
+    # https://images.pexels.com/photos/1.jpeg -> <origin>/photos/1.jpeg (yerel test sunucusu)
+    if not origin:
+        return url
+    parsed = urlparse(url)
+    return origin.rstrip("/") + parsed.path + (f"?{parsed.query}" if parsed.query else "")
+
+
+def resume_validator(part_path):
+    # .part dosyasını yazan yanıtın If-Range için kullanılabilir doğrulayıcısı
+    # (zayıf ETag'ler If-Range'de geçersizdir, Last-Modified'a düşülür)
+    try:
+        with open(f"{part_path}.json", 'r', encoding='utf-8') as f:
+            validators = json.load(f)
+    except (OSError, ValueError):
+        return None
+    etag = validators.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return validators.get("last_modified")
+
+
+def remove_part(part_path):
+    for path in (part_path, f"{part_path}.json"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _fetch_once(session, url, part_path, timeout, cached=None):
+    # .part dosyası varsa kaldığı yerden devam et (HTTP Range + If-Range: kaynak o zamandan
+    # beri değiştiyse sunucu 206 yerine tam içerikle 200 döner); yoksa ve önceki yanıtın
+    # doğrulayıcıları verildiyse koşullu istek. Dönüş: (bayt, doğrulayıcılar), 304 ise (None, ...)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if_range = resume_validator(part_path) if offset else None
+    if offset and not if_range:
+        # Parçanın hangi sürüme ait olduğu bilinmiyor, eski baytlara ekleme yapma
+        remove_part(part_path)
+        offset = 0
+    if offset:
+        headers = {"Range": f"bytes={offset}-", "If-Range": if_range}
+    else:
+        headers = conditional_headers(cached)
+    # Resimler zaten sıkıştırılmış; kodlamasız yanıtta Range ofsetleri ve Content-Length
+    # diske yazılan baytlarla aynı olur
+    headers["Accept-Encoding"] = "identity"
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        validators = {"etag": response.headers.get("ETag"),
+                      "last_modified": response.headers.get("Last-Modified")}
+        if response.status_code == 304 and cached and not offset:
+            # Sunucu doğrulayıcı göndermediyse öncekiler geçerli kalır
+            return None, {key: value or cached.get(key) for key, value in validators.items()}
+
+        if response.status_code == 416 and offset:
+            # Sunucu aralığı reddetti: parça zaten tamam olabilir
+            content_range = response.headers.get("Content-Range", "")
+            if content_range.endswith(f"/{offset}"):
+                return offset, validators
+            remove_part(part_path)
+            raise DownloadError("geçersiz aralık, baştan indirilecek")
+
+        if response.status_code in RETRY_STATUSES:
+            raise DownloadError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+
+        # Sunucu Range desteklemiyorsa veya kaynak değiştiyse dosyayı baştan yaz; yarıda
+        # kalırsa sonraki deneme bu yanıtın doğrulayıcısıyla devam eder
+        if response.status_code != 206:
+            offset = 0
+            with open(f"{part_path}.json", 'w', encoding='utf-8') as f:
+                json.dump(validators, f)
+        mode = 'ab' if offset else 'wb'
+
+        # Content-Length kodlanmış boyuttur; iter_content çözülmüş baytları yazar, sunucu
+        # yine de gzip/br gönderdiyse boyut kontrol edilemez
+        expected = response.headers.get("Content-Length")
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            expected = None
+        expected = offset + int(expected) if expected is not None else None
+
+        with open(part_path, mode) as out_file:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                out_file.write(chunk)
+
+    size = os.path.getsize(part_path)
+    if expected is not None and size != expected:
+        raise DownloadError(f"eksik içerik: {size}/{expected} bayt")
+    return size, validators
+
+
+def download_file(session, url, dest_path, timeout=DEFAULT_TIMEOUT,
+                  retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, cached=None, origin=None):
+    # Geçici dosyaya indir, tamamlanınca atomik olarak yerine taşı. cached: önceki yanıtın
+    # doğrulayıcıları ve içerik özeti (hedef dosya varsa koşullu istek yapılır).
+    # Sonuç durumu: new, updated, unchanged (200 ama aynı içerik) veya not_modified (304)
+    dest_path = str(dest_path)
+    part_path = f"{dest_path}.part"
+    start = time.perf_counter()
+    exists = os.path.exists(dest_path)
+    if not exists:
+        cached = None
+
+    for attempt in range(retries + 1):
+        try:
+            with span("download", url=url, attempt=attempt + 1):
+                size, validators = _fetch_once(session, origin_url(url, origin), part_path, timeout, cached)
+            result = {"url": url, "path": dest_path, "attempts": attempt + 1, **validators}
+            if size is None:
+                count("download.not_modified")
+                result.update(status="not_modified", bytes=os.path.getsize(dest_path),
+                              transferred=0, sha256=cached.get("sha256"))
+            else:
+                count("download.bytes", size)
+                sha = file_hash(part_path)
+                previous = (cached or {}).get("sha256") or (file_hash(dest_path) if exists else None)
+                if sha == previous:
+                    # Aynı içerik: hedefe dokunma (mtime değişmez, sonraki aşamalar yeniden çalışmaz)
+                    remove_part(part_path)
+                    status = "unchanged"
+                else:
+                    os.replace(part_path, dest_path)
+                    remove_part(part_path)
+                    status = "updated" if exists else "new"
+                result.update(status=status, bytes=size, transferred=size, sha256=sha)
+            result["elapsed"] = time.perf_counter() - start
+            return result
+        except (requests.RequestException, DownloadError) as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status is not None and status not in RETRY_STATUSES:
+                raise
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            print(f"Tekrar denenecek ({attempt + 1}/{retries}): {url} - {e} ({delay:.1f} sn)")
+            time.sleep(delay)
+
+
+def download_all(items, concurrency=DEFAULT_CONCURRENCY, session=None, **kwargs):
+    # items: (url, hedef_yol) veya (url, hedef_yol, önbellek kaydı); sınırlı sayıda
+    # iş parçacığıyla indir
+    session = session or create_session(concurrency)
+    results = []
+    failures = []
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(download_file, session, item[0], item[1],
+                                   cached=item[2] if len(item) > 2 else None, **kwargs): item[0]
+                   for item in items}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Hata: {url} indirilirken bir sorun oluştu: {e}")
+                failures.append(url)
+                continue
+
+            if result["status"] in ("new", "updated"):
+                label = "İndirildi" if result["status"] == "new" else "Güncellendi"
+                print(f"{label}: {result['path']} ({result['bytes']/1024:.1f} KB, "
+                      f"{result['elapsed']:.2f} sn)")
+            results.append(result)
+
+    return results, failures
+
+
+def cache_stats(results):
+    # Durum başına sayılar, aktarılan ve aktarılmayan (304) baytlar
+    stats = {"requests": len(results), "new": 0, "updated": 0, "unchanged": 0, "not_modified": 0,
+             "transferred": 0, "saved": 0}
+    for result in results:
+        stats[result["status"]] += 1
+        stats["transferred"] += result["transferred"]
+        if result["status"] == "not_modified":
+            stats["saved"] += result["bytes"]
+    return stats
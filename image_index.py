@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import bisect
+import hashlib
+import posixpath
+from pathlib import Path
+from collections import namedtuple, defaultdict
+
+from pipeline_trace import span, count
+
+# Taranacak kök dizinler ve dosyalar
+INDEX_ROOTS = ["src", "Home.tsx"]
+SOURCE_EXTENSIONS = {".ts", ".tsx", ".js", ".jsx", ".mjs", ".css", ".html", ".json"}
+
+# İndeks önbelleği
+INDEX_CACHE_PATH = Path(".cache/image_index.json")
+INDEX_VERSION = 4
+
+# Yerel /images/ yolları (tırnak, parantez veya backtick'ten sonra başlamalı;
+# /api/images/generate gibi API yolları eşleşmez) ve Pexels URL'leri
+LOCAL_IMAGE_PATTERN = re.compile(r'(?<=["\'`(])/images/[^"\'`\s)$]++(?!\$)')
+PEXELS_URL_PATTERN = re.compile(r'https://images\.pexels\.com/photos/[^"\'`\s)]*')
+
+# Üst düzey bileşen / değişken tanımları
+COMPONENT_PATTERN = re.compile(
+    r'^(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:function|const|let|class)\s+([A-Za-z_]\w*)',
+    re.MULTILINE
+)
+
+# Yerel modül içe aktarmaları (import ... from '...', import '...', import('...'), export ... from '...')
+IMPORT_PATTERN = re.compile(r"""\b(?:import|export)\s*(?:[\w*{}\s,]*?\bfrom\s*)?\(?\s*['"]([.@][^'"]*)['"]""")
+
+# İçe aktarma çözümleme: @/ -> src/ (vite.config.ts ve tsconfig.json), uzantısız yollar
+IMPORT_ALIASES = {"@/": "src/"}
+IMPORT_SUFFIXES = ["", ".tsx", ".ts", ".jsx", ".js", ".mjs", ".json",
+                   "/index.tsx", "/index.ts", "/index.jsx", "/index.js"]
+
+ImageReference = namedtuple("ImageReference", ["file", "line", "component"])
+
+
+def iter_source_files(roots=INDEX_ROOTS):
+    for root in roots:
+        if os.path.isfile(root):
+            yield Path(root).as_posix()
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in ("node_modules", ".git")]
+            for filename in filenames:
+                if os.path.splitext(filename)[1] in SOURCE_EXTENSIONS:
+                    yield Path(dirpath, filename).as_posix()
+
+
+def scan_content(file_path, content):
+    # Dosyadaki tüm resim referanslarını (yol, satır, bileşen) olarak çıkar
+    line_starts = [0]
+    line_starts += [m.end() for m in re.finditer('\n', content)]
+
+    components = [(m.start(), m.group(1)) for m in COMPONENT_PATTERN.finditer(content)]
+    component_offsets = [offset for offset, _ in components]
+    default_component = Path(file_path).stem
+
+    refs = []
+    for match in reference_matches(content):
+        line = bisect.bisect_right(line_starts, match.start())
+        i = bisect.bisect_right(component_offsets, match.start()) - 1
+        component = components[i][1] if i >= 0 else default_component
+        refs.append([match.group(0), line, component])
+    return refs
+
+
+def reference_matches(content):
+    return [match for pattern in (LOCAL_IMAGE_PATTERN, PEXELS_URL_PATTERN) for match in pattern.finditer(content)]
+
+
+def scan_widths(content):
+    # Her referansın kullanım yerindeki görüntülenme genişlikleri (refs ile aynı sırada)
+    from image_sizing import usage_widths
+
+    offsets = [match.start() for match in reference_matches(content)]
+    return usage_widths(content, offsets) if offsets else []
+
+
+def scan_characters(content):
+    # Dosyada geçen yazdırılabilir karakterler (font alt kümesi için), sıralı tek dizgi
+    return "".join(sorted({char for char in content if char.isprintable()}))
+
+
+def scan_imports(content):
+    # Göreli ve takma adlı içe aktarmalar (paket içe aktarmaları atlanır)
+    return sorted(set(IMPORT_PATTERN.findall(content)))
+
+
+def resolve_import(file_path, specifier, files):
+    # İçe aktarma belirtecini indeksteki dosya yoluna çöz; bulunamazsa None
+    for alias, target in IMPORT_ALIASES.items():
+        if specifier.startswith(alias):
+            base = target + specifier[len(alias):]
+            break
+    else:
+        if not specifier.startswith("."):
+            return None
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(file_path), specifier))
+    for suffix in IMPORT_SUFFIXES:
+        if base + suffix in files:
+            return base + suffix
+    return None
+
+
+class ImageIndex:
+    def __init__(self, roots=INDEX_ROOTS, cache_path=INDEX_CACHE_PATH):
+        self.roots = roots
+        self.cache_path = Path(cache_path)
+        self.files = {}
+        self.load()
+
+    def load(self):
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"İndeks önbelleği okunamadı, yeniden oluşturulacak: {e}")
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.files = data.get("files", {})
+
+    def save(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "files": self.files}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh_file(self, file_path):
+        # mtime ve boyut aynıysa dosyayı okuma; içerik özeti aynıysa yeniden tarama
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.files.pop(file_path, None)
+            return False
+
+        entry = self.files.get(file_path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return False
+
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        sha = hashlib.sha256(raw).hexdigest()
+
+        if entry and entry["sha256"] == sha:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            return False
+
+        content = raw.decode('utf-8', errors='replace')
+        self.files[file_path] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha,
+            "refs": scan_content(file_path, content),
+            "imports": scan_imports(content),
+            "widths": scan_widths(content),
+            "chars": scan_characters(content)
+        }
+        return True
+
+    def refresh(self):
+        # Tüm ağacı gez, sadece değişen dosyaları yeniden tara
+        with span("scan"):
+            current = set(iter_source_files(self.roots))
+            for file_path in list(self.files):
+                if file_path not in current:
+                    del self.files[file_path]
+
+            rescanned = sum(1 for file_path in sorted(current) if self.refresh_file(file_path))
+        count("scan.files", len(current))
+        count("scan.rescanned", rescanned)
+        return rescanned
+
+    def images(self):
+        # Ters indeks: resim yolu -> [ImageReference, ...]
+        index = defaultdict(list)
+        for file_path, entry in self.files.items():
+            for image, line, component in entry["refs"]:
+                index[image].append(ImageReference(file_path, line, component))
+        return index
+
+    def references(self, image):
+        return self.images().get(image, [])
+
+    def usage_widths(self):
+        # Resim yolu -> kullanım yerlerinin görüntü alanı başına genişlikleri (bilinmeyen: None)
+        widths = defaultdict(list)
+        for entry in self.files.values():
+            for (image, _, _), profile in zip(entry["refs"], entry.get("widths", [])):
+                widths[image].append(profile)
+        return widths
+
+    def dependencies(self, file_path):
+        # Dosyanın içe aktardığı indeksteki dosyalar
+        return {
+            resolved
+            for specifier in self.files.get(file_path, {}).get("imports", [])
+            for resolved in [resolve_import(file_path, specifier, self.files)]
+            if resolved
+        }
+
+    def reachable_files(self, file_path):
+        # Dosya ve içe aktarma zinciriyle ulaşılan tüm dosyalar (döngüler güvenli)
+        seen = {file_path}
+        stack = [file_path]
+        while stack:
+            for dependency in self.dependencies(stack.pop()):
+                if dependency not in seen:
+                    seen.add(dependency)
+                    stack.append(dependency)
+        return seen
+
+    def characters(self):
+        # Kaynak ağacında ve yerelleştirme dosyalarında geçen tüm karakterler
+        return set().union(*(entry.get("chars", "") for entry in self.files.values()))
+
+    def local_images(self):
+        return {k: v for k, v in self.images().items() if k.startswith("/images/")}
+
+    def pexels_urls(self):
+        return {k: v for k, v in self.images().items() if k.startswith("https://images.pexels.com/")}
+
+    def files_referencing(self, images=None):
+        # Verilen resimlerden en az birini kullanan dosyalar
+        # (anahtar, sorgu dizgili URL'nin öneki de olabilir)
+        prefixes = tuple(images) if images is not None else None
+        return sorted(
+            file_path for file_path, entry in self.files.items()
+            if any(prefixes is None or ref[0].startswith(prefixes) for ref in entry["refs"])
+        )
+
+
+def load_index(roots=INDEX_ROOTS):
+    index = ImageIndex(roots)
+    rescanned = index.refresh()
+    index.save()
+    print(f"Referans indeksi: {len(index.files)} dosya, {rescanned} dosya yeniden tarandı.")
+    return index
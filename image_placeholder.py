@@ -0,0 +1,150 @@
+import io
+import json
+import base64
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from pipeline_trace import span, count
+
+# Bileşenlerin satır içi kullanacağı yer tutucular (orijinal ve optimize URL'leriyle)
+PLACEHOLDER_MAPPING_PATH = Path("public/image_placeholders.json")
+
+# Satır içi bulanık önizleme: en fazla 24 px genişlikte düşük kaliteli WebP
+LQIP_WIDTH = 24
+LQIP_QUALITY = 40
+
+# BlurHash tüm resimler için aynı boyuttaki ızgarada toplu hesaplanır
+# (taban fonksiyonları normalize koordinatlarda olduğu için en-boy oranı sonucu değiştirmez)
+BLURHASH_GRID = 32
+BLURHASH_MAX_COMPONENTS = 4
+
+BASE83_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def base83(value, length):
+    return "".join(BASE83_CHARS[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def srgb_to_linear(values):
+    v = values / 255.0
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(value):
+    v = min(1.0, max(0.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def components_for(width, height):
+    # Yatay resimlerde 4x3, dikeylerde 3x4 bileşen
+    return (4, 3) if width >= height else (3, 4)
+
+
+def placeholder_input(img):
+    # İşçide, zaten küçültülmüş görüntüden LQIP ve BlurHash ızgarasını hazırla
+    # (kaynak ikinci kez çözülmez)
+    rgb = img.convert("RGB")
+    height = max(1, round(rgb.height * LQIP_WIDTH / rgb.width))
+    tiny = rgb.resize((LQIP_WIDTH, height), Image.BOX)
+
+    buffer = io.BytesIO()
+    tiny.save(buffer, format="WEBP", quality=LQIP_QUALITY, method=6)
+    grid = rgb.resize((BLURHASH_GRID, BLURHASH_GRID), Image.BOX)
+    return {
+        "lqip": "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii"),
+        "width": img.width,
+        "height": img.height,
+        "grid": grid.tobytes()
+    }
+
+
+def blurhash_batch(grids, components):
+    # N ızgaranın tüm DCT katsayılarını tek einsum ile hesapla, sonra her birini kodla
+    linear = srgb_to_linear(np.stack(grids).astype(np.float64))
+    n = BLURHASH_MAX_COMPONENTS
+    positions = np.arange(BLURHASH_GRID) / BLURHASH_GRID
+    basis = np.cos(np.pi * np.arange(n)[:, None] * positions[None, :])
+    factors = np.einsum("jy,ix,byxc->bjic", basis, basis, linear) / (BLURHASH_GRID * BLURHASH_GRID)
+    factors[:, 1:, :, :] *= 2
+    factors[:, 0, 1:, :] *= 2
+
+    hashes = []
+    for image_factors, (cx, cy) in zip(factors, components):
+        selected = image_factors[:cy, :cx].reshape(-1, 3)
+        dc, ac = selected[0], selected[1:]
+
+        result = base83((cx - 1) + (cy - 1) * 9, 1)
+        if len(ac):
+            quantised_max = int(max(0, min(82, np.floor(np.abs(ac).max() * 166 - 0.5))))
+            maximum = (quantised_max + 1) / 166
+            result += base83(quantised_max, 1)
+        else:
+            maximum = 1
+            result += base83(0, 1)
+
+        result += base83((linear_to_srgb(dc[0]) << 16) + (linear_to_srgb(dc[1]) << 8) + linear_to_srgb(dc[2]), 4)
+        quantised = np.clip(np.floor(np.sign(ac) * np.sqrt(np.abs(ac / maximum)) * 9 + 9.5), 0, 18).astype(int)
+        for r, g, b in quantised:
+            result += base83(r * 19 * 19 + g * 19 + b, 2)
+        hashes.append(result)
+    return hashes
+
+
+def attach_placeholders(results):
+    # İşçilerden gelen ızgaraları topla, BlurHash'leri toplu hesapla ve sonuçlara ekle
+    pending = [result for result in results if "placeholder_input" in result]
+    if not pending:
+        return results
+
+    with span("placeholder", images=len(pending)):
+        inputs = [result.pop("placeholder_input") for result in pending]
+        grids = [np.frombuffer(item["grid"], dtype=np.uint8).reshape(BLURHASH_GRID, BLURHASH_GRID, 3)
+                 for item in inputs]
+        components = [components_for(item["width"], item["height"]) for item in inputs]
+        for result, item, blurhash in zip(pending, inputs, blurhash_batch(grids, components)):
+            result["placeholder"] = {
+                "blurhash": blurhash,
+                "lqip": item["lqip"],
+                "width": item["width"],
+                "height": item["height"]
+            }
+    count("placeholder.images", len(pending))
+    return results
+
+
+def backfill_placeholders(results):
+    # Yer tutucusu olmayan eski önbellek sonuçları için en küçük varyant dosyasını kullan
+    missing = [result for result in results if "placeholder" not in result and result.get("variants")]
+    for result in missing:
+        smallest = min(result["variants"], key=lambda variant: variant["width"])
+        try:
+            with Image.open(smallest["path"]) as img:
+                item = placeholder_input(img)
+        except (OSError, ValueError) as e:
+            print(f"Yer tutucu üretilemedi: {smallest['path']} ({e})")
+            continue
+        largest = max(result["variants"], key=lambda variant: variant["width"])
+        item["width"], item["height"] = largest["width"], largest["height"]
+        result["placeholder_input"] = item
+    return attach_placeholders(missing)
+
+
+def write_placeholder_mapping(results, path=PLACEHOLDER_MAPPING_PATH):
+    # Orijinal ve optimize URL -> yer tutucu (diğer betiklerin kayıtları korunur)
+    from path_rewriter import load_mapping_file, public_url
+
+    mapping = load_mapping_file(path)
+    for result in results:
+        placeholder = result.get("placeholder")
+        if placeholder:
+            mapping[public_url(result["input"])] = placeholder
+            # Kaynaklar yeniden yazıldıktan sonra kullanılan (gerekirse içerik özetli) yol
+            mapping[public_url(result["variants"][0]["path"])] = placeholder
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(mapping, f, indent=2, ensure_ascii=False)
+    print(f"{len(mapping)} yer tutucu {path} dosyasına kaydedildi.")
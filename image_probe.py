@@ -0,0 +1,307 @@
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+from pathlib import Path
+
+# Başlıktan okunan ölçü ve meta veriler: format, genişlik, yükseklik (dosyada saklanan,
+# yönlendirme uygulanmamış), EXIF yönlendirmesi (1-8), gömülü ICC profili, saydamlık
+PROBE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".avif"}
+
+# EXIF yönlendirmesi 5-8 ise görüntülenen genişlik ve yükseklik yer değiştirir
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+# Ölçü taşımayan SOF işaretleri: DHT, JPG, DAC
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# AVIF irot açısı (saat yönünün tersine 90° adımları) -> eşdeğer EXIF yönlendirmesi
+AVIF_ROTATIONS = {0: 1, 1: 8, 2: 3, 3: 6}
+
+# ISOBMFF kapsayıcı kutuları (çocukları hemen başlar); meta tam kutudur (4 bayt sürüm/bayrak)
+AVIF_CONTAINERS = {b"iprp", b"ipco"}
+
+INDEX_PATH = Path(".cache/image_probe.json")
+INDEX_VERSION = 1
+
+
+def exif_orientation(data, start, end):
+    # TIFF başlığı + IFD0 içinde 0x0112 etiketi
+    if end - start < 8:
+        return 1
+    order = {b"II": "<", b"MM": ">"}.get(bytes(data[start:start + 2]))
+    if order is None:
+        return 1
+    ifd = start + struct.unpack_from(order + "I", data, start + 4)[0]
+    if ifd + 2 > end:
+        return 1
+    entries = struct.unpack_from(order + "H", data, ifd)[0]
+    for i in range(entries):
+        entry = ifd + 2 + i * 12
+        if entry + 12 > end:
+            break
+        tag, kind = struct.unpack_from(order + "HH", data, entry)
+        if tag == 0x0112 and kind == 3:
+            value = struct.unpack_from(order + "H", data, entry + 8)[0]
+            return value if 1 <= value <= 8 else 1
+    return 1
+
+
+def probe_jpeg(data):
+    info = {"format": "jpeg", "orientation": 1, "icc": False, "alpha": False}
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:  # Dolgu baytı
+            position += 1
+            continue
+        if marker in (0x01, *range(0xD0, 0xD8)):  # Uzunluksuz işaretler
+            position += 2
+            continue
+        length = struct.unpack_from(">H", data, position + 2)[0]
+        segment = position + 4
+        if marker == 0xE1 and data[segment:segment + 6] == b"Exif\0\0":
+            info["orientation"] = exif_orientation(data, segment + 6, position + 2 + length)
+        elif marker == 0xE2 and data[segment:segment + 12] == b"ICC_PROFILE\0":
+            info["icc"] = True
+        elif marker in JPEG_SOF_MARKERS:
+            info["height"], info["width"] = struct.unpack_from(">HH", data, segment + 1)
+            info["progressive"] = marker in (0xC2, 0xC6, 0xCA, 0xCE)
+        elif marker == 0xDA:  # SOS: sıkıştırılmış veri başlar
+            break
+        position += 2 + length
+    return info if "width" in info else None
+
+
+def probe_png(data):
+    if data[12:16] != b"IHDR":
+        return None
+    width, height, _, color_type = struct.unpack_from(">IIBB", data, 16)
+    info = {"format": "png", "width": width, "height": height, "orientation": 1, "icc": False,
+            "alpha": color_type in (4, 6)}
+    position = 8
+    while position + 8 <= len(data):
+        length = struct.unpack_from(">I", data, position)[0]
+        kind = bytes(data[position + 4:position + 8])
+        if kind == b"IDAT" or kind == b"IEND":
+            break
+        if kind == b"iCCP":
+            info["icc"] = True
+        elif kind == b"tRNS":
+            info["alpha"] = True
+        elif kind == b"eXIf":
+            info["orientation"] = exif_orientation(data, position + 8, position + 8 + length)
+        position += 12 + length
+    return info
+
+
+def probe_webp(data):
+    info = {"format": "webp", "orientation": 1, "icc": False, "alpha": False}
+    position = 12
+    end = min(len(data), 8 + struct.unpack_from("<I", data, 4)[0])
+    while position + 8 <= end:
+        kind = bytes(data[position:position + 4])
+        length = struct.unpack_from("<I", data, position + 4)[0]
+        body = position + 8
+        if kind == b"VP8X":
+            flags = data[body]
+            info["icc"] = bool(flags & 0x20)
+            info["alpha"] = bool(flags & 0x10)
+            info["width"] = 1 + int.from_bytes(data[body + 4:body + 7], "little")
+            info["height"] = 1 + int.from_bytes(data[body + 7:body + 10], "little")
+            if not flags & 0x08:  # EXIF yok
+                return info
+        elif kind == b"VP8 " and "width" not in info:
+            # Kayıplı: 3 bayt çerçeve etiketi, 9d 01 2a başlangıç kodu, 14 bit genişlik/yükseklik
+            if data[body + 3:body + 6] != b"\x9d\x01\x2a":
+                return None
+            width, height = struct.unpack_from("<HH", data, body + 6)
+            info["width"], info["height"] = width & 0x3FFF, height & 0x3FFF
+            return info
+        elif kind == b"VP8L" and "width" not in info:
+            # Kayıpsız: 0x2f imzası, 14 bit genişlik-1, 14 bit yükseklik-1, 1 bit alfa
+            if data[body] != 0x2F:
+                return None
+            bits = struct.unpack_from("<I", data, body + 1)[0]
+            info["width"] = (bits & 0x3FFF) + 1
+            info["height"] = ((bits >> 14) & 0x3FFF) + 1
+            info["alpha"] = bool(bits >> 28 & 1)
+            return info
+        elif kind == b"EXIF":
+            info["orientation"] = exif_orientation(data, body, body + length)
+            return info if "width" in info else None
+        position = body + length + (length & 1)
+    return info if "width" in info else None
+
+
+def iter_boxes(data, start, end):
+    # ISOBMFF kutuları: (tür, gövde başlangıcı, bitiş)
+    position = start
+    while position + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, position)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, position + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            return
+        yield kind, position + header, min(end, position + size)
+        position += size
+
+
+def probe_avif(data):
+    info = {"format": "avif", "orientation": 1, "icc": False, "alpha": False}
+    sizes = []
+    stack = [(0, len(data))]
+    while stack:
+        start, end = stack.pop()
+        for kind, body, box_end in iter_boxes(data, start, end):
+            if kind == b"meta":
+                stack.append((body + 4, box_end))
+            elif kind in AVIF_CONTAINERS:
+                stack.append((body, box_end))
+            elif kind == b"ispe":
+                sizes.append(struct.unpack_from(">II", data, body + 4))
+            elif kind == b"colr" and data[body:body + 4] in (b"prof", b"rICC"):
+                info["icc"] = True
+            elif kind == b"irot":
+                info["orientation"] = AVIF_ROTATIONS[data[body] & 0x03]
+            elif kind == b"auxC" and b"alpha" in bytes(data[body:box_end]):
+                info["alpha"] = True
+    if not sizes:
+        return None
+    # Birincil resim en büyük ispe'dir (alfa düzlemi aynı boyutta, küçük resimler daha küçük)
+    info["width"], info["height"] = max(sizes, key=lambda size: size[0] * size[1])
+    return info
+
+
+def probe_buffer(data):
+    if data[:3] == b"\xFF\xD8\xFF":
+        return probe_jpeg(data)
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return probe_png(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return probe_webp(data)
+    if data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis", b"mif1"):
+        return probe_avif(data)
+    return None
+
+
+def probe(path):
+    # Dosyayı belleğe eşleyip sadece başlıkları oku; piksel verisi çözülmez.
+    # Tanınmayan veya bozuk dosyalar için None
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return probe_buffer(data)
+    except (OSError, ValueError, struct.error, IndexError):
+        return None
+
+
+def display_size(info):
+    # Yönlendirme uygulandıktan sonraki (tarayıcının gösterdiği) boyut
+    if info["orientation"] in TRANSPOSED_ORIENTATIONS:
+        return info["height"], info["width"]
+    return info["width"], info["height"]
+
+
+class ProbeIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = Path(path)
+        self.entries = {}
+        self.changed = False
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Resim meta veri indeksi okunamadı, yeniden oluşturulacak: {e}")
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.entries = data.get("files", {})
+
+    def save(self):
+        if not self.changed:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "files": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+    def get(self, path, stat=None):
+        # mtime ve boyut aynıysa kayıtlı sonuç, değilse başlığı yeniden oku
+        path = Path(path).as_posix()
+        try:
+            stat = stat or os.stat(path)
+        except OSError:
+            if self.entries.pop(path, None) is not None:
+                self.changed = True
+            return None
+        entry = self.entries.get(path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["info"]
+        info = probe(path)
+        self.entries[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "info": info}
+        self.changed = True
+        return info
+
+    def scan(self, root):
+        # Dizin ağacındaki tüm resimler; silinen dosyaların kayıtları atılır
+        found = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if os.path.splitext(filename)[1].lower() in PROBE_EXTENSIONS:
+                    path = Path(dirpath, filename).as_posix()
+                    found[path] = self.get(path)
+        prefix = Path(root).as_posix().rstrip("/") + "/"
+        for path in [p for p in self.entries if p.startswith(prefix) and p not in found]:
+            del self.entries[path]
+            self.changed = True
+        return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resim başlıklarından ölçü, yönlendirme ve renk profili okur")
+    parser.add_argument("paths", nargs="*", default=["public/images"], help="Dosyalar veya dizinler")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = ProbeIndex()
+    results = {}
+    for path in args.paths:
+        if os.path.isdir(path):
+            results.update(index.scan(path))
+        else:
+            results[Path(path).as_posix()] = index.get(path)
+    index.save()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+    for path, info in sorted(results.items()):
+        if info is None:
+            print(f"{path:<60} okunamadı")
+            continue
+        flags = [name for name in ("icc", "alpha") if info[name]]
+        if info["orientation"] != 1:
+            flags.append(f"yön {info['orientation']}")
+        print(f"{path:<60} {info['format']:<5} {info['width']:>5}x{info['height']:<5} {' '.join(flags)}")
+    print(f"{len(results)} dosya {elapsed:.1f} ms içinde incelendi.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+import io
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from PIL import ImageOps, UnidentifiedImageError
+
+from pipeline_trace import span, count
+from image_encoder import FORMAT_EXTENSIONS, can_encode, open_for_width, resize_to_width, save_arguments
+from optimize_images import (ALL_WIDTHS, IMAGE_CATEGORIES, IMAGES_DIR, OUTPUT_FORMATS, FORMAT_MIME_TYPES,
+                             RASTER_EXTENSIONS)
+
+# Sunucu ve önbellek ayarları
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+DEFAULT_CACHE_DIR = Path(".cache/image_server")
+DEFAULT_CACHE_SIZE = 512  # MB
+DEFAULT_QUALITY = 75
+DEFAULT_FORMAT = "webp"
+
+# Aynı URL orijinal değişince farklı içerik döndürebilir; kısa süre önbelleklenir
+CACHE_CONTROL = "public, max-age=3600"
+
+
+class TransformError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def snap_width(width, ladder):
+    # İstenen genişliği merdivendeki ilk eşit veya büyük genişliğe yuvarla
+    for step in ladder:
+        if step >= width:
+            return step
+    return ladder[-1]
+
+
+def negotiate_format(accept):
+    # fmt=auto: tarayıcının kabul ettiği en verimli format
+    for fmt in OUTPUT_FORMATS:
+        if FORMAT_MIME_TYPES[fmt] in (accept or "") and can_encode(fmt):
+            return fmt
+    return "jpeg"
+
+
+def parse_request(path, query, accept):
+    # /images/<ad>?w=&q=&fmt=&preset= -> (kaynak dosya, genişlik, kalite, format)
+    if not path.startswith("/images/"):
+        raise TransformError(404, "Sadece /images/ altındaki resimler sunulur")
+
+    root = IMAGES_DIR.resolve()
+    source = (root / unquote(path[len("/images/"):])).resolve()
+    if root not in source.parents or not source.is_file():
+        raise TransformError(404, f"Resim bulunamadı: {path}")
+    if source.suffix.lower() not in RASTER_EXTENSIONS:
+        raise TransformError(404, f"Dönüştürülebilir bir resim değil: {path}")
+
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    preset = params.get("preset")
+    if preset and preset not in IMAGE_CATEGORIES:
+        raise TransformError(400, f"Bilinmeyen kategori: {preset}")
+    settings = IMAGE_CATEGORIES.get(preset, {})
+    # Kategori verilmezse genişlik tüm kategorilerin merdivenine yuvarlanır
+    # (önbellekte sınırsız sayıda farklı boyut birikmesin)
+    ladder = sorted(settings["widths"]) if settings else ALL_WIDTHS
+
+    try:
+        width = snap_width(int(params.get("w", ladder[-1])), ladder)
+        quality = max(1, min(100, int(params.get("q", settings.get("quality", DEFAULT_QUALITY)))))
+    except ValueError:
+        raise TransformError(400, "w ve q tam sayı olmalı")
+
+    fmt = params.get("fmt", settings.get("format", DEFAULT_FORMAT))
+    if fmt == "auto":
+        fmt = negotiate_format(accept)
+    if fmt not in FORMAT_MIME_TYPES or not can_encode(fmt):
+        raise TransformError(400, f"Desteklenmeyen format: {fmt}")
+
+    return source, width, quality, fmt
+
+
+def transform(source, width, quality, fmt):
+    # Orijinali hedef genişlikte çöz, küçült (büyütme) ve belleğe kodla
+    with open_for_width(source, width) as img:
+        with span("decode", file=str(source)):
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGB")
+        if img.width > width:
+            with span("resize", file=str(source), width=width):
+                img = resize_to_width(img, width)
+        with span("encode", file=str(source), width=img.width):
+            buffer = io.BytesIO()
+            encodable, pil_format, options = save_arguments(img, fmt, quality)
+            encodable.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
+
+
+class DiskLRUCache:
+    # Boyutu sınırlı disk önbelleği; en uzun süre kullanılmayan dosyalar önce silinir
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        # Önceki çalıştırmadan kalan dosyaları son erişim sırasıyla yükle
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = [entry for entry in os.scandir(self.directory)
+                 if entry.is_file() and not entry.name.endswith(".tmp")]
+        for entry in sorted(files, key=lambda e: e.stat().st_mtime_ns):
+            size = entry.stat().st_size
+            self.entries[entry.name] = size
+            self.total += size
+        self.evict()
+
+    def get(self, name):
+        with self.lock:
+            if name not in self.entries:
+                return None
+            self.entries.move_to_end(name)
+        path = self.directory / name
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Erişim sırası yeniden başlatmada da korunsun
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                self.total -= self.entries.pop(name, 0)
+            return None
+        return data
+
+    def put(self, name, data):
+        path = self.directory / name
+        tmp_path = path.with_name(f"{name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.total += len(data) - self.entries.pop(name, 0)
+            self.entries[name] = len(data)
+            self.evict()
+
+    def evict(self):
+        while self.total > self.max_bytes and len(self.entries) > 1:
+            name, size = self.entries.popitem(last=False)
+            self.total -= size
+            try:
+                os.remove(self.directory / name)
+            except OSError:
+                pass
+            count("server.evictions")
+
+
+class SingleFlight:
+    # Aynı anahtar için eşzamanlı istekleri tek bir dönüşümde birleştir
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        # (sonuç, bu çağrı dönüşümü kendisi mi yaptı) döndürür
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+        if not leader:
+            return future.result(), False
+
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                del self.calls[key]
+        return future.result(), True
+
+
+class ImageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, cache, transforms=None):
+        super().__init__(address, ImageRequestHandler)
+        self.cache = cache
+        self.flights = SingleFlight()
+        # Her istek kendi iş parçacığında çalışır; aynı anda en fazla bu kadar dönüşüm
+        self.transform_slots = threading.BoundedSemaphore(transforms or os.cpu_count() or 1)
+        self.stats = {"hits": 0, "misses": 0, "collapsed": 0, "not_modified": 0, "errors": 0}
+        self.stats_lock = threading.Lock()
+
+    def record(self, name):
+        with self.stats_lock:
+            self.stats[name] += 1
+        count(f"server.{name}")
+
+    @staticmethod
+    def cache_name(source, width, quality, fmt):
+        # Önbellek anahtarı (ve ETag) kaynağın mtime/boyutunu da içerir: orijinal değişince
+        # yeniden üretilir; dönüşüm yapmadan hesaplanır
+        stat = source.stat()
+        key = json.dumps([str(source), stat.st_mtime_ns, stat.st_size, width, quality, fmt])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + FORMAT_EXTENSIONS[fmt]
+
+    def render(self, source, width, quality, fmt, name):
+        data = self.cache.get(name)
+        if data is not None:
+            self.record("hits")
+            return name, data, "HIT"
+
+        def produce():
+            # Bekleyen lider, önceki lider bitirmişse önbellekten alabilir
+            cached = self.cache.get(name)
+            if cached is not None:
+                return cached
+            with self.transform_slots:
+                encoded = transform(source, width, quality, fmt)
+            self.cache.put(name, encoded)
+            return encoded
+
+        data, leader = self.flights.do(name, produce)
+        self.record("misses" if leader else "collapsed")
+        return name, data, "MISS" if leader else "COLLAPSED"
+
+
+class ImageRequestHandler(BaseHTTPRequestHandler):
+    server_version = "YapaySanatImageServer/1.0"
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            body = json.dumps({**self.server.stats, "cache_bytes": self.server.cache.total,
+                               "cache_files": len(self.server.cache.entries)}).encode('utf-8')
+            return self.send_payload(200, "application/json", body, send_body)
+
+        start = time.perf_counter()
+        try:
+            source, width, quality, fmt = parse_request(url.path, url.query, self.headers.get("Accept"))
+            name = self.server.cache_name(source, width, quality, fmt)
+
+            # Yeniden doğrulama: ETag tutuyorsa çözme/kodlama yapmadan 304
+            etag = f'"{os.path.splitext(name)[0]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.server.record("not_modified")
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Vary", "Accept")
+                self.end_headers()
+                return
+
+            name, data, status = self.server.render(source, width, quality, fmt, name)
+        except TransformError as e:
+            return self.send_error(e.status, explain=str(e))
+        except UnidentifiedImageError:
+            # Uzantısı resim ama içeriği okunamayan (bozuk) dosya: istemci hatası
+            return self.send_error(415, explain=f"Resim okunamadı: {url.path}")
+        except (OSError, ValueError) as e:
+            self.server.record("errors")
+            return self.send_error(500, explain=f"Dönüştürme başarısız: {e}")
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept",
+            "X-Cache": status,
+            "Server-Timing": f"transform;dur={(time.perf_counter() - start) * 1000:.1f}"
+        }
+        self.send_payload(200, FORMAT_MIME_TYPES[fmt], data, send_body, headers)
+
+    def send_payload(self, status, content_type, body, send_body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="public/images altındaki orijinalleri istek anında dönüştüren yerel resim sunucusu")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Dinlenecek adres (varsayılan: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Dinlenecek port (varsayılan: 8787)")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR),
+                        help="Dönüştürülmüş resimlerin önbellek dizini")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Disk önbelleğinin üst sınırı (MB, varsayılan: 512)")
+    parser.add_argument("--transforms", type=int, default=None,
+                        help="Aynı anda çalışabilecek dönüşüm sayısı (varsayılan: çekirdek sayısı)")
+    args = parser.parse_args()
+
+    cache = DiskLRUCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    server = ImageServer((args.host, args.port), cache, transforms=args.transforms)
+
+    print(f"Resim sunucusu: http://{args.host}:{args.port}/images/<ad>?w=&q=&fmt=&preset=")
+    print(f"Önbellek: {cache.directory} ({cache.total / (1024 * 1024):.1f} / {args.cache_size} MB, "
+          f"{len(cache.entries)} dosya)")
+    print(f"Vite için: server.proxy = {{ '/images': 'http://{args.host}:{args.port}' }}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nSunucu durduruldu.")
+    finally:
+        server.server_close()
+        print(f"İstatistikler: {server.stats['hits']} isabet, {server.stats['misses']} ıska, "
+              f"{server.stats['collapsed']} birleştirilen, {server.stats['not_modified']} 304, "
+              f"{server.stats['errors']} hata")
+
+
+if __name__ == "__main__":
+    main()
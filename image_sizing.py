@@ -0,0 +1,278 @@
+import re
+import bisect
+
+# Tailwind kırılma noktaları (min-width, px)
+BREAKPOINTS = {"sm": 640, "md": 768, "lg": 1024, "xl": 1280, "2xl": 1536}
+
+# Görüntülenme genişliğinin hesaplandığı temsilî görüntü alanı genişlikleri (px)
+VIEWPORTS = [375, 640, 768, 1024, 1280, 1536, 1920]
+
+# Her görüntülenme genişliği için üretilecek piksel yoğunlukları
+DEVICE_PIXEL_RATIOS = [1, 2]
+
+# w-16 = 16 * 4 px
+SPACING_UNIT = 4
+
+# max-w-* değerleri (px); full/none sınır koymaz
+MAX_WIDTHS = {
+    "xs": 320, "sm": 384, "md": 448, "lg": 512, "xl": 576, "2xl": 672, "3xl": 768,
+    "4xl": 896, "5xl": 1024, "6xl": 1152, "7xl": 1280, "prose": 720
+}
+MAX_WIDTHS.update({f"screen-{name}": width for name, width in BREAKPOINTS.items()})
+
+# Sınıf listesi ve özellikler
+CLASS_ATTRIBUTE = re.compile(r'\bclass(?:Name)?\s*=\s*')
+STRING_LITERAL = re.compile(r'"([^"]*)"|\'([^\']*)\'|`([^`]*)`')
+STYLE_WIDTH = re.compile(r'\b(maxWidth|width)\s*:\s*[\'"]?(\d+(?:\.\d+)?)(px|vw|%)?[\'"]?')
+WIDTH_PROP = re.compile(r'(?<![\w-])width\s*=\s*\{?\s*[\'"]?(\d+)')
+SIZES_PROP = re.compile(r'(?<![\w-])sizes\s*=\s*\{?\s*[\'"`]([^\'"`]+)')
+SIZES_ENTRY = re.compile(r'^\s*(?:\(\s*min-width\s*:\s*(\d+)px\s*\)\s*)?(\d+(?:\.\d+)?)(px|vw)\s*$')
+
+# Veri dizisindeki resim alanı: { image_url: "/images/x.jpg" } -> src={item.image_url}
+PROPERTY_KEY = re.compile(r'([A-Za-z_]\w*)["\']?\s*:\s*$')
+
+TAG_START = re.compile(r'<(/?)([A-Za-z][\w.]*)')
+
+
+def parse_tags(content):
+    # JSX etiketleri: (başlangıç, bitiş, ad, özellik metni, tür); özellik değerlerindeki
+    # süslü parantez ve tırnaklar (onClick={() => ...}) etiketi bitirmez
+    tags = []
+    position = 0
+    while True:
+        match = TAG_START.search(content, position)
+        if not match:
+            return tags
+        closing, name = match.group(1), match.group(2)
+        depth, quote, i = 0, None, match.end()
+        while i < len(content):
+            char = content[i]
+            if quote:
+                if char == "\\":
+                    i += 1
+                elif char == quote:
+                    quote = None
+            elif char in "\"'`":
+                quote = char
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+            elif char == "<" and depth == 0:
+                break  # Etiket değil (ör. a < b veya useState<string>)
+            elif char == ">" and depth <= 0:
+                kind = "close" if closing else ("self" if content[i - 1] == "/" else "open")
+                tags.append((match.start(), i + 1, name, content[match.end():i], kind))
+                break
+            i += 1
+        position = match.end()
+
+
+def element_chains(tags, offsets):
+    # Her konum için (kök -> en içteki) açık etiketlerin özellik metinleri
+    chains = {}
+    stack = []
+    order = sorted(offsets)
+    t = 0
+    for offset in order:
+        while t < len(tags) and tags[t][1] <= offset:
+            start, end, name, attrs, kind = tags[t]
+            if kind == "open":
+                stack.append((name, attrs))
+            elif kind == "close":
+                # Kapanmamış sahte etiketleri (TS jenerikleri) de at
+                for i in range(len(stack) - 1, -1, -1):
+                    if stack[i][0] == name:
+                        del stack[i:]
+                        break
+            t += 1
+        chain = [attrs for _, attrs in stack]
+        # Referans bir etiketin özelliklerinin içindeyse o etiket zincirin sonudur
+        if t < len(tags) and tags[t][0] < offset < tags[t][1] and tags[t][4] != "close":
+            chain.append(tags[t][3])
+            chains[offset] = chain
+        else:
+            chains[offset] = None
+    return chains
+
+
+def class_names(attrs):
+    # className="..." / className={`...`} / className={cn("...", cond && "...")}
+    names = []
+    for match in CLASS_ATTRIBUTE.finditer(attrs):
+        rest = attrs[match.end():]
+        if rest.startswith("{"):
+            depth = 0
+            for i, char in enumerate(rest):
+                depth += char == "{"
+                depth -= char == "}"
+                if depth == 0:
+                    rest = rest[:i + 1]
+                    break
+        else:
+            rest = STRING_LITERAL.match(rest).group(0) if STRING_LITERAL.match(rest) else ""
+        for literal in STRING_LITERAL.finditer(rest):
+            names += "".join(g for g in literal.groups() if g).split()
+    return names
+
+
+def active_classes(names, viewport):
+    # Görüntü alanında geçerli sınıflar, kırılma noktası sırasıyla (büyük olan sonra gelir ve ezer);
+    # hover:, dark: gibi durum önekli sınıflar yerleşimi belirlemez
+    active = []
+    for name in names:
+        *prefixes, utility = name.split(":")
+        if any(prefix not in BREAKPOINTS for prefix in prefixes):
+            continue
+        minimum = max([BREAKPOINTS[prefix] for prefix in prefixes] or [0])
+        if viewport >= minimum:
+            active.append((minimum, utility.lstrip("!")))
+    return [utility for _, utility in sorted(active, key=lambda item: item[0])]
+
+
+def length(value, available, viewport):
+    # Tailwind uzunluk değeri -> px (bilinmeyenler kapsayıcı genişliğini alır)
+    if value in ("full", "auto", "fit", "min", "max"):
+        return available
+    if value in ("screen", "dvw", "svw", "lvw"):
+        return viewport
+    if value == "px":
+        return 1
+    if "/" in value:
+        numerator, _, denominator = value.partition("/")
+        if numerator.isdigit() and denominator.isdigit() and int(denominator):
+            return available * int(numerator) / int(denominator)
+    if value.startswith("[") and value.endswith("]"):
+        match = re.match(r'^(\d+(?:\.\d+)?)(px|vw|%|rem)?$', value[1:-1])
+        if match:
+            number, unit = float(match.group(1)), match.group(2) or "px"
+            return {"px": number, "vw": viewport * number / 100, "%": available * number / 100,
+                    "rem": number * 16}[unit]
+        return available
+    try:
+        return float(value) * SPACING_UNIT
+    except ValueError:
+        return available
+
+
+def style_width(attrs, available, viewport):
+    # style={{ width: 300, maxWidth: '50vw' }}
+    width, cap = None, None
+    for key, number, unit in STYLE_WIDTH.findall(attrs):
+        number = float(number)
+        value = {"vw": viewport * number / 100, "%": available * number / 100}.get(unit, number)
+        if key == "width":
+            width = value
+        else:
+            cap = value
+    return width, cap
+
+
+def sizes_width(sizes, viewport):
+    # sizes="(min-width: 1024px) 33vw, 100vw": ilk eşleşen koşul
+    for entry in sizes.split(","):
+        match = SIZES_ENTRY.match(entry)
+        if not match:
+            return None
+        minimum, number, unit = match.groups()
+        if minimum is None or viewport >= int(minimum):
+            return viewport * float(number) / 100 if unit == "vw" else float(number)
+    return None
+
+
+def element_width(attrs, available, viewport, is_image=False):
+    # Elemanın kendi genişliği ve içeriğine kalan genişlik (dolgu ve ızgara sütunları düşülür)
+    width, cap, padding, columns = available, None, 0.0, 1
+    for utility in active_classes(class_names(attrs), viewport):
+        key, _, value = utility.partition("-")
+        if utility == "container":
+            containers = [w for w in BREAKPOINTS.values() if w <= viewport]
+            width = min(available, max(containers)) if containers else available
+        elif key in ("w", "size") and value:
+            width = length(value, available, viewport)
+        elif utility.startswith("max-w-"):
+            cap = MAX_WIDTHS.get(utility[len("max-w-"):])
+            if cap is None and utility.endswith("]"):
+                cap = length(utility[len("max-w-"):], available, viewport)
+        elif key in ("p", "px") and value:
+            padding = 2 * length(value, 0, viewport)
+        elif key in ("pl", "pr") and value:
+            padding += length(value, 0, viewport)
+        elif utility.startswith("grid-cols-") and utility[len("grid-cols-"):].isdigit():
+            columns = int(utility[len("grid-cols-"):])
+        elif key == "columns" and value.isdigit():
+            columns = int(value)
+
+    fixed, style_cap = style_width(attrs, available, viewport)
+    if fixed is not None:
+        width = fixed
+    if is_image:
+        sizes = SIZES_PROP.search(attrs)
+        from_sizes = sizes_width(sizes.group(1), viewport) if sizes else None
+        prop = WIDTH_PROP.search(attrs)
+        if from_sizes is not None:
+            width = from_sizes
+        elif prop and fixed is None:
+            width = float(prop.group(1))
+    for limit in (cap, style_cap):
+        if limit is not None:
+            width = min(width, limit)
+    content = max(0.0, width - padding) / columns
+    return width, content
+
+
+def display_widths(chain):
+    # Temsilî görüntü alanlarında elemanın CSS piksel genişliği
+    widths = []
+    for viewport in VIEWPORTS:
+        available = float(viewport)
+        for attrs in chain[:-1]:
+            _, available = element_width(attrs, available, viewport)
+        width, _ = element_width(chain[-1], available, viewport, is_image=True)
+        widths.append(round(min(width, viewport)))
+    return widths
+
+
+def usage_widths(content, offsets, tags=None):
+    # Her referans konumu için görüntü alanı başına genişlik listesi (bilinmiyorsa None);
+    # JSX dışındaki veri alanları (image_url: "...") aynı dosyada alanı kullanan elemana bağlanır
+    tags = parse_tags(content) if tags is None else tags
+    chains = element_chains(tags, offsets)
+
+    widths = {}
+    field_widths = {}
+    for offset in offsets:
+        if chains[offset] is not None:
+            widths[offset] = display_widths(chains[offset])
+            continue
+        key = PROPERTY_KEY.search(content, max(0, offset - 80), max(0, offset - 1))
+        if not key:
+            widths[offset] = None
+            continue
+        field = key.group(1)
+        if field not in field_widths:
+            pattern = re.compile(r'[\w\]\)]\??\.' + re.escape(field) + r'\b')
+            uses = [tag[0] + 1 for tag in tags if tag[4] != "close" and pattern.search(tag[3])]
+            candidates = [display_widths(chain) for chain in element_chains(tags, uses).values() if chain]
+            # Alan birden çok yerde kullanılıyorsa görüntü alanı başına en genişi
+            field_widths[field] = [max(values) for values in zip(*candidates)] if candidates else None
+        widths[offset] = field_widths[field]
+    return [widths[offset] for offset in offsets]
+
+
+def needed_widths(profiles, ladder, max_width, fallback):
+    # Kullanım profillerinden üretilecek genişlikler: her görüntü alanı ve piksel yoğunluğu için
+    # merdivende (kategorinin kendi merdiveni) ilk eşit veya büyük adım, kategorinin en büyük
+    # genişliğiyle sınırlı.
+    # Genişliği çıkarılamayan kullanımlar için kategorinin sabit merdiveni (fallback) eklenir.
+    ladder = sorted(w for w in ladder if w <= max_width)
+    widths = set()
+    for profile in profiles:
+        if profile is None:
+            widths.update(fallback)
+            continue
+        for css_width in profile:
+            for ratio in DEVICE_PIXEL_RATIOS:
+                i = bisect.bisect_left(ladder, css_width * ratio)
+                widths.add(ladder[min(i, len(ladder) - 1)])
+    return sorted(widths) or sorted(fallback)
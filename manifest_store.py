@@ -0,0 +1,483 @@
+import os
+import json
+import sqlite3
+import argparse
+from pathlib import Path
+
+from path_rewriter import (URL_MAPPING_PATH, WEBP_MAPPING_PATHS, OPTIMIZED_COMMANDS_PATH, DUPLICATES_PATH,
+                           HASHED_MAPPING_PATH, compose_mappings, job_url_mapping)
+
+# Resim durumunun tek kaynağı: eşleştirmeler, işler, varyantlar, kaynak özetleri ve referanslar
+MANIFEST_PATH = Path(".cache/image_manifest.db")
+SCHEMA_VERSION = 3
+
+# Eşleştirme türleri, load_all_mappings öncelik sırasıyla (sonraki öncekini ezer);
+# "optimized" türü iş listesinden türetilir
+MAPPING_KINDS = ["url", "webp", "optimized", "hashed", "duplicate"]
+
+# Eski JSON dosyaları: istenince depodan dışa aktarılır, başka araçlar (webp_converter.js,
+# elle düzenleme) değiştirirse bir sonraki açılışta içe aktarılır
+LEGACY_MAPPING_FILES = [(URL_MAPPING_PATH, "url")]
+LEGACY_MAPPING_FILES += [(path, "webp") for path in WEBP_MAPPING_PATHS]
+LEGACY_MAPPING_FILES += [(HASHED_MAPPING_PATH, "hashed"), (DUPLICATES_PATH, "duplicate")]
+LEGACY_JOBS_PATH = OPTIMIZED_COMMANDS_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS mappings (
+    source TEXT NOT NULL, kind TEXT NOT NULL, target TEXT NOT NULL, PRIMARY KEY (source, kind));
+CREATE INDEX IF NOT EXISTS mappings_kind ON mappings (kind);
+CREATE INDEX IF NOT EXISTS mappings_target ON mappings (target);
+CREATE TABLE IF NOT EXISTS jobs (
+    output TEXT PRIMARY KEY, input TEXT NOT NULL, category TEXT, published TEXT, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS jobs_input ON jobs (input);
+CREATE INDEX IF NOT EXISTS jobs_published ON jobs (published);
+CREATE TABLE IF NOT EXISTS variants (
+    path TEXT PRIMARY KEY, output TEXT NOT NULL, format TEXT, width INTEGER, height INTEGER,
+    bytes INTEGER NOT NULL, sha256 TEXT);
+CREATE INDEX IF NOT EXISTS variants_output ON variants (output);
+CREATE INDEX IF NOT EXISTS variants_sha256 ON variants (sha256);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS sources_sha256 ON sources (sha256);
+CREATE TABLE IF NOT EXISTS source_files (path TEXT PRIMARY KEY, sha256 TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS refs (image TEXT NOT NULL, file TEXT NOT NULL, line INTEGER, component TEXT);
+CREATE INDEX IF NOT EXISTS refs_image ON refs (image);
+CREATE INDEX IF NOT EXISTS refs_file ON refs (file);
+CREATE TABLE IF NOT EXISTS size_runs (id INTEGER PRIMARY KEY, created REAL NOT NULL, totals TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS size_run_images (input TEXT PRIMARY KEY, bytes INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY, path TEXT NOT NULL, etag TEXT, last_modified TEXT, sha256 TEXT,
+    bytes INTEGER, checked REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0);
+"""
+
+
+def normalize_path(path):
+    # Eski Windows çıktılarındaki ters eğik çizgiler
+    return path.replace("\\", "/")
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Eski manifest dosyası okunamadı: {path} ({e})")
+        return None
+
+
+def write_json_atomic(path, data):
+    # Geçici dosyaya yaz ve tek adımda değiştir; içerik aynıysa dosyaya dokunma
+    content = json.dumps(data, indent=2, ensure_ascii=False)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+class ManifestStore:
+    def __init__(self, path=MANIFEST_PATH, sync=True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            with self.conn:
+                self.conn.executescript(SCHEMA)
+                self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        # Bu bağlantıda değişen ve dışa aktarılması gereken eski dosya türleri
+        self.dirty = set()
+        if sync:
+            self.sync_legacy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # --- eski JSON dosyalarıyla eşitleme ---
+
+    def legacy_changed(self, path):
+        signature = file_signature(path)
+        if signature is None:
+            return False  # Silinmiş dosya depodaki kayıtları silmez
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (f"legacy:{path}",)).fetchone()
+        return row is None or row[0] != signature
+
+    def remember_legacy(self, path):
+        signature = file_signature(path)
+        if signature is not None:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                              (f"legacy:{path}", signature))
+
+    def sync_legacy(self, force=False):
+        # Depo dışında değişen eski dosyaları içe aktar (ilk açılışta hepsi aktarılır)
+        imported = []
+        kinds = {kind for path, kind in LEGACY_MAPPING_FILES if force or self.legacy_changed(path)}
+        for kind in MAPPING_KINDS:
+            if kind not in kinds:
+                continue
+            mapping = {}
+            for path, file_kind in LEGACY_MAPPING_FILES:
+                if file_kind == kind and os.path.exists(path):
+                    data = read_json(path)
+                    if isinstance(data, dict):
+                        mapping.update(data)
+                    imported.append(path)
+            self.replace_mappings(kind, mapping, export=False)
+            with self.conn:
+                for path, file_kind in LEGACY_MAPPING_FILES:
+                    if file_kind == kind:
+                        self.remember_legacy(path)
+
+        if force or self.legacy_changed(LEGACY_JOBS_PATH):
+            data = read_json(LEGACY_JOBS_PATH) if os.path.exists(LEGACY_JOBS_PATH) else None
+            if isinstance(data, list):
+                self.replace_jobs([job for job in data if isinstance(job, dict) and {"input", "output"} <= job.keys()],
+                                  export=False)
+                imported.append(LEGACY_JOBS_PATH)
+            with self.conn:
+                self.remember_legacy(LEGACY_JOBS_PATH)
+        return imported
+
+    def export(self, kinds=None):
+        # Değişen (veya istenen) türlerin eski JSON dosyalarını atomik olarak yaz
+        kinds = set(self.dirty if kinds is None else kinds)
+        written = []
+        for path, kind in LEGACY_MAPPING_FILES:
+            if kind not in kinds:
+                continue
+            mapping = self.mapping(kind)
+            # Hiç kullanılmamış özellikler için boş dosya oluşturma
+            if (mapping or os.path.exists(path)) and write_json_atomic(path, mapping):
+                written.append(path)
+        if "jobs" in kinds and write_json_atomic(LEGACY_JOBS_PATH, self.jobs()):
+            written.append(LEGACY_JOBS_PATH)
+        with self.conn:
+            for path, kind in LEGACY_MAPPING_FILES + [(LEGACY_JOBS_PATH, "jobs")]:
+                if kind in kinds:
+                    self.remember_legacy(path)
+        self.dirty -= kinds
+        return written
+
+    # --- eşleştirmeler ---
+
+    def mapping(self, kind):
+        rows = self.conn.execute("SELECT source, target FROM mappings WHERE kind = ? ORDER BY rowid", (kind,))
+        return dict(rows)
+
+    def set_mappings(self, kind, mapping):
+        # Kayıtları ekle veya güncelle; diğer kayıtlar korunur
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO mappings (source, kind, target) VALUES (?, ?, ?) "
+                "ON CONFLICT (source, kind) DO UPDATE SET target = excluded.target "
+                "WHERE target != excluded.target",
+                [(source, kind, target) for source, target in mapping.items()])
+        self.dirty.add(kind)
+
+    def replace_mappings(self, kind, mapping, export=True):
+        # Türün tüm kayıtlarını verilen eşleştirmeyle değiştir
+        with self.conn:
+            self.write_mapping_rows(kind, mapping)
+        if export:
+            self.dirty.add(kind)
+
+    def write_mapping_rows(self, kind, mapping):
+        # Sadece eklenen, silinen veya hedefi değişen satırlar yazılır (açık işlem içinde çağrılır)
+        current = self.mapping(kind)
+        removed = [(source, kind) for source in current if source not in mapping]
+        self.conn.executemany("DELETE FROM mappings WHERE source = ? AND kind = ?", removed)
+        self.conn.executemany(
+            "INSERT INTO mappings (source, kind, target) VALUES (?, ?, ?) "
+            "ON CONFLICT (source, kind) DO UPDATE SET target = excluded.target",
+            [(source, kind, target) for source, target in mapping.items() if current.get(source) != target])
+
+    def all_mappings(self):
+        # Tüm türler öncelik sırasıyla birleştirilmiş ve zincirleri çözülmüş olarak
+        return compose_mappings(*(self.mapping(kind) for kind in MAPPING_KINDS))
+
+    def resolve(self, url):
+        # Tek bir URL'yi indeks üzerinden son hedefine kadar çöz
+        priority = {kind: i for i, kind in enumerate(MAPPING_KINDS)}
+        seen = {url}
+        current = url
+        while True:
+            rows = self.conn.execute("SELECT kind, target FROM mappings WHERE source = ?", (current,)).fetchall()
+            if not rows:
+                break
+            target = max(rows, key=lambda row: priority.get(row[0], -1))[1]
+            if target in seen:
+                break
+            seen.add(target)
+            current = target
+        return current if current != url else None
+
+    # --- işler ve varyantlar ---
+
+    def jobs(self):
+        return [json.loads(data) for (data,) in self.conn.execute("SELECT data FROM jobs ORDER BY rowid")]
+
+    def replace_jobs(self, jobs, export=True):
+        # İş listesini güncelle: sadece değişen işler yazılır, listede olmayanlar silinir
+        rows = {}
+        for job in jobs:
+            output = normalize_path(job["output"])
+            published = normalize_path(job["published"]) if job.get("published") else None
+            rows[output] = (output, normalize_path(job["input"]), job.get("category"), published,
+                            json.dumps(job, ensure_ascii=False))
+
+        with self.conn:
+            current = dict(self.conn.execute("SELECT output, data FROM jobs"))
+            removed = [output for output in current if output not in rows]
+            changed = [row for output, row in rows.items() if current.get(output) != row[4]]
+            self.conn.executemany("DELETE FROM jobs WHERE output = ?", [(output,) for output in removed])
+            self.conn.executemany(
+                "INSERT INTO jobs (output, input, category, published, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (output) DO UPDATE SET input = excluded.input, category = excluded.category, "
+                "published = excluded.published, data = excluded.data",
+                changed)
+
+            # İşlerden türetilen orijinal URL -> optimize URL eşleştirmesi
+            optimized = dict(job_url_mapping(json.loads(row[4])) for row in rows.values())
+            self.write_mapping_rows("optimized", optimized)
+        if export and (removed or changed):
+            self.dirty.add("jobs")
+        return len(changed) + len(removed)
+
+    def job_for(self, path):
+        # Kaynak, çıktı veya yayımlanan (içerik özetli) yoldan işi bul
+        path = normalize_path(path)
+        row = self.conn.execute(
+            "SELECT data FROM jobs WHERE output = ? UNION ALL SELECT data FROM jobs WHERE published = ? "
+            "UNION ALL SELECT data FROM jobs WHERE input = ? LIMIT 1", (path, path, path)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_results(self, results):
+        # Kodlama sonuçlarının varyant dosyalarını kaydet; içerik özeti sadece yeni veya
+        # boyutu değişen dosyalar için hesaplanır
+        from build_cache import file_hash
+
+        with self.conn:
+            for result in results:
+                output = normalize_path(result["output"])
+                current = {path: size for path, size in self.conn.execute(
+                    "SELECT path, bytes FROM variants WHERE output = ?", (output,))}
+                live = set()
+                for variant in result.get("variants", []):
+                    for fmt, encoded in variant.get("formats", {result.get("format"): variant}).items():
+                        path = normalize_path(encoded["path"])
+                        live.add(path)
+                        if current.get(path) == encoded["bytes"]:
+                            continue
+                        try:
+                            sha = file_hash(path)
+                        except OSError:
+                            sha = None
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO variants (path, output, format, width, height, bytes, sha256) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (path, output, fmt, variant.get("width"), variant.get("height"), encoded["bytes"], sha))
+                self.conn.executemany("DELETE FROM variants WHERE path = ?",
+                                      [(path,) for path in current if path not in live])
+
+    def variant(self, path):
+        row = self.conn.execute("SELECT path, output, format, width, height, bytes, sha256 FROM variants "
+                                "WHERE path = ?", (normalize_path(path),)).fetchone()
+        return self.variant_row(row) if row else None
+
+    def variants_for(self, output):
+        rows = self.conn.execute("SELECT path, output, format, width, height, bytes, sha256 FROM variants "
+                                 "WHERE output = ? ORDER BY width, format", (normalize_path(output),))
+        return [self.variant_row(row) for row in rows]
+
+    def variants_by_output(self):
+        # Tüm varyantlar tek sorguda, çıktı yoluna göre gruplanmış
+        grouped = {}
+        rows = self.conn.execute("SELECT path, output, format, width, height, bytes, sha256 FROM variants "
+                                 "ORDER BY output, width, format")
+        for row in rows:
+            grouped.setdefault(row[1], []).append(self.variant_row(row))
+        return grouped
+
+    @staticmethod
+    def variant_row(row):
+        return dict(zip(("path", "output", "format", "width", "height", "bytes", "sha256"), row))
+
+    def find_hash(self, prefix):
+        # Özet önekiyle eşleşen kaynaklar ve varyantlar (aralık sorgusu indeksi kullanır)
+        prefix = prefix.lower()
+        upper = prefix + "g"
+        sources = [path for (path,) in self.conn.execute(
+            "SELECT path FROM sources WHERE sha256 >= ? AND sha256 < ?", (prefix, upper))]
+        variants = [path for (path,) in self.conn.execute(
+            "SELECT path FROM variants WHERE sha256 >= ? AND sha256 < ?", (prefix, upper))]
+        return sources, variants
+
+    # --- kaynak özetleri ve referanslar ---
+
+    def record_sources(self, sources):
+        # BuildCache.sources: yol -> {size, mtime_ns, sha256}; sadece değişen satırlar yazılır
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO sources (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "sha256 = excluded.sha256 WHERE sha256 != excluded.sha256 OR mtime_ns != excluded.mtime_ns "
+                "OR size != excluded.size",
+                [(path, entry["size"], entry["mtime_ns"], entry["sha256"]) for path, entry in sources.items()])
+
+    def source(self, path):
+        row = self.conn.execute("SELECT size, mtime_ns, sha256 FROM sources WHERE path = ?",
+                                (normalize_path(path),)).fetchone()
+        return dict(zip(("size", "mtime_ns", "sha256"), row)) if row else None
+
+    def record_references(self, files):
+        # ImageIndex.files: içerik özeti değişen kaynak dosyaların referansları yenilenir
+        with self.conn:
+            current = dict(self.conn.execute("SELECT path, sha256 FROM source_files"))
+            stale = [path for path in current if path not in files]
+            stale += [path for path, entry in files.items() if current.get(path) != entry["sha256"]]
+            for path in stale:
+                self.conn.execute("DELETE FROM refs WHERE file = ?", (path,))
+                self.conn.execute("DELETE FROM source_files WHERE path = ?", (path,))
+                entry = files.get(path)
+                if entry is None:
+                    continue
+                self.conn.execute("INSERT INTO source_files (path, sha256) VALUES (?, ?)", (path, entry["sha256"]))
+                self.conn.executemany("INSERT INTO refs (image, file, line, component) VALUES (?, ?, ?, ?)",
+                                      [(image, path, line, component) for image, line, component in entry["refs"]])
+        return len(stale)
+
+    def references(self, image):
+        return self.conn.execute("SELECT file, line, component FROM refs WHERE image = ? ORDER BY file, line",
+                                 (image,)).fetchall()
+
+    def lookup(self, key):
+        # Orijinal URL, çıktı/varyant yolu veya içerik özeti (öneki) ile arama
+        from path_rewriter import public_url
+
+        found = {}
+        path = normalize_path(key)
+        if path.startswith("/images/"):
+            path = "public" + path
+        url = public_url(path) if path.startswith("public/") else key
+
+        target = self.resolve(url)
+        if target:
+            found["resolved"] = target
+        job = self.job_for(path)
+        if job:
+            found["job"] = job
+            found["variants"] = self.variants_for(job["output"])
+        variant = self.variant(path)
+        if variant:
+            found["variant"] = variant
+        source = self.source(path)
+        if source:
+            found["source"] = source
+        references = self.references(url)
+        if references:
+            found["references"] = [{"file": f, "line": line, "component": c} for f, line, c in references]
+        if all(c in "0123456789abcdef" for c in key.lower()) and len(key) >= 6:
+            sources, variants = self.find_hash(key)
+            if sources or variants:
+                found["hash_matches"] = {"sources": sources, "variants": variants}
+        return found
+
+    # --- boyut raporu geçmişi (compare_sizes.py) ---
+
+    def last_size_run(self):
+        row = self.conn.execute("SELECT created, totals FROM size_runs ORDER BY id DESC LIMIT 1").fetchone()
+        return {"created": row[0], "totals": json.loads(row[1])} if row else None
+
+    def size_run_images(self):
+        # Son çalıştırmada kaynak yolu -> optimize bayt
+        return dict(self.conn.execute("SELECT input, bytes FROM size_run_images"))
+
+    def record_size_run(self, created, totals, images):
+        # Çalıştırmanın toplamlarını geçmişe ekle; resim boyutlarından sadece son çalıştırma tutulur
+        with self.conn:
+            self.conn.execute("INSERT INTO size_runs (created, totals) VALUES (?, ?)",
+                              (created, json.dumps(totals)))
+            current = self.size_run_images()
+            self.conn.executemany("DELETE FROM size_run_images WHERE input = ?",
+                                  [(path,) for path in current if path not in images])
+            self.conn.executemany("INSERT OR REPLACE INTO size_run_images (input, bytes) VALUES (?, ?)",
+                                  [(path, size) for path, size in images.items() if current.get(path) != size])
+
+    # --- uzak resimlerin HTTP doğrulayıcıları (download_images.py) ---
+
+    def http_cache(self):
+        # URL -> son yanıtın ETag/Last-Modified değerleri ve içerik özeti
+        rows = self.conn.execute("SELECT url, path, etag, last_modified, sha256, bytes, hits FROM http_cache")
+        return {row[0]: dict(zip(("path", "etag", "last_modified", "sha256", "bytes", "hits"), row[1:]))
+                for row in rows}
+
+    def record_http_results(self, results, checked):
+        # 304 yanıtları isabet sayılır; diğerleri doğrulayıcıları ve özeti günceller
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO http_cache (url, path, etag, last_modified, sha256, bytes, checked, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (url) DO UPDATE SET path = excluded.path, "
+                "etag = excluded.etag, last_modified = excluded.last_modified, sha256 = excluded.sha256, "
+                "bytes = excluded.bytes, checked = excluded.checked, hits = hits + excluded.hits",
+                [(r["url"], normalize_path(r["path"]), r["etag"], r["last_modified"], r["sha256"], r["bytes"],
+                  checked, int(r["status"] == "not_modified")) for r in results])
+
+    def stats(self):
+        tables = ["mappings", "jobs", "variants", "sources", "refs", "size_runs", "http_cache"]
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resim manifest deposunu yönetir")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("import", help="Eski JSON dosyalarını depoya yeniden aktar")
+    subparsers.add_parser("export", help="Eski JSON dosyalarını depodan yeniden üret")
+    lookup_parser = subparsers.add_parser("lookup", help="URL, çıktı yolu veya içerik özetiyle ara")
+    lookup_parser.add_argument("key")
+    subparsers.add_parser("stats", help="Depodaki kayıt sayılarını göster")
+    args = parser.parse_args()
+
+    with ManifestStore(sync=args.command != "import") as store:
+        if args.command == "import":
+            imported = store.sync_legacy(force=True)
+            print(f"{len(imported)} dosya içe aktarıldı: {', '.join(imported)}")
+        elif args.command == "export":
+            written = store.export(MAPPING_KINDS + ["jobs"])
+            print(f"{len(written)} dosya güncellendi." if written else "Tüm dosyalar güncel.")
+        elif args.command == "lookup":
+            found = store.lookup(args.key)
+            if not found:
+                print(f"Kayıt bulunamadı: {args.key}")
+                raise SystemExit(1)
+            print(json.dumps(found, indent=2, ensure_ascii=False))
+        else:
+            for table, rows in store.stats().items():
+                print(f"{table}: {rows}")
+            print(f"Depo: {store.path} ({os.path.getsize(store.path) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,68 @@
 import os
 import json
-import re
-import subprocess
+import argparse
 from pathlib import Path
 from collections import defaultdict
 
+from pipeline_trace import span, add_trace_arguments, start_from_args, finish_from_args
+
 # Kategori tanımları ve optimizasyon ayarları
 IMAGE_CATEGORIES = {
     "hero": {
         "max_width": 1200,
         "quality": 75,
-        "format": "webp"
+        "format": "webp",
+        "widths": [320, 640, 960, 1200]
     },
     "thumbnail": {
         "max_width": 400,
         "quality": 70,
-        "format": "webp"
+        "format": "webp",
+        "widths": [160, 320, 400]
     },
     "background": {
         "max_width": 1600,
         "quality": 65,
-        "format": "webp"
+        "format": "webp",
+        "widths": [320, 640, 960, 1200, 1600]
     },
     "gallery": {
         "max_width": 800,
         "quality": 75,
-        "format": "webp"
+        "format": "webp",
+        "widths": [320, 480, 640, 800]
     },
     "style": {
         "max_width": 500,
         "quality": 70,
-        "format": "webp"
+        "format": "webp",
+        "widths": [250, 320, 500]
     }
 }
 
+# Kategorisi verilmeyen dönüştürme istekleri bu merdivene yuvarlanır (tüm kategorilerin genişlikleri)
+ALL_WIDTHS = sorted({width for settings in IMAGE_CATEGORIES.values() for width in settings["widths"]})
+
+# Her varyant için üretilecek formatlar (kategori formatı ana çıktıdır;
+# bir sonraki yedekten küçük olmayan formatlar otomatik atılır)
+OUTPUT_FORMATS = ["avif", "webp", "jpeg"]
+
+# Formatların <picture> için MIME türleri
+FORMAT_MIME_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg"
+}
+
+# Kategori önceliği: hero > background > gallery > style > thumbnail
+CATEGORY_PRIORITY = ["hero", "background", "gallery", "style", "thumbnail"]
+
 # Dosya yolları
 IMAGES_DIR = Path("public/images")
 OPTIMIZED_DIR = Path("public/images/optimized")
-OPTIMIZED_DIR.mkdir(exist_ok=True)
+
+# Frontend'in srcset/sizes üretmesi için varyant manifesti
+VARIANT_MANIFEST_PATH = Path("public/image_variants.json")
 
 # Dosya ve içerik eşleştirmeleri
 file_content_map = {
@@ -49,241 +74,315 @@ file_content_map = {
     "src/pages/artist/[id].tsx": "hero"
 }
 
-# Resim ve kategori eşleştirmelerini saklamak için sözlük
-image_categories = defaultdict(list)
-
-# Resim kullanımlarını bul
-for file_path, category in file_content_map.items():
-    if not os.path.exists(file_path):
-        print(f"Dosya bulunamadı: {file_path}")
-        continue
-        
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-        
-    # /images/ ile başlayan dosya yollarını bul
-    pattern = r'/images/([^"\'\s)]*)'
-    image_paths = re.findall(pattern, content)
-    
-    for img_path in image_paths:
-        full_path = f"/images/{img_path}"
-        image_categories[full_path].append(category)
-
-print(f"Toplam {len(image_categories)} benzersiz resim bulundu.")
-
-# Her resmin en önemli kategorisini belirle
-image_primary_category = {}
-for img_path, categories in image_categories.items():
-    # Kategori önceliği: hero > background > gallery > style > thumbnail
-    priority_order = ["hero", "background", "gallery", "style", "thumbnail"]
-    
-    primary_category = "thumbnail"  # Varsayılan kategori
-    for cat in priority_order:
-        if cat in categories:
-            primary_category = cat
-            break
-    
-    image_primary_category[img_path] = primary_category
-    print(f"{img_path}: {primary_category} (kullanım: {', '.join(categories)})")
-
-# Optimizasyon komutlarını oluştur
-optimization_commands = []
-
-for img_path, category in image_primary_category.items():
-    # Dosya adını al
-    filename = os.path.basename(img_path)
-    input_path = IMAGES_DIR / filename
-    
-    if not input_path.exists():
-        print(f"Dosya bulunamadı: {input_path}")
-        continue
-    
-    # Optimizasyon ayarlarını al
-    settings = IMAGE_CATEGORIES[category]
-    output_filename = f"{filename.split('.')[0]}.{settings['format']}"
-    output_path = OPTIMIZED_DIR / output_filename
-    
-    # Sharp komutu oluştur
-    command = f"npx sharp {input_path} --output {output_path} "
-    command += f"--format {settings['format']} "
-    command += f"--quality {settings['quality']} "
-    command += f"--width {settings['max_width']} "
-    
-    optimization_commands.append({
-        "command": command,
-        "input": str(input_path),
-        "output": str(output_path),
-        "category": category
-    })
-
-# Komutları JSON olarak kaydet
-with open("optimization_commands.json", 'w', encoding='utf-8') as f:
-    json.dump(optimization_commands, f, indent=2, ensure_ascii=False)
-
-print(f"Optimizasyon komutları optimization_commands.json dosyasına kaydedildi.")
-
-# Optimizasyon betiği oluştur
-with open("run_optimization.bat", 'w', encoding='utf-8') as f:
-    f.write("@echo off\n")
-    f.write("echo Resim optimizasyonu başlatılıyor...\n")
-    f.write("npm install -g sharp-cli\n\n")
-    
-    for cmd in optimization_commands:
-        f.write(f"echo {cmd['category']} kategorisinde optimizasyon: {os.path.basename(cmd['input'])}\n")
-        f.write(f"{cmd['command']}\n")
-    
-    f.write("\necho Optimizasyon tamamlandı!\n")
-    f.write("echo Orijinal ve optimize edilmiş boyutlar karşılaştırılıyor...\n")
-    f.write("python compare_sizes.py\n")
-
-print("run_optimization.bat dosyası oluşturuldu.")
-
-# Boyut karşılaştırma betiği oluştur
-with open("compare_sizes.py", 'w', encoding='utf-8') as f:
-    f.write("""import os
-import json
-from pathlib import Path
+# Eşleştirme tablosunda olmayan dosyalar için ipuçları (resim yolu veya bileşen adında)
+CATEGORY_HINTS = {
+    "hero": ["hero"],
+    "background": ["background", "-bg", "bg-", "pattern"],
+    "gallery": ["gallery"],
+    "style": ["style"]
+}
 
-# Dosya yolları
-IMAGES_DIR = Path("public/images")
-OPTIMIZED_DIR = Path("public/images/optimized")
+# Optimize edilmeyecek resimler (üretilen çıktılar ve atlas sayfaları)
+SKIP_PREFIXES = ("/images/optimized/", "/images/webp/", "/images/atlas/")
+RASTER_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+def guess_category(img_path, ref):
+    text = f"{img_path} {ref.component}".lower()
+    for category in CATEGORY_PRIORITY:
+        if any(hint in text for hint in CATEGORY_HINTS.get(category, [])):
+            return category
+    return "thumbnail"
+
+
+def find_image_usages(index, verbose=True):
+    # Resim ve kategori eşleştirmelerini referans indeksinden oluştur
+    from manifest_store import ManifestStore
+
+    # Kopya resimlerin kullanımları kanonik kaynağa sayılır, kopya kodlanmaz
+    with ManifestStore() as store:
+        duplicates = store.mapping("duplicate")
+    image_categories = defaultdict(list)
+
+    for img_path, refs in index.local_images().items():
+        if img_path.startswith(SKIP_PREFIXES):
+            continue
+        if os.path.splitext(img_path)[1].lower() not in RASTER_EXTENSIONS:
+            continue
+        img_path = duplicates.get(img_path, img_path)
+
+        for ref in refs:
+            category = file_content_map.get(ref.file) or guess_category(img_path, ref)
+            image_categories[img_path].append(category)
+
+    if verbose:
+        print(f"Toplam {len(image_categories)} benzersiz resim bulundu.")
+    return image_categories
+
+
+def resolve_primary_categories(image_categories, verbose=True):
+    # Her resmin en önemli kategorisini belirle
+    image_primary_category = {}
+    with span("categorize", images=len(image_categories)):
+        for img_path, categories in image_categories.items():
+            primary_category = "thumbnail"  # Varsayılan kategori
+            for cat in CATEGORY_PRIORITY:
+                if cat in categories:
+                    primary_category = cat
+                    break
+
+            image_primary_category[img_path] = primary_category
+            if verbose:
+                print(f"{img_path}: {primary_category} (kullanım: {', '.join(categories)})")
+
+    return image_primary_category
+
+
+def infer_widths(index, image_primary_category, verbose=True):
+    # Kullanım yerlerindeki Tailwind sınıfları, stil ve width/sizes özelliklerinden
+    # gerçekten gösterilen genişlikler; kategorinin merdivenine yuvarlanır, böylece çıkarım
+    # sabit merdivenden fazla varyant üretmez, sadece kullanılmayan adımları atar
+    from image_sizing import needed_widths
+    from manifest_store import ManifestStore
+
+    with ManifestStore() as store:
+        duplicates = store.mapping("duplicate")
+    profiles = defaultdict(list)
+    for img_path, widths in index.usage_widths().items():
+        profiles[duplicates.get(img_path, img_path)] += widths
+
+    image_widths = {}
+    for img_path, category in image_primary_category.items():
+        if img_path not in profiles:
+            continue  # Kaynakta artık görünmeyen (yolu yeniden yazılmış) resim: kategori merdiveni
+        settings = IMAGE_CATEGORIES[category]
+        widths = needed_widths(profiles[img_path], settings["widths"], settings["max_width"], settings["widths"])
+        image_widths[img_path] = widths
+        if verbose and widths != settings["widths"]:
+            print(f"{img_path}: genişlikler {widths} ({category} merdiveni: {settings['widths']})")
+    return image_widths
+
+
+def previous_categories():
+    # Önceki çalıştırmada optimize edilen resimler ve kategorileri; kaynaktaki yolu
+    # optimize çıktısına yeniden yazılmış resimler de güncel tutulmaya devam eder
+    # (eski biçimdeki .bat dönemi kayıtları atlanır)
+    from manifest_store import ManifestStore
+
+    with ManifestStore() as store:
+        jobs = store.jobs()
+    return {
+        "/" + Path(job["input"]).relative_to("public").as_posix(): job["category"]
+        for job in jobs
+        if {"input", "width", "format", "category"} <= job.keys()
+        and job["category"] in IMAGE_CATEGORIES and os.path.exists(job["input"])
+    }
 
-# Optimizasyon komutlarını yükle
-with open("optimization_commands.json", 'r', encoding='utf-8') as f:
-    commands = json.load(f)
-
-# Toplam boyut tasarrufu
-total_original_size = 0
-total_optimized_size = 0
-savings_by_category = {}
-
-print("\\nOptimizasyon Sonuçları:")
-print("-" * 80)
-print(f"{'Dosya Adı':<30} {'Kategori':<12} {'Orijinal':<10} {'Optimize':<10} {'Tasarruf':<10} {'Oran':<6}")
-print("-" * 80)
-
-for cmd in commands:
-    input_path = cmd['input']
-    output_path = cmd['output']
-    category = cmd['category']
-    
-    if os.path.exists(input_path) and os.path.exists(output_path):
-        original_size = os.path.getsize(input_path)
-        optimized_size = os.path.getsize(output_path)
-        
-        savings = original_size - optimized_size
-        savings_percent = (savings / original_size) * 100 if original_size > 0 else 0
-        
-        # Toplam istatistikleri güncelle
-        total_original_size += original_size
-        total_optimized_size += optimized_size
-        
-        # Kategori bazında istatistikleri güncelle
-        if category not in savings_by_category:
-            savings_by_category[category] = {
-                "original": 0,
-                "optimized": 0,
-                "count": 0
-            }
-        
-        savings_by_category[category]["original"] += original_size
-        savings_by_category[category]["optimized"] += optimized_size
-        savings_by_category[category]["count"] += 1
-        
-        # Sonuçları yazdır
-        print(f"{os.path.basename(input_path):<30} {category:<12} "
-              f"{original_size/1024:.1f} KB   {optimized_size/1024:.1f} KB   "
-              f"{savings/1024:.1f} KB    {savings_percent:.1f}%")
-
-# Toplam tasarruf
-total_savings = total_original_size - total_optimized_size
-total_savings_percent = (total_savings / total_original_size) * 100 if total_original_size > 0 else 0
-
-print("-" * 80)
-print(f"{'TOPLAM':<30} {'Tüm':<12} "
-      f"{total_original_size/1024:.1f} KB   {total_optimized_size/1024:.1f} KB   "
-      f"{total_savings/1024:.1f} KB    {total_savings_percent:.1f}%")
-print("-" * 80)
-
-# Kategori bazında sonuçlar
-print("\\nKategori Bazında Sonuçlar:")
-print("-" * 80)
-print(f"{'Kategori':<12} {'Resim Sayısı':<12} {'Orijinal':<10} {'Optimize':<10} {'Tasarruf':<10} {'Oran':<6}")
-print("-" * 80)
-
-for category, stats in savings_by_category.items():
-    cat_original = stats["original"]
-    cat_optimized = stats["optimized"]
-    cat_savings = cat_original - cat_optimized
-    cat_savings_percent = (cat_savings / cat_original) * 100 if cat_original > 0 else 0
-    
-    print(f"{category:<12} {stats['count']:<12} "
-          f"{cat_original/1024:.1f} KB   {cat_optimized/1024:.1f} KB   "
-          f"{cat_savings/1024:.1f} KB    {cat_savings_percent:.1f}%")
-
-print("-" * 80)
-""")
-
-print("compare_sizes.py dosyası oluşturuldu.")
-
-# URL güncelleme betiği oluştur
-with open("update_image_paths.py", 'w', encoding='utf-8') as f:
-    f.write("""import os
-import json
-import re
-from pathlib import Path
 
-# Optimizasyon komutlarını yükle
-with open("optimization_commands.json", 'r', encoding='utf-8') as f:
-    commands = json.load(f)
-
-# Dosya yolları eşleştirmelerini oluştur
-path_mapping = {}
-for cmd in commands:
-    input_filename = os.path.basename(cmd['input'])
-    output_filename = os.path.basename(cmd['output'])
-    
-    # Orijinal yol: /images/filename.jpg
-    # Optimize yol: /images/optimized/filename.webp
-    original_path = f"/images/{input_filename}"
-    optimized_path = f"/images/optimized/{output_filename}"
-    
-    path_mapping[original_path] = optimized_path
-
-# Dosyalardaki yolları güncelle
-files_to_update = [
-    "src/components/sections/Hero.tsx",
-    "src/components/sections/Gallery.tsx",
-    "src/data/artStyles.ts",
-    "src/data/artModules.ts",
-    "src/pages/generate/video.tsx",
-    "src/pages/artist/[id].tsx",
-    "Home.tsx"
-]
-
-for file_path in files_to_update:
-    if not os.path.exists(file_path):
-        print(f"Dosya bulunamadı: {file_path}")
-        continue
-        
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    
-    # Her yolu güncelle
-    for original_path, optimized_path in path_mapping.items():
-        content = content.replace(original_path, optimized_path)
-    
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write(content)
-    
-    print(f"Dosya güncellendi: {file_path}")
-
-print("Tüm dosya yolları güncellendi!")
-""")
-
-print("update_image_paths.py dosyası oluşturuldu.")
-
-print("\nTüm betikler oluşturuldu. Optimizasyon işlemini başlatmak için şu komutu çalıştırın:")
-print("run_optimization.bat")
-print("\nOptimizasyon tamamlandıktan sonra, dosya yollarını güncellemek için şu komutu çalıştırın:")
-print("python update_image_paths.py")
+def build_jobs(image_primary_category, target_ssim=None, formats=OUTPUT_FORMATS, verbose=True,
+               hashed_names=False, image_widths=None):
+    # Kodlama işlerini IMAGE_CATEGORIES tablosundan oluştur
+    from image_probe import ProbeIndex, display_size
+
+    jobs = []
+    probes = ProbeIndex()
+
+    for img_path, category in image_primary_category.items():
+        relative_path = Path(img_path).relative_to("/images")
+        input_path = IMAGES_DIR / relative_path
+
+        if not input_path.exists():
+            if verbose:
+                print(f"Dosya bulunamadı: {input_path}")
+            continue
+
+        settings = IMAGE_CATEGORIES[category]
+        output_path = OPTIMIZED_DIR / relative_path.with_suffix(f".{settings['format']}")
+
+        # Çıkarılan genişlikler yoksa kategorinin sabit merdiveni
+        widths = (image_widths or {}).get(img_path) or settings["widths"]
+        # Kaynaktan geniş adımlar büyütülmez, kaynağın kendi genişliğine iner
+        info = probes.get(input_path)
+        if info:
+            source_width = display_size(info)[0]
+            widths = sorted({min(width, source_width) for width in widths})
+        job = {
+            "input": input_path.as_posix(),
+            "output": output_path.as_posix(),
+            "category": category,
+            "width": max(widths),
+            "widths": widths,
+            "quality": settings["quality"],
+            "format": settings["format"],
+            "formats": list(formats)
+        }
+        # Sabit kalite yerine hedef SSIM'i sağlayan en düşük kaliteyi ara
+        if target_ssim:
+            job["target_ssim"] = target_ssim
+        # Çıktıları x.<içerik özeti>.webp olarak yaz (immutable önbellek için)
+        if hashed_names:
+            job["hashed_names"] = True
+        jobs.append(job)
+
+    probes.save()
+    return jobs
+
+
+def to_public_url(path):
+    # public/images/x.webp -> /images/x.webp
+    return "/" + Path(path).relative_to("public").as_posix()
+
+
+def write_jobs(jobs, results, cache=None, index=None):
+    # İşleri, varyantları, kaynak özetlerini ve referansları manifest deposuna kaydet ve
+    # optimization_commands.json dosyasını dışa aktar (compare_sizes.py kullanır);
+    # içerik özetli adla yazılan çıktılar "published" alanında tutulur
+    from manifest_store import ManifestStore
+
+    published = {result["output"]: result["variants"][0]["path"] for result in results if result.get("variants")}
+    for job in jobs:
+        job.pop("published", None)
+        if published.get(job["output"], job["output"]) != job["output"]:
+            job["published"] = published[job["output"]]
+
+    with ManifestStore() as store:
+        store.replace_jobs(jobs)
+        store.record_results(results)
+        if cache is not None:
+            store.record_sources(cache.sources)
+        if index is not None:
+            store.record_references(index.files)
+        store.export()
+
+
+def write_variant_manifest(jobs, results):
+    # Orijinal yol -> genişlik, yükseklik ve bayt boyutlarıyla varyant listesi
+    results_by_output = {result["output"]: result for result in results}
+    manifest = {}
+
+    for job in jobs:
+        result = results_by_output.get(job["output"])
+        if not result:
+            continue
+
+        variants = sorted(result["variants"], key=lambda v: v["width"])
+
+        # <picture> kaynakları: format başına srcset (en verimli format önce)
+        sources = {}
+        for fmt in OUTPUT_FORMATS:
+            srcset = [f"{to_public_url(v['formats'][fmt]['path'])} {v['width']}w"
+                      for v in variants if fmt in v.get("formats", {})]
+            if srcset:
+                sources[FORMAT_MIME_TYPES[fmt]] = ", ".join(srcset)
+
+        manifest[to_public_url(job["input"])] = {
+            "category": job["category"],
+            "src": to_public_url(result["variants"][0]["path"]),
+            "variants": [
+                {
+                    "url": to_public_url(variant["path"]),
+                    "width": variant["width"],
+                    "height": variant["height"],
+                    "bytes": variant["bytes"],
+                    "formats": {
+                        fmt: {"url": to_public_url(encoded["path"]), "bytes": encoded["bytes"]}
+                        for fmt, encoded in variant.get("formats", {}).items()
+                    }
+                }
+                for variant in variants
+            ],
+            "srcset": ", ".join(f"{to_public_url(v['path'])} {v['width']}w" for v in variants),
+            "sources": sources,
+            "placeholder": result.get("placeholder")
+        }
+
+    with open(VARIANT_MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print(f"Varyant manifesti {VARIANT_MANIFEST_PATH} dosyasına kaydedildi.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kaynak kodda kullanılan resimleri optimize eder")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Paralel kodlama süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--force", action="store_true",
+                        help="Önbelleği yok say ve tüm resimleri yeniden kodla")
+    parser.add_argument("--memory-budget", type=int, default=None,
+                        help="Eşzamanlı kodlama işleri için toplam bellek bütçesi (MB)")
+    parser.add_argument("--target-ssim", type=float, default=None,
+                        help="Her resim için bu SSIM skorunu sağlayan en düşük kaliteyi ara (örn. 0.95)")
+    parser.add_argument("--formats", default=",".join(OUTPUT_FORMATS),
+                        help="Üretilecek formatlar, virgülle ayrılmış (varsayılan: avif,webp,jpeg)")
+    parser.add_argument("--hashed-names", action="store_true",
+                        help="Çıktıları içerik özetli adlarla yaz, eskilerini sil ve netlify.toml "
+                             "immutable önbellek kurallarını üret")
+    parser.add_argument("--category-widths", action="store_true",
+                        help="Genişlikleri kullanım yerlerinden çıkarma, kategorinin sabit merdivenini kullan")
+    parser.add_argument("--atlas", action="store_true",
+                        help="İkonları ve style/thumbnail kategorilerinin küçük varyantlarını sprite sayfalarına paketle")
+    parser.add_argument("--subset-fonts", action="store_true",
+                        help="public/fonts altındaki fontları kaynakta kullanılan karakterlere indirge")
+    parser.add_argument("--precompress", action="store_true",
+                        help="public/ altındaki metin tabanlı dosyalar için .br ve .gz yan dosyalarını da üret")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    from build_cache import BuildCache, encode_with_cache
+    from image_encoder import supported_formats
+    from image_index import load_index
+    from image_placeholder import write_placeholder_mapping
+
+    OPTIMIZED_DIR.mkdir(exist_ok=True)
+
+    index = load_index()
+    image_primary_category = previous_categories()
+    image_primary_category.update(resolve_primary_categories(find_image_usages(index)))
+    image_widths = None if args.category_widths else infer_widths(index, image_primary_category)
+    jobs = build_jobs(image_primary_category, target_ssim=args.target_ssim,
+                      formats=supported_formats(args.formats.split(",")), hashed_names=args.hashed_names,
+                      image_widths=image_widths)
+
+    # Kaynağı ve ayarları değişmeyen çıktıları atla
+    memory_budget = args.memory_budget * 1024 * 1024 if args.memory_budget else None
+    cache = BuildCache()
+    results = encode_with_cache(jobs, workers=args.workers, force=args.force,
+                                memory_budget=memory_budget, cache=cache)
+
+    write_jobs(jobs, results, cache=cache, index=index)
+    print(f"Optimizasyon işleri optimization_commands.json dosyasına kaydedildi.")
+
+    from hashed_assets import publish_results, update_netlify_headers
+    if args.hashed_names:
+        publish_results(jobs, results, [OPTIMIZED_DIR])
+    else:
+        update_netlify_headers([OPTIMIZED_DIR], enabled=False)
+
+    write_variant_manifest(jobs, results)
+    write_placeholder_mapping(results)
+
+    if args.atlas:
+        from image_atlas import build_atlas
+        from manifest_store import ManifestStore
+        with ManifestStore() as store:
+            build_atlas(store)
+
+    if args.subset_fonts:
+        from font_subset import subset_fonts
+        subset_fonts(index)
+
+    if args.precompress:
+        # Eşleştirme dosyaları yukarıda güncellendi; yan dosyalar onlardan sonra üretilir
+        from precompress_assets import precompress
+        precompress(workers=args.workers)
+    finish_from_args(args)
+
+    print("\nBoyutları karşılaştırmak için şu komutu çalıştırın:")
+    print("python compare_sizes.py")
+    print("\nDosya yollarını güncellemek için şu komutu çalıştırın:")
+    print("python update_image_paths.py")
+
+
+if __name__ == "__main__":
+    main()
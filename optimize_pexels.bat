@@ -1,64 +0,0 @@
-@echo off
-echo Pexels resimlerinin optimizasyonu başlatılıyor...
-npm install -g sharp-cli
-
-echo Optimizasyon: pexels-1010657.jpeg
-npx sharp public\images\pexels-1010657.jpeg --output public\images\webp\pexels-1010657.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1191710.jpeg
-npx sharp public\images\pexels-1191710.jpeg --output public\images\webp\pexels-1191710.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1440476.jpeg
-npx sharp public\images\pexels-1440476.jpeg --output public\images\webp\pexels-1440476.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1585325.jpeg
-npx sharp public\images\pexels-1585325.jpeg --output public\images\webp\pexels-1585325.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1626481.jpeg
-npx sharp public\images\pexels-1626481.jpeg --output public\images\webp\pexels-1626481.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1647116.jpeg
-npx sharp public\images\pexels-1647116.jpeg --output public\images\webp\pexels-1647116.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1707820.jpeg
-npx sharp public\images\pexels-1707820.jpeg --output public\images\webp\pexels-1707820.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1796701.jpeg
-npx sharp public\images\pexels-1796701.jpeg --output public\images\webp\pexels-1796701.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1918290.jpeg
-npx sharp public\images\pexels-1918290.jpeg --output public\images\webp\pexels-1918290.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1931379.jpeg
-npx sharp public\images\pexels-1931379.jpeg --output public\images\webp\pexels-1931379.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-1939485.jpeg
-npx sharp public\images\pexels-1939485.jpeg --output public\images\webp\pexels-1939485.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-2082103.jpeg
-npx sharp public\images\pexels-2082103.jpeg --output public\images\webp\pexels-2082103.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-2115257.jpeg
-npx sharp public\images\pexels-2115257.jpeg --output public\images\webp\pexels-2115257.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-2506923.jpeg
-npx sharp public\images\pexels-2506923.jpeg --output public\images\webp\pexels-2506923.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-2510428.jpeg
-npx sharp public\images\pexels-2510428.jpeg --output public\images\webp\pexels-2510428.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-2544554.jpeg
-npx sharp public\images\pexels-2544554.jpeg --output public\images\webp\pexels-2544554.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-2868242.jpeg
-npx sharp public\images\pexels-2868242.jpeg --output public\images\webp\pexels-2868242.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-2873486.jpeg
-npx sharp public\images\pexels-2873486.jpeg --output public\images\webp\pexels-2873486.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-2873669.jpeg
-npx sharp public\images\pexels-2873669.jpeg --output public\images\webp\pexels-2873669.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-3045825.jpeg
-npx sharp public\images\pexels-3045825.jpeg --output public\images\webp\pexels-3045825.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-3052361.jpeg
-npx sharp public\images\pexels-3052361.jpeg --output public\images\webp\pexels-3052361.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-3059747.jpeg
-npx sharp public\images\pexels-3059747.jpeg --output public\images\webp\pexels-3059747.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-3629813.jpeg
-npx sharp public\images\pexels-3629813.jpeg --output public\images\webp\pexels-3629813.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-3783471.jpeg
-npx sharp public\images\pexels-3783471.jpeg --output public\images\webp\pexels-3783471.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-3844788.jpeg
-npx sharp public\images\pexels-3844788.jpeg --output public\images\webp\pexels-3844788.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-5011647.jpeg
-npx sharp public\images\pexels-5011647.jpeg --output public\images\webp\pexels-5011647.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-7130555.jpeg
-npx sharp public\images\pexels-7130555.jpeg --output public\images\webp\pexels-7130555.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-802024.jpeg
-npx sharp public\images\pexels-802024.jpeg --output public\images\webp\pexels-802024.webp --format webp --quality 75 --width 1200 
-echo Optimizasyon: pexels-pexels-photo.jpg
-npx sharp public\images\pexels-pexels-photo.jpg --output public\images\webp\pexels-pexels-photo.webp --format webp --quality 75 --width 1200 
-
-echo Optimizasyon tamamlandı!
@@ -1,111 +1,190 @@
 import os
-import subprocess
 import json
+import argparse
 from pathlib import Path
-import glob
+
+from optimize_images import IMAGE_CATEGORIES, OUTPUT_FORMATS
+from pipeline_trace import add_trace_arguments, start_from_args, finish_from_args
 
 # Dosya yolları
 IMAGES_DIR = Path("public/images")
 WEBP_DIR = Path("public/images/webp")
-WEBP_DIR.mkdir(exist_ok=True)
-
-# Pexels resimlerini bul
-pexels_images = []
-for img_path in IMAGES_DIR.glob("pexels-*.jpeg"):
-    pexels_images.append(img_path)
-for img_path in IMAGES_DIR.glob("pexels-*.jpg"):
-    pexels_images.append(img_path)
-
-print(f"Toplam {len(pexels_images)} Pexels resmi bulundu.")
-
-# Optimizasyon komutlarını oluştur
-commands = []
-
-for input_path in pexels_images:
-    # Dosya adını al
-    filename = input_path.name
-    output_filename = f"{filename.split('.')[0]}.webp"
-    output_path = WEBP_DIR / output_filename
-    
-    # Sharp komutu oluştur
-    command = f"npx sharp {input_path} --output {output_path} "
-    command += f"--format webp "
-    command += f"--quality 75 "
-    command += f"--width 1200 "
-    
-    commands.append({
-        "command": command,
-        "input": str(input_path),
-        "output": str(output_path)
-    })
-
-# Optimizasyon betiği oluştur
-with open("optimize_pexels.bat", 'w', encoding='utf-8') as f:
-    f.write("@echo off\n")
-    f.write("echo Pexels resimlerinin optimizasyonu başlatılıyor...\n")
-    f.write("npm install -g sharp-cli\n\n")
-    
-    for cmd in commands:
-        f.write(f"echo Optimizasyon: {os.path.basename(cmd['input'])}\n")
-        f.write(f"{cmd['command']}\n")
-    
-    f.write("\necho Optimizasyon tamamlandı!\n")
-
-print("optimize_pexels.bat dosyası oluşturuldu.")
-
-# Optimizasyonu başlat
-print("Optimizasyon başlatılıyor...")
-subprocess.call(["optimize_pexels.bat"], shell=True)
-
-# Boyut karşılaştırması yap
-print("\nBoyut karşılaştırması:")
-print(f"{'Dosya Adı':<30} {'Orijinal':<10} {'Optimize':<10} {'Tasarruf':<10} {'Oran':<6}")
-print("-" * 80)
-
-total_original = 0
-total_optimized = 0
-
-for cmd in commands:
-    input_path = cmd['input']
-    output_path = cmd['output']
-    
-    if os.path.exists(output_path):
-        original_size = os.path.getsize(input_path)
-        optimized_size = os.path.getsize(output_path)
+
+# Format başına URL eşleştirme dosyası (<picture> kaynakları için)
+FORMAT_MAPPING_PATH = Path("public/image_format_mapping.json")
+
+# Pexels resimleri hero ayarlarıyla kodlanır
+PEXELS_CATEGORY = "hero"
+
+
+def find_pexels_images():
+    # Pexels resimlerini bul (image_dedup.py'nin kopya saydıklarını atla)
+    from manifest_store import ManifestStore
+    from path_rewriter import public_url
+
+    with ManifestStore() as store:
+        duplicates = store.mapping("duplicate")
+    pexels_images = []
+    for pattern in ("pexels-*.jpeg", "pexels-*.jpg"):
+        for img_path in IMAGES_DIR.glob(pattern):
+            if public_url(img_path.as_posix()) not in duplicates:
+                pexels_images.append(img_path)
+
+    print(f"Toplam {len(pexels_images)} Pexels resmi bulundu.")
+    return pexels_images
+
+
+def build_jobs(pexels_images, hashed_names=False, formats=OUTPUT_FORMATS):
+    # Kodlama işlerini oluştur
+    settings = IMAGE_CATEGORIES[PEXELS_CATEGORY]
+    jobs = []
+
+    for input_path in pexels_images:
+        filename = input_path.name
+        output_filename = f"{filename.split('.')[0]}.webp"
+        output_path = WEBP_DIR / output_filename
+
+        job = {
+            "input": input_path.as_posix(),
+            "output": output_path.as_posix(),
+            "category": PEXELS_CATEGORY,
+            "width": settings["max_width"],
+            "quality": settings["quality"],
+            "format": "webp",
+            "formats": list(formats)
+        }
+        if hashed_names:
+            job["hashed_names"] = True
+        jobs.append(job)
+
+    return jobs
+
+
+def print_size_comparison(results):
+    # Boyut karşılaştırması yap (çıktı boyutları sonuçlarda, kaynaklar tek scandir ile)
+    from compare_sizes import scan_sizes
+
+    print("\nBoyut karşılaştırması:")
+    print(f"{'Dosya Adı':<30} {'Orijinal':<10} {'Optimize':<10} {'Tasarruf':<10} {'Oran':<6} {'Tüm formatlar'}")
+    print("-" * 80)
+
+    total_original = 0
+    total_optimized = 0
+    total_variants = 0
+    sizes = scan_sizes([result['input'] for result in results])
+
+    for result in results:
+        input_path = result['input']
+        original_size = sizes.get(input_path)
+        if original_size is None or not result.get('variants'):
+            continue
+        # İçerik özetli adlar açıksa çıktı yolu sonuçtan alınır
+        primary = result['variants'][0]
+        optimized_size = primary['bytes']
+        variant_size = sum(encoded['bytes'] for variant in result['variants']
+                           for encoded in variant.get('formats', {"": variant}).values())
         saved = original_size - optimized_size
         ratio = (saved / original_size) * 100 if original_size > 0 else 0
-        
+
         total_original += original_size
         total_optimized += optimized_size
-        
-        print(f"{os.path.basename(input_path):<30} {original_size/1024:.1f} KB    {optimized_size/1024:.1f} KB    {saved/1024:.1f} KB    {ratio:.1f}%")
-
-# Toplam tasarruf
-total_saved = total_original - total_optimized
-total_ratio = (total_saved / total_original) * 100 if total_original > 0 else 0
-
-print("-" * 80)
-print(f"{'TOPLAM':<30} {total_original/1024:.1f} KB    {total_optimized/1024:.1f} KB    {total_saved/1024:.1f} KB    {total_ratio:.1f}%")
-
-# WebP URL eşleştirme dosyasını güncelle
-webp_url_mapping_path = Path("public/webp_url_mapping.json")
-webp_mapping = {}
-
-if webp_url_mapping_path.exists():
-    with open(webp_url_mapping_path, 'r', encoding='utf-8') as f:
-        try:
-            webp_mapping = dict(json.load(f))
-        except:
-            webp_mapping = {}
-
-# Yeni eşleştirmeleri ekle
-for cmd in commands:
-    original_url = f"/images/{os.path.basename(cmd['input'])}"
-    webp_url = f"/images/webp/{os.path.basename(cmd['output'])}"
-    webp_mapping[original_url] = webp_url
-
-# Eşleştirme dosyasını kaydet
-with open(webp_url_mapping_path, 'w', encoding='utf-8') as f:
-    json.dump(webp_mapping, f, indent=2, ensure_ascii=False)
-
-print(f"\nWebP URL eşleştirme dosyası güncellendi: {webp_url_mapping_path}")
+        total_variants += variant_size
+
+        print(f"{os.path.basename(input_path):<30} {original_size/1024:.1f} KB    {optimized_size/1024:.1f} KB    {saved/1024:.1f} KB    {ratio:.1f}%    {variant_size/1024:.1f} KB")
+
+    # Toplam tasarruf
+    total_saved = total_original - total_optimized
+    total_ratio = (total_saved / total_original) * 100 if total_original > 0 else 0
+
+    print("-" * 80)
+    print(f"{'TOPLAM':<30} {total_original/1024:.1f} KB    {total_optimized/1024:.1f} KB    {total_saved/1024:.1f} KB    {total_ratio:.1f}%    {total_variants/1024:.1f} KB")
+
+
+def update_webp_mapping(results):
+    # WebP URL eşleştirmelerini manifest deposuna ekle ve public/webp_url_mapping.json
+    # dosyasını (src/lib/utils.ts okur) dışa aktar
+    from manifest_store import ManifestStore
+
+    webp_mapping = {}
+    for result in results:
+        original_url = f"/images/{os.path.basename(result['input'])}"
+        webp_url = f"/images/webp/{os.path.basename(result['variants'][0]['path'])}"
+        webp_mapping[original_url] = webp_url
+
+    with ManifestStore() as store:
+        store.set_mappings("webp", webp_mapping)
+        store.record_results(results)
+        store.export()
+
+    print("\nWebP URL eşleştirme dosyası güncellendi: public/webp_url_mapping.json")
+
+
+def update_format_mapping(results):
+    # Orijinal URL -> {format: URL}; atılan formatlar eşleştirmede yer almaz
+    format_mapping = {}
+    if FORMAT_MAPPING_PATH.exists():
+        with open(FORMAT_MAPPING_PATH, 'r', encoding='utf-8') as f:
+            try:
+                format_mapping = dict(json.load(f))
+            except ValueError:
+                format_mapping = {}
+
+    for result in results:
+        original_url = f"/images/{os.path.basename(result['input'])}"
+        formats = result["variants"][0].get("formats", {})
+        format_mapping[original_url] = {
+            fmt: f"/images/webp/{os.path.basename(encoded['path'])}"
+            for fmt, encoded in formats.items()
+        }
+
+    with open(FORMAT_MAPPING_PATH, 'w', encoding='utf-8') as f:
+        json.dump(format_mapping, f, indent=2, ensure_ascii=False)
+
+    print(f"Format eşleştirme dosyası güncellendi: {FORMAT_MAPPING_PATH}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pexels resimlerini WebP'ye dönüştürür")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Paralel kodlama süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--force", action="store_true",
+                        help="Önbelleği yok say ve tüm resimleri yeniden kodla")
+    parser.add_argument("--memory-budget", type=int, default=None,
+                        help="Eşzamanlı kodlama işleri için toplam bellek bütçesi (MB)")
+    parser.add_argument("--hashed-names", action="store_true",
+                        help="Çıktıları içerik özetli adlarla yaz, eskilerini sil ve netlify.toml "
+                             "immutable önbellek kurallarını üret")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    from build_cache import encode_with_cache
+    from image_encoder import supported_formats
+    from image_placeholder import write_placeholder_mapping
+
+    WEBP_DIR.mkdir(exist_ok=True)
+
+    jobs = build_jobs(find_pexels_images(), hashed_names=args.hashed_names,
+                      formats=supported_formats(OUTPUT_FORMATS))
+
+    # Optimizasyonu başlat
+    print("Optimizasyon başlatılıyor...")
+    memory_budget = args.memory_budget * 1024 * 1024 if args.memory_budget else None
+    results = encode_with_cache(jobs, workers=args.workers, force=args.force,
+                                memory_budget=memory_budget)
+
+    from hashed_assets import publish_results, update_netlify_headers
+    if args.hashed_names:
+        publish_results(jobs, results, [WEBP_DIR])
+    else:
+        update_netlify_headers([WEBP_DIR], enabled=False)
+
+    print_size_comparison(results)
+    update_webp_mapping(results)
+    update_format_mapping(results)
+    write_placeholder_mapping(results)
+    finish_from_args(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import re
+import json
+
+from pipeline_trace import span, count
+
+# Eşleştirme dosyaları (sonraki dosya öncekini ezer)
+URL_MAPPING_PATH = "url_mapping.json"
+WEBP_MAPPING_PATHS = ["webp_url_mapping.json", "public/webp_url_mapping.json"]
+OPTIMIZED_COMMANDS_PATH = "optimization_commands.json"
+
+# Kopya resim -> kanonik kaynak (image_dedup.py üretir, diğer her şeyi ezer)
+DUPLICATES_PATH = "image_duplicates.json"
+
+# Özetsiz/eski özetli çıktı -> güncel içerik özetli çıktı (hashed_assets.py üretir)
+HASHED_MAPPING_PATH = "public/hashed_url_mapping.json"
+
+
+def load_mapping_file(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            return dict(json.load(f))
+        except ValueError as e:
+            print(f"Eşleştirme dosyası okunamadı: {path} ({e})")
+            return {}
+
+
+def public_url(path):
+    # public/images/x.jpg -> /images/x.jpg
+    return "/" + path.split("public/", 1)[-1].lstrip("/")
+
+
+def job_url_mapping(job):
+    # Orijinal yol: /images/filename.jpg
+    # Optimize yol: /images/optimized/filename.webp
+    # Eski Windows çıktılarındaki ters eğik çizgileri de destekle
+    input_path = job['input'].replace('\\', '/')
+    # İçerik özetli adlar açıksa yayımlanan dosya adı kullanılır
+    output_path = job.get('published', job['output']).replace('\\', '/')
+    return public_url(input_path), public_url(output_path)
+
+
+def compose_mappings(*mappings):
+    # Eşleştirmeleri birleştir ve zincirleri son hedefe kadar çöz
+    # (URL -> /images/x.jpeg -> /images/optimized/x.webp)
+    merged = {}
+    for mapping in mappings:
+        merged.update(mapping)
+
+    resolved = {}
+    for key, value in merged.items():
+        seen = {key}
+        while value in merged and value not in seen:
+            seen.add(value)
+            value = merged[value]
+        if value != key:
+            resolved[key] = value
+    return resolved
+
+
+def load_all_mappings():
+    # Tüm eşleştirmeler manifest deposundan okunur (manifest_store.py); depo dışında
+    # değişen eski JSON dosyaları önce içe aktarılır. Öncelik: url, webp, optimize,
+    # içerik özetli; kopya önce kanonik kaynağa, oradan kanoniğin optimize yoluna çözülür
+    from manifest_store import ManifestStore
+
+    with ManifestStore() as store:
+        return store.all_mappings()
+
+
+class PathRewriter:
+    def __init__(self, mapping):
+        self.mapping = dict(mapping)
+        self.pattern = None
+        if self.mapping:
+            # Uzun anahtarlar önce: aynı konumda en uzun eşleşme kazanır
+            keys = sorted(self.mapping, key=len, reverse=True)
+            alternation = "|".join(re.escape(key) for key in keys)
+            self.pattern = re.compile(f"(?:{alternation})(?![\\w-])")
+
+    def rewrite(self, content):
+        # Tek taramada tüm yolları değiştir, (yeni içerik, değişiklik sayısı) döndür
+        if self.pattern is None:
+            return content, 0
+        return self.pattern.subn(lambda m: self.mapping[m.group(0)], content)
+
+    def rewrite_file(self, file_path):
+        with span("rewrite", file=file_path):
+            with open(file_path, 'r', encoding='utf-8') as file:
+                content = file.read()
+
+            new_content, replacements = self.rewrite(content)
+
+            # Sadece içeriği gerçekten değişen dosyaları yaz
+            if replacements and new_content != content:
+                with open(file_path, 'w', encoding='utf-8') as file:
+                    file.write(new_content)
+        count("rewrite.replacements", replacements)
+        return replacements
+
+    def rewrite_files(self, file_paths):
+        total = 0
+        changed = 0
+        for file_path in file_paths:
+            if not os.path.exists(file_path):
+                print(f"Dosya bulunamadı: {file_path}")
+                continue
+
+            replacements = self.rewrite_file(file_path)
+            if replacements:
+                changed += 1
+                total += replacements
+                print(f"Dosya güncellendi: {file_path} ({replacements} değişiklik)")
+
+        print(f"{changed} dosyada toplam {total} yol değiştirildi.")
+        return total
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+from collections import defaultdict
+from contextlib import nullcontext
+
+# Hattın ölçülen aşamaları
+STAGES = ["scan", "categorize", "download", "dedup", "decode", "resize", "encode", "placeholder", "hash", "rewrite", "atlas", "subset", "compress"]
+TRACE_FORMATS = ["chrome", "jsonl"]
+
+# Kapalıyken her span çağrısı bu tek nesneyi döndürür (ek maliyet yok)
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start", "wall", "profiling")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.profiling = self.tracer.start_profile(self.name)
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        if self.profiling:
+            self.tracer.stop_profile()
+        self.tracer.record(self.name, self.wall, duration, self.args)
+        return False
+
+
+class Tracer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.enabled = False
+        self.events = []
+        self.counters = defaultdict(int)
+        self.profile_stage = None
+        self.profile_path = None
+        self.profiler = None
+
+    def enable(self, profile_stage=None, profile_path=None):
+        self.enabled = True
+        self.profile_stage = profile_stage
+        self.profile_path = profile_path
+
+    def span(self, name, **args):
+        return _Span(self, name, args)
+
+    def record(self, name, wall, duration, args):
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": round(wall * 1e6),
+            "dur": round(duration * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident() % 100000,
+            "args": args
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    def start_profile(self, name):
+        # cProfile sadece ana iş parçacığındaki seçili aşama için çalışır
+        if name != self.profile_stage or threading.current_thread() is not threading.main_thread():
+            return False
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        return True
+
+    def stop_profile(self):
+        self.profiler.disable()
+
+    def dump_profile(self, path):
+        if self.profiler is not None:
+            self.profiler.dump_stats(path)
+            return True
+        return False
+
+    def drain(self):
+        # İşçi süreç olaylarını ana sürece aktarmak için topla ve temizle
+        with self.lock:
+            payload = {"events": self.events, "counters": dict(self.counters)}
+            self.events = []
+            self.counters = defaultdict(int)
+        if self.profile_path:
+            self.dump_profile(f"{self.profile_path}.{os.getpid()}")
+        return payload
+
+    def merge(self, payload):
+        with self.lock:
+            self.events.extend(payload["events"])
+            for name, n in payload["counters"].items():
+                self.counters[name] += n
+
+    def summary(self):
+        stats = defaultdict(lambda: {"count": 0, "total": 0.0, "max": 0.0})
+        for event in self.events:
+            entry = stats[event["name"]]
+            entry["count"] += 1
+            entry["total"] += event["dur"] / 1000
+            entry["max"] = max(entry["max"], event["dur"] / 1000)
+        return stats
+
+    def print_summary(self):
+        stats = self.summary()
+        print("\nAşama Süreleri:")
+        print("-" * 80)
+        print(f"{'Aşama':<16} {'Adet':>8} {'Toplam ms':>12} {'Ort. ms':>10} {'Max ms':>10}")
+        print("-" * 80)
+        ordered = sorted(stats, key=lambda name: (STAGES.index(name) if name in STAGES else len(STAGES), name))
+        for name in ordered:
+            entry = stats[name]
+            print(f"{name:<16} {entry['count']:>8} {entry['total']:>12.1f} "
+                  f"{entry['total'] / entry['count']:>10.2f} {entry['max']:>10.2f}")
+        print("-" * 80)
+        for name, n in sorted(self.counters.items()):
+            print(f"{name:<30} {n:>10}")
+
+    def write(self, path, fmt="chrome"):
+        counter_events = [
+            {"name": name, "ph": "C", "ts": round(time.time() * 1e6), "pid": os.getpid(),
+             "args": {"value": n}}
+            for name, n in self.counters.items()
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            if fmt == "jsonl":
+                for event in self.events + counter_events:
+                    f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            else:
+                json.dump({"traceEvents": self.events + counter_events}, f, ensure_ascii=False)
+
+
+tracer = Tracer()
+
+
+def span(name, **args):
+    # with span("decode", file=...): ... ; izleme kapalıyken boş bağlam döner
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return tracer.span(name, **args)
+
+
+def count(name, n=1):
+    if tracer.enabled:
+        tracer.count(name, n)
+
+
+def init_worker(enabled, profile_stage=None, profile_path=None):
+    # ProcessPoolExecutor initializer: fork ile kopyalanan ana süreç olaylarını
+    # temizle ve işçi süreçte izlemeyi aç
+    tracer.reset()
+    if enabled:
+        tracer.enable(profile_stage, profile_path)
+
+
+def worker_args():
+    return (tracer.enabled, tracer.profile_stage, tracer.profile_path)
+
+
+def add_trace_arguments(parser):
+    parser.add_argument("--trace", default=None,
+                        help="Zaman çizelgesinin yazılacağı dosya (Chrome trace veya JSON lines)")
+    parser.add_argument("--trace-format", choices=TRACE_FORMATS, default="chrome",
+                        help="İzleme dosyası biçimi (varsayılan: chrome)")
+    parser.add_argument("--profile-stage", choices=STAGES, default=None,
+                        help="Bu aşamayı cProfile ile profille")
+
+
+def start_from_args(args):
+    if args.trace or args.profile_stage:
+        prefix = args.trace or "pipeline_trace"
+        profile_path = f"{prefix}.{args.profile_stage}.prof" if args.profile_stage else None
+        tracer.enable(args.profile_stage, profile_path)
+
+
+def finish_from_args(args):
+    if not tracer.enabled:
+        return
+
+    tracer.print_summary()
+    if args.trace:
+        tracer.write(args.trace, args.trace_format)
+        print(f"\nİzleme dosyası kaydedildi: {args.trace}")
+
+    if tracer.profile_path and tracer.dump_profile(tracer.profile_path):
+        print(f"Profil kaydedildi: {tracer.profile_path}")
+        pstats.Stats(tracer.profile_path).sort_stats("cumulative").print_stats(15)
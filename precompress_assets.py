@@ -0,0 +1,206 @@
+import os
+import gzip
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import pipeline_trace
+from pipeline_trace import span, count, add_trace_arguments, start_from_args, finish_from_args
+
+try:
+    import brotli
+except ImportError:  # pip install brotli; yoksa sadece .gz üretilir
+    brotli = None
+
+# Sıkıştırılacak kök dizin ve metin tabanlı uzantılar (raster ve woff2 zaten sıkıştırılmış)
+PUBLIC_DIR = Path("public")
+COMPRESSIBLE_EXTENSIONS = {
+    ".json", ".webmanifest", ".svg", ".js", ".mjs", ".css", ".html", ".txt", ".xml", ".map", ".ico", ".wasm"
+}
+
+# Yan dosya, orijinalin en fazla bu oranı kadarsa tutulur (aksi halde silinir)
+DEFAULT_MAX_RATIO = 0.9
+
+# Çok küçük dosyalarda sıkıştırma başlıkları kazancı yer
+MIN_SIZE = 256
+
+SIDECAR_EXTENSIONS = {"br": ".br", "gz": ".gz"}
+
+# Kaynak özetleri ve üretilen yan dosyalar
+CACHE_PATH = Path(".cache/precompress.json")
+CACHE_VERSION = 1
+
+
+def iter_assets(root=PUBLIC_DIR):
+    for dirpath, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                yield Path(dirpath, filename).as_posix()
+
+
+def compress_asset(path, encodings, max_ratio):
+    # İşçide: dosyayı en yüksek seviyelerle sıkıştır, kazanç yetersizse yan dosyayı sil
+    with open(path, 'rb') as f:
+        data = f.read()
+    sha = hashlib.sha256(data).hexdigest()
+
+    # Başka bir ayarla (ör. brotli kuruluyken) yazılmış, artık üretilmeyen yan dosyalar
+    # eski içerikle sunulmasın
+    for encoding, extension in SIDECAR_EXTENSIONS.items():
+        if encoding not in encodings and os.path.exists(path + extension):
+            os.remove(path + extension)
+
+    written = {}
+    for encoding in encodings:
+        sidecar = path + SIDECAR_EXTENSIONS[encoding]
+        with span("compress", file=path, encoding=encoding):
+            if len(data) < MIN_SIZE:
+                compressed = None
+            elif encoding == "br":
+                compressed = brotli.compress(data, quality=11, lgwin=24)
+            else:
+                # mtime=0: aynı içerik her çalıştırmada aynı .gz dosyasını üretir
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+
+        if compressed is None or len(compressed) > len(data) * max_ratio:
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+            continue
+        tmp_path = sidecar + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, sidecar)
+        written[encoding] = len(compressed)
+
+    return {"path": path, "sha256": sha, "bytes": len(data), "sidecars": written,
+            "trace": pipeline_trace.tracer.drain()}
+
+
+class PrecompressCache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Sıkıştırma önbelleği okunamadı, tüm dosyalar sıkıştırılacak: {e}")
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, path, settings):
+        # mtime/boyut aynıysa okuma; değiştiyse içerik özeti aynı mı diye bak
+        entry = self.entries.get(path)
+        if not entry or entry["settings"] != settings:
+            return False
+        stat = os.stat(path)
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["bytes"] != stat.st_size:
+            with open(path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != entry["sha256"]:
+                    return False
+            entry["mtime_ns"], entry["bytes"] = stat.st_mtime_ns, stat.st_size
+        # Yan dosyalar elle silinmiş veya değiştirilmiş olabilir
+        return all(
+            os.path.exists(path + SIDECAR_EXTENSIONS[encoding])
+            and os.path.getsize(path + SIDECAR_EXTENSIONS[encoding]) == size
+            for encoding, size in entry["sidecars"].items()
+        )
+
+    def record(self, result, settings):
+        stat = os.stat(result["path"])
+        self.entries[result["path"]] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "bytes": result["bytes"],
+            "sha256": result["sha256"],
+            "settings": settings,
+            "sidecars": result["sidecars"]
+        }
+
+
+def remove_orphans(entries, assets, root=PUBLIC_DIR):
+    # Kaynağı silinmiş dosyaların bu aşamanın yazdığı yan dosyaları; public/ altındaki
+    # başka .gz/.br dosyalarına (ör. indirilebilir arşivler) ve --root dışındaki
+    # kayıtlara dokunulmaz
+    prefix = Path(root).as_posix().rstrip("/") + "/"
+    removed = 0
+    for path in set(entries) - set(assets):
+        if not path.startswith(prefix) or os.path.exists(path):
+            continue
+        for encoding in entries[path]["sidecars"]:
+            sidecar = path + SIDECAR_EXTENSIONS[encoding]
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+                removed += 1
+        del entries[path]
+    return removed
+
+
+def precompress(root=PUBLIC_DIR, workers=None, max_ratio=DEFAULT_MAX_RATIO, force=False):
+    encodings = ["br", "gz"] if brotli else ["gz"]
+    if brotli is None:
+        print("brotli modülü bulunamadı (pip install brotli); sadece .gz yan dosyaları üretilecek.")
+    settings = {"encodings": encodings, "max_ratio": max_ratio}
+
+    cache = PrecompressCache()
+    assets = sorted(iter_assets(root))
+    orphans = remove_orphans(cache.entries, assets, root)
+    stale = [path for path in assets if force or not cache.is_fresh(path, settings)]
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers, initializer=pipeline_trace.init_worker,
+                                 initargs=pipeline_trace.worker_args()) as executor:
+            futures = [executor.submit(compress_asset, path, encodings, max_ratio) for path in stale]
+            for future in futures:
+                result = future.result()
+                pipeline_trace.tracer.merge(result.pop("trace"))
+                cache.record(result, settings)
+    cache.save()
+
+    count("compress.files", len(stale))
+    totals = {encoding: [0, 0] for encoding in encodings}
+    for entry in cache.entries.values():
+        for encoding, size in entry["sidecars"].items():
+            totals[encoding][0] += entry["bytes"]
+            totals[encoding][1] += size
+    print(f"{len(assets)} sıkıştırılabilir dosya, {len(stale)} dosya yeniden sıkıştırıldı"
+          + (f", {orphans} sahipsiz yan dosya silindi." if orphans else "."))
+    for encoding, (original, compressed) in totals.items():
+        if original:
+            print(f"  .{encoding}: {original / 1024:.1f} KB -> {compressed / 1024:.1f} KB "
+                  f"(%{(1 - compressed / original) * 100:.1f} tasarruf)")
+    return stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="public/ altındaki metin tabanlı dosyalar için .br ve .gz üretir")
+    parser.add_argument("--root", default=str(PUBLIC_DIR), help="Taranacak dizin (varsayılan: public)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Paralel sıkıştırma süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--max-ratio", type=float, default=DEFAULT_MAX_RATIO,
+                        help="Yan dosya orijinalin en fazla bu oranı kadar olmalı (varsayılan: 0.9)")
+    parser.add_argument("--force", action="store_true", help="Önbelleği yok say ve hepsini yeniden sıkıştır")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    precompress(args.root, workers=args.workers, max_ratio=args.max_ratio, force=args.force)
+    finish_from_args(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+# Arama aralığı ve metrik ayarları
+QUALITY_MIN = 30
+QUALITY_MAX = 95
+METRIC_MAX_SIDE = 512   # Metrik bu boyuta küçültülmüş luma üzerinde hesaplanır
+SSIM_WINDOW = 7
+
+# SSIM sabitleri (8 bit dinamik aralık)
+C1 = (0.01 * 255) ** 2
+C2 = (0.03 * 255) ** 2
+
+
+def luma(img, max_side=METRIC_MAX_SIDE):
+    # Resmi gri tona çevir ve küçült, float64 dizi döndür
+    gray = img.convert("L")
+    scale = max_side / max(gray.size)
+    if scale < 1:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, Image.BOX)
+    return np.asarray(gray, dtype=np.float64)
+
+
+def _box_mean(x, k):
+    # İntegral görüntü ile k x k pencere ortalaması
+    c = np.pad(x, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    return (c[k:, k:] - c[:-k, k:] - c[k:, :-k] + c[:-k, :-k]) / (k * k)
+
+
+def ssim(a, b, k=SSIM_WINDOW):
+    # Ortalama yapısal benzerlik (1.0 = aynı)
+    k = min(k, a.shape[0], a.shape[1])
+    mu_a = _box_mean(a, k)
+    mu_b = _box_mean(b, k)
+    var_a = _box_mean(a * a, k) - mu_a ** 2
+    var_b = _box_mean(b * b, k) - mu_b ** 2
+    cov = _box_mean(a * b, k) - mu_a * mu_b
+
+    numerator = (2 * mu_a * mu_b + C1) * (2 * cov + C2)
+    denominator = (mu_a ** 2 + mu_b ** 2 + C1) * (var_a + var_b + C2)
+    return float((numerator / denominator).mean())
+
+
+def encoded_score(img, reference, fmt, quality):
+    from image_encoder import save_arguments
+
+    buffer = io.BytesIO()
+    encodable, pil_format, options = save_arguments(img, fmt, quality)
+    encodable.save(buffer, format=pil_format, **options)
+    size = buffer.tell()
+    buffer.seek(0)
+    with Image.open(buffer) as decoded:
+        return ssim(reference, luma(decoded)), size
+
+
+def search_quality(img, fmt, target, lo=QUALITY_MIN, hi=QUALITY_MAX):
+    # Hedef SSIM'i sağlayan en düşük kaliteyi ikili aramayla bul
+    reference = luma(img)
+    best = hi
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        score, _ = encoded_score(img, reference, fmt, mid)
+        if score >= target:
+            best = mid
+            hi = mid - 1
+        else:
+            lo = mid + 1
+    return best
@@ -1,68 +0,0 @@
-@echo off
-echo Resim optimizasyonu başlatılıyor...
-npm install -g sharp-cli
-
-echo hero kategorisinde optimizasyon: pexels-2082103.jpeg
-npx sharp public\images\pexels-2082103.jpeg --output public\images\optimized\pexels-2082103.webp --format webp --quality 75 --width 1200 
-echo hero kategorisinde optimizasyon: pexels-pexels-photo.jpg
-npx sharp public\images\pexels-pexels-photo.jpg --output public\images\optimized\pexels-pexels-photo.webp --format webp --quality 75 --width 1200 
-echo gallery kategorisinde optimizasyon: pexels-1918290.jpeg
-npx sharp public\images\pexels-1918290.jpeg --output public\images\optimized\pexels-1918290.webp --format webp --quality 75 --width 800 
-echo gallery kategorisinde optimizasyon: pexels-1585325.jpeg
-npx sharp public\images\pexels-1585325.jpeg --output public\images\optimized\pexels-1585325.webp --format webp --quality 75 --width 800 
-echo gallery kategorisinde optimizasyon: pexels-3844788.jpeg
-npx sharp public\images\pexels-3844788.jpeg --output public\images\optimized\pexels-3844788.webp --format webp --quality 75 --width 800 
-echo gallery kategorisinde optimizasyon: pexels-1939485.jpeg
-npx sharp public\images\pexels-1939485.jpeg --output public\images\optimized\pexels-1939485.webp --format webp --quality 75 --width 800 
-echo gallery kategorisinde optimizasyon: pexels-1931379.jpeg
-npx sharp public\images\pexels-1931379.jpeg --output public\images\optimized\pexels-1931379.webp --format webp --quality 75 --width 800 
-echo style kategorisinde optimizasyon: pexels-2506923.jpeg
-npx sharp public\images\pexels-2506923.jpeg --output public\images\optimized\pexels-2506923.webp --format webp --quality 70 --width 500 
-echo style kategorisinde optimizasyon: pexels-802024.jpeg
-npx sharp public\images\pexels-802024.jpeg --output public\images\optimized\pexels-802024.webp --format webp --quality 70 --width 500 
-echo style kategorisinde optimizasyon: pexels-3629813.jpeg
-npx sharp public\images\pexels-3629813.jpeg --output public\images\optimized\pexels-3629813.webp --format webp --quality 70 --width 500 
-echo style kategorisinde optimizasyon: pexels-1796701.jpeg
-npx sharp public\images\pexels-1796701.jpeg --output public\images\optimized\pexels-1796701.webp --format webp --quality 70 --width 500 
-echo style kategorisinde optimizasyon: pexels-1010657.jpeg
-npx sharp public\images\pexels-1010657.jpeg --output public\images\optimized\pexels-1010657.webp --format webp --quality 70 --width 500 
-echo style kategorisinde optimizasyon: pexels-1440476.jpeg
-npx sharp public\images\pexels-1440476.jpeg --output public\images\optimized\pexels-1440476.webp --format webp --quality 70 --width 500 
-echo style kategorisinde optimizasyon: pexels-2868242.jpeg
-npx sharp public\images\pexels-2868242.jpeg --output public\images\optimized\pexels-2868242.webp --format webp --quality 70 --width 500 
-echo style kategorisinde optimizasyon: pexels-1707820.jpeg
-npx sharp public\images\pexels-1707820.jpeg --output public\images\optimized\pexels-1707820.webp --format webp --quality 70 --width 500 
-echo background kategorisinde optimizasyon: pexels-7130555.jpeg
-npx sharp public\images\pexels-7130555.jpeg --output public\images\optimized\pexels-7130555.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-2873486.jpeg
-npx sharp public\images\pexels-2873486.jpeg --output public\images\optimized\pexels-2873486.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-3783471.jpeg
-npx sharp public\images\pexels-3783471.jpeg --output public\images\optimized\pexels-3783471.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-1626481.jpeg
-npx sharp public\images\pexels-1626481.jpeg --output public\images\optimized\pexels-1626481.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-3059747.jpeg
-npx sharp public\images\pexels-3059747.jpeg --output public\images\optimized\pexels-3059747.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-1191710.jpeg
-npx sharp public\images\pexels-1191710.jpeg --output public\images\optimized\pexels-1191710.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-2544554.jpeg
-npx sharp public\images\pexels-2544554.jpeg --output public\images\optimized\pexels-2544554.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-2510428.jpeg
-npx sharp public\images\pexels-2510428.jpeg --output public\images\optimized\pexels-2510428.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-5011647.jpeg
-npx sharp public\images\pexels-5011647.jpeg --output public\images\optimized\pexels-5011647.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-3052361.jpeg
-npx sharp public\images\pexels-3052361.jpeg --output public\images\optimized\pexels-3052361.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-2873669.jpeg
-npx sharp public\images\pexels-2873669.jpeg --output public\images\optimized\pexels-2873669.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-3045825.jpeg
-npx sharp public\images\pexels-3045825.jpeg --output public\images\optimized\pexels-3045825.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: pexels-2115257.jpeg
-npx sharp public\images\pexels-2115257.jpeg --output public\images\optimized\pexels-2115257.webp --format webp --quality 65 --width 1600 
-echo background kategorisinde optimizasyon: video-studio-bg.jpg
-npx sharp public\images\video-studio-bg.jpg --output public\images\optimized\video-studio-bg.webp --format webp --quality 65 --width 1600 
-echo hero kategorisinde optimizasyon: pexels-1647116.jpeg
-npx sharp public\images\pexels-1647116.jpeg --output public\images\optimized\pexels-1647116.webp --format webp --quality 75 --width 1200 
-
-echo Optimizasyon tamamlandı!
-echo Orijinal ve optimize edilmiş boyutlar karşılaştırılıyor...
-python compare_sizes.py
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Betikler depo kökünde düz modüller olarak duruyor
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,228 @@
+import os
+import gzip
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from image_fetcher import DownloadError, create_session, download_file, download_all, cache_stats
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # ETag/Last-Modified doğrulayıcıları, Range ve sırayla dönen hata kodlarıyla
+    # Pexels yerine geçen sunucu
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+
+        if server.failures:
+            self.send_body(server.failures.pop(0), b"")
+            return
+
+        entry = server.files.get(self.path)
+        if entry is None:
+            self.send_body(404, b"")
+            return
+        headers = {"ETag": entry["etag"], "Last-Modified": entry["last_modified"]}
+
+        if self.headers.get("If-None-Match") == entry["etag"]:
+            self.send_body(304, None, headers)
+            return
+
+        body = entry["body"]
+        requested = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if requested and server.ranges and if_range in (None, entry["etag"], entry["last_modified"]):
+            start = int(requested[len("bytes="):-1])
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            self.send_body(206, body[start:], headers)
+            return
+        if server.gzip:
+            # Accept-Encoding'e bakmadan sıkıştıran sunucu
+            headers["Content-Encoding"] = "gzip"
+            body = gzip.compress(body)
+        self.send_body(200, body, headers)
+
+    def send_body(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body is not None:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.files = {}
+    server.failures = []
+    server.requests = []
+    server.ranges = True
+    server.gzip = False
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def publish(server, path, body, etag):
+    server.files[path] = {"body": body, "etag": f'"{etag}"',
+                          "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+
+
+def test_conditional_statuses(server, tmp_path):
+    session = create_session()
+    dest = tmp_path / "a.jpeg"
+    publish(server, "/a.jpeg", b"v1" * 1000, "v1")
+
+    first = download_file(session, server.url + "/a.jpeg", dest, backoff=0)
+    assert first["status"] == "new"
+    assert first["etag"] == '"v1"'
+    assert first["last_modified"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+    assert dest.read_bytes() == b"v1" * 1000
+
+    second = download_file(session, server.url + "/a.jpeg", dest, backoff=0, cached=first)
+    assert second["status"] == "not_modified"
+    assert second["transferred"] == 0
+    assert second["bytes"] == 2000
+    assert server.requests[-1][1]["If-None-Match"] == '"v1"'
+    assert server.requests[-1][1]["If-Modified-Since"] == first["last_modified"]
+
+    publish(server, "/a.jpeg", b"v2" * 500, "v2")
+    third = download_file(session, server.url + "/a.jpeg", dest, backoff=0, cached=second)
+    assert third["status"] == "updated"
+    assert dest.read_bytes() == b"v2" * 500
+
+    # Doğrulayıcı değişti ama içerik aynı: hedef dosyaya dokunulmaz
+    mtime = os.stat(dest).st_mtime_ns
+    publish(server, "/a.jpeg", b"v2" * 500, "v2-rebuilt")
+    fourth = download_file(session, server.url + "/a.jpeg", dest, backoff=0, cached=third)
+    assert fourth["status"] == "unchanged"
+    assert fourth["etag"] == '"v2-rebuilt"'
+    assert os.stat(dest).st_mtime_ns == mtime
+    assert not os.path.exists(f"{dest}.part")
+
+    assert cache_stats([first, second, third, fourth]) == {
+        "requests": 4, "new": 1, "updated": 1, "unchanged": 1, "not_modified": 1,
+        "transferred": 2000 + 1000 + 1000, "saved": 2000
+    }
+
+
+def test_download_all_uses_cached_validators(server, tmp_path):
+    for n in range(3):
+        publish(server, f"/{n}.jpeg", bytes([n]) * 4096, f"e{n}")
+    items = [(f"{server.url}/{n}.jpeg", tmp_path / f"{n}.jpeg") for n in range(3)]
+
+    results, failures = download_all(items, concurrency=2, backoff=0)
+    assert failures == []
+    assert cache_stats(results)["new"] == 3
+
+    cached = {result["url"]: result for result in results}
+    results, failures = download_all([(url, path, cached[url]) for url, path in items],
+                                     concurrency=2, backoff=0)
+    stats = cache_stats(results)
+    assert failures == []
+    assert stats["not_modified"] == 3
+    assert stats["transferred"] == 0
+    assert stats["saved"] == 3 * 4096
+
+
+def write_part(dest, data, etag):
+    with open(f"{dest}.part", 'wb') as f:
+        f.write(data)
+    with open(f"{dest}.part.json", 'w', encoding='utf-8') as f:
+        json.dump({"etag": f'"{etag}"', "last_modified": None}, f)
+
+
+def test_resume_from_part_file(server, tmp_path):
+    body = bytes(range(256)) * 64
+    publish(server, "/b.jpeg", body, "b")
+    dest = tmp_path / "b.jpeg"
+    write_part(dest, body[:5000], "b")
+
+    result = download_file(create_session(), server.url + "/b.jpeg", dest, backoff=0)
+    assert result["status"] == "new"
+    assert server.requests[-1][1]["Range"] == "bytes=5000-"
+    assert server.requests[-1][1]["If-Range"] == '"b"'
+    assert dest.read_bytes() == body
+    assert not os.path.exists(f"{dest}.part")
+    assert not os.path.exists(f"{dest}.part.json")
+
+
+def test_resume_after_upstream_change_restarts(server, tmp_path):
+    # Parça eski sürümden: If-Range eşleşmez, sunucu tam içerik döner
+    publish(server, "/g.jpeg", b"new" * 3000, "g2")
+    dest = tmp_path / "g.jpeg"
+    write_part(dest, b"old" * 1000, "g1")
+
+    download_file(create_session(), server.url + "/g.jpeg", dest, backoff=0)
+    assert server.requests[-1][1]["If-Range"] == '"g1"'
+    assert dest.read_bytes() == b"new" * 3000
+
+
+def test_part_without_validator_restarts(server, tmp_path):
+    publish(server, "/h.jpeg", b"h" * 3000, "h")
+    dest = tmp_path / "h.jpeg"
+    with open(f"{dest}.part", 'wb') as f:
+        f.write(b"?" * 1000)
+
+    download_file(create_session(), server.url + "/h.jpeg", dest, backoff=0)
+    assert "Range" not in server.requests[-1][1]
+    assert dest.read_bytes() == b"h" * 3000
+
+
+def test_resume_without_range_support_restarts(server, tmp_path):
+    body = b"x" * 10000
+    publish(server, "/c.jpeg", body, "c")
+    server.ranges = False
+    dest = tmp_path / "c.jpeg"
+    write_part(dest, b"stale" * 100, "c")
+
+    download_file(create_session(), server.url + "/c.jpeg", dest, backoff=0)
+    assert dest.read_bytes() == body
+
+
+def test_retry_on_server_error(server, tmp_path):
+    publish(server, "/d.jpeg", b"d" * 100, "d")
+    server.failures = [503, 429]
+    dest = tmp_path / "d.jpeg"
+
+    result = download_file(create_session(), server.url + "/d.jpeg", dest, retries=2, backoff=0)
+    assert result["attempts"] == 3
+    assert len(server.requests) == 3
+    assert dest.read_bytes() == b"d" * 100
+
+
+def test_retries_exhausted(server, tmp_path):
+    server.failures = [503] * 3
+
+    with pytest.raises(DownloadError):
+        download_file(create_session(), server.url + "/e.jpeg", tmp_path / "e.jpeg", retries=2, backoff=0)
+    assert len(server.requests) == 3
+
+
+def test_client_error_is_not_retried(server, tmp_path):
+    with pytest.raises(requests.HTTPError):
+        download_file(create_session(), server.url + "/missing.jpeg", tmp_path / "f.jpeg", backoff=0)
+    assert len(server.requests) == 1
+
+
+def test_content_encoding_is_decoded(server, tmp_path):
+    publish(server, "/i.jpeg", b"i" * 20000, "i")
+    server.gzip = True
+    dest = tmp_path / "i.jpeg"
+
+    result = download_file(create_session(), server.url + "/i.jpeg", dest, retries=1, backoff=0)
+    assert result["attempts"] == 1
+    assert server.requests[-1][1]["Accept-Encoding"] == "identity"
+    assert dest.read_bytes() == b"i" * 20000
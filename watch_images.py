@@ -0,0 +1,241 @@
+import os
+import time
+import argparse
+
+from pipeline_trace import add_trace_arguments, start_from_args, finish_from_args
+from optimize_images import (IMAGES_DIR, OPTIMIZED_DIR, OUTPUT_FORMATS, SKIP_PREFIXES, RASTER_EXTENSIONS,
+                             find_image_usages, resolve_primary_categories, previous_categories,
+                             infer_widths, build_jobs, to_public_url, write_jobs, write_variant_manifest)
+
+# Yoklama aralığı ve son değişiklikten sonra beklenecek sessiz süre (saniye)
+DEFAULT_INTERVAL = 0.2
+DEFAULT_DEBOUNCE = 0.3
+
+
+def stat_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def snapshot_images():
+    # public/images altındaki kaynak resimler (optimize çıktıları hariç)
+    snapshot = {}
+    for dirpath, dirnames, filenames in os.walk(IMAGES_DIR):
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() not in RASTER_EXTENSIONS:
+                continue
+            path = os.path.join(dirpath, filename).replace("\\", "/")
+            if ("/" + path.split("public/", 1)[-1]).startswith(SKIP_PREFIXES):
+                continue
+            key = stat_key(path)
+            if key:
+                snapshot[path] = key
+    return snapshot
+
+
+def snapshot_sources(roots):
+    from image_index import iter_source_files
+
+    snapshot = {}
+    for path in iter_source_files(roots):
+        key = stat_key(path)
+        if key:
+            snapshot[path] = key
+    return snapshot
+
+
+def diff_snapshots(old, new):
+    # Eklenen, silinen veya mtime/boyutu değişen yollar
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+class ImageWatcher:
+    def __init__(self, workers=None, memory_budget=None, target_ssim=None,
+                 formats=OUTPUT_FORMATS, rewrite=True, hashed_names=False):
+        from build_cache import BuildCache
+        from image_encoder import create_executor
+        from image_index import ImageIndex
+
+        self.workers = workers
+        self.memory_budget = memory_budget
+        self.target_ssim = target_ssim
+        self.formats = formats
+        self.rewrite = rewrite
+        self.hashed_names = hashed_names
+
+        # Referans indeksi, kodlama önbelleği ve süreç havuzu çalışma boyunca sıcak kalır
+        self.index = ImageIndex()
+        self.cache = BuildCache()
+        self.executor = create_executor(workers)
+
+        # Kaynaktaki yolu optimize edilmiş yola yeniden yazılan resimler de izlenmeye
+        # devam etsin diye önceki işlerin kategorileri korunur
+        self.categories = previous_categories()
+        self.jobs = {}
+        self.image_snapshot = snapshot_images()
+        self.source_snapshot = snapshot_sources(self.index.roots)
+
+    def close(self):
+        self.executor.shutdown()
+        self.cache.save()
+        self.index.save()
+
+    def update_jobs(self, changed_images):
+        # İndeksten kategorileri yeniden çıkar (bellekte, dosya okumadan)
+        self.categories.update(resolve_primary_categories(
+            find_image_usages(self.index, verbose=False), verbose=False))
+        image_widths = infer_widths(self.index, self.categories, verbose=False)
+        for job in build_jobs(self.categories, target_ssim=self.target_ssim, formats=self.formats,
+                              verbose=False, hashed_names=self.hashed_names, image_widths=image_widths):
+            previous = self.jobs.get(job["input"])
+            if previous and previous["category"] != job["category"]:
+                print(f"{job['input']}: kategori {previous['category']} -> {job['category']}")
+            elif previous and previous["widths"] != job["widths"]:
+                print(f"{job['input']}: genişlikler {previous['widths']} -> {job['widths']}")
+            self.jobs[job["input"]] = job
+
+        # Silinen kaynak resimlerin işlerini bırak
+        for input_path in changed_images:
+            if input_path in self.jobs and not os.path.exists(input_path):
+                print(f"Kaynak silindi: {input_path}")
+                del self.jobs[input_path]
+                self.categories.pop(to_public_url(input_path), None)
+
+    def encode(self):
+        # Sadece kaynağı veya ayarları değişen işler kodlanır
+        from build_cache import encode_with_cache
+        from hashed_assets import publish_results, update_netlify_headers
+        from image_placeholder import write_placeholder_mapping
+
+        jobs = list(self.jobs.values())
+        fresh = {job["output"] for job in jobs if self.cache.is_fresh(job)}
+        results = encode_with_cache(jobs, workers=self.workers, memory_budget=self.memory_budget,
+                                    cache=self.cache, executor=self.executor)
+        produced = {result["output"] for result in results}
+        encoded = [job for job in jobs if job["output"] not in fresh and job["output"] in produced]
+        if encoded:
+            write_jobs(jobs, results, cache=self.cache, index=self.index)
+            if self.hashed_names:
+                publish_results(jobs, results, [OPTIMIZED_DIR])
+            else:
+                update_netlify_headers([OPTIMIZED_DIR], enabled=False)
+            write_variant_manifest(jobs, results)
+            write_placeholder_mapping([result for result in results if result["output"] in produced])
+        return encoded
+
+    def rewrite_sources(self, encoded, changed_sources):
+        # Sadece değişen resimlere başvuran ve değişen kaynak dosyaları yeniden yaz
+        from path_rewriter import PathRewriter, load_all_mappings, public_url
+
+        targets = {path for path in changed_sources if os.path.exists(path)}
+        if encoded:
+            # Orijinal yolu veya çıktının herhangi bir (eski özetli) adını kullanan dosyalar
+            prefixes = {public_url(job["input"]) for job in encoded}
+            prefixes |= {public_url(os.path.splitext(job["output"])[0]) + "." for job in encoded}
+            targets.update(self.index.files_referencing(prefixes))
+        if not targets:
+            return
+
+        rewriter = PathRewriter(load_all_mappings())
+        for file_path in sorted(targets):
+            replacements = rewriter.rewrite_file(file_path)
+            if replacements:
+                print(f"Dosya güncellendi: {file_path} ({replacements} değişiklik)")
+                # Kendi yazdığımız değişikliği bir sonraki yoklamada tekrar işleme
+                self.index.refresh_file(file_path)
+                self.source_snapshot[file_path] = stat_key(file_path)
+
+    def run_cycle(self, changed_images, changed_sources):
+        start = time.perf_counter()
+        for file_path in changed_sources:
+            self.index.refresh_file(file_path)
+
+        self.update_jobs(changed_images)
+        encoded = self.encode()
+        if self.rewrite:
+            self.rewrite_sources(encoded, changed_sources)
+
+        self.index.save()
+        print(f"Güncelleme tamamlandı: {len(encoded)} resim kodlandı, "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    def poll(self):
+        images = snapshot_images()
+        sources = snapshot_sources(self.index.roots)
+        changed_images = diff_snapshots(self.image_snapshot, images)
+        changed_sources = diff_snapshots(self.source_snapshot, sources)
+        self.image_snapshot = images
+        self.source_snapshot = sources
+        return changed_images, changed_sources
+
+    def watch(self, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        # Değişiklikleri biriktir, son değişiklikten debounce kadar sonra tek seferde işle
+        pending_images, pending_sources = set(), set()
+        last_change = 0.0
+
+        print(f"İzleniyor: {IMAGES_DIR}, {', '.join(self.index.roots)} (çıkmak için Ctrl+C)")
+        while True:
+            time.sleep(interval)
+            changed_images, changed_sources = self.poll()
+            if changed_images or changed_sources:
+                pending_images |= changed_images
+                pending_sources |= changed_sources
+                last_change = time.monotonic()
+                continue
+
+            if (pending_images or pending_sources) and time.monotonic() - last_change >= debounce:
+                for path in sorted(pending_images | pending_sources):
+                    print(f"Değişti: {path}")
+                self.run_cycle(pending_images, pending_sources)
+                pending_images, pending_sources = set(), set()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="public/images ve kaynak dosyaları izler, değişen resimleri anında optimize eder")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Paralel kodlama süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--memory-budget", type=int, default=None,
+                        help="Eşzamanlı kodlama işleri için toplam bellek bütçesi (MB)")
+    parser.add_argument("--target-ssim", type=float, default=None,
+                        help="Her resim için bu SSIM skorunu sağlayan en düşük kaliteyi ara (örn. 0.95)")
+    parser.add_argument("--formats", default=",".join(OUTPUT_FORMATS),
+                        help="Üretilecek formatlar, virgülle ayrılmış (varsayılan: avif,webp,jpeg)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help="Yoklama aralığı, saniye (varsayılan: 0.2)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="Son değişiklikten sonra beklenecek süre, saniye (varsayılan: 0.3)")
+    parser.add_argument("--no-rewrite", action="store_true",
+                        help="Kaynak dosyalardaki resim yollarını güncelleme")
+    parser.add_argument("--hashed-names", action="store_true",
+                        help="Çıktıları içerik özetli adlarla yaz ve eskilerini sil")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+
+    from image_encoder import supported_formats
+
+    OPTIMIZED_DIR.mkdir(exist_ok=True)
+    memory_budget = args.memory_budget * 1024 * 1024 if args.memory_budget else None
+    watcher = ImageWatcher(workers=args.workers, memory_budget=memory_budget,
+                           target_ssim=args.target_ssim, formats=supported_formats(args.formats.split(",")),
+                           rewrite=not args.no_rewrite, hashed_names=args.hashed_names)
+
+    try:
+        # İlk turda indeksi tazele ve eksik çıktıları üret
+        rescanned = watcher.index.refresh()
+        print(f"Referans indeksi: {len(watcher.index.files)} dosya, {rescanned} dosya yeniden tarandı.")
+        watcher.run_cycle(set(), set())
+        watcher.watch(args.interval, args.debounce)
+    except KeyboardInterrupt:
+        print("\nİzleme durduruldu.")
+    finally:
+        watcher.close()
+        finish_from_args(args)
+
+
+if __name__ == "__main__":
+    main()